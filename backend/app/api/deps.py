@@ -12,7 +12,7 @@ import time
 from app.core import security
 from app.core.config import settings
 from app.db.session import get_db
-from app.models.user import User
+from app.schemas.user import AuthenticatedUser
 from app.schemas.auth import TokenData
 from app.services.auth.user_service import UserService
 
@@ -30,8 +30,13 @@ rate_limit_storage = defaultdict(list)
 async def get_current_user(
     db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme)
-) -> User:
-    """Get current authenticated user."""
+) -> AuthenticatedUser:
+    """
+    Get current authenticated user.
+    
+    This is a cached, read-only view of the user; endpoints that change the
+    user or need its relationships load the row by current_user.id.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -47,7 +52,7 @@ async def get_current_user(
         raise credentials_exception
     
     user_service = UserService(db)
-    user = await user_service.get_by_id(token_data.user_id)
+    user = await user_service.get_cached(token_data.user_id)
     
     if not user:
         raise credentials_exception
@@ -56,8 +61,8 @@ async def get_current_user(
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: AuthenticatedUser = Depends(get_current_user)
+) -> AuthenticatedUser:
     """Get current active user."""
     if not current_user.is_active:
         raise HTTPException(
@@ -70,7 +75,7 @@ async def get_current_active_user(
 async def get_current_user_optional(
     db: AsyncSession = Depends(get_db),
     token: Optional[str] = Depends(oauth2_scheme)
-) -> Optional[User]:
+) -> Optional[AuthenticatedUser]:
     """Get current user if authenticated, None otherwise."""
     if not token:
         return None
@@ -84,14 +89,14 @@ async def get_current_user_optional(
         return None
     
     user_service = UserService(db)
-    user = await user_service.get_by_id(token_data.user_id)
+    user = await user_service.get_cached(token_data.user_id)
     
     return user if user and user.is_active else None
 
 
 async def get_current_student(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
+) -> AuthenticatedUser:
     """Ensure current user is a student."""
     if current_user.role != "student":
         raise HTTPException(
@@ -102,8 +107,8 @@ async def get_current_student(
 
 
 async def get_current_teacher(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
+) -> AuthenticatedUser:
     """Ensure current user is a teacher."""
     if current_user.role != "teacher":
         raise HTTPException(
@@ -121,7 +126,7 @@ class RateLimitChecker:
         self.max_requests = max_requests
         self.window_seconds = window_seconds
     
-    def __call__(self, request: Request, current_user: User = Depends(get_current_user)):
+    def __call__(self, request: Request, current_user: AuthenticatedUser = Depends(get_current_user)):
         # Use user ID for authenticated endpoints
         key = f"{current_user.id}:{request.url.path}"
         now = time.time()
@@ -15,7 +15,7 @@ from app.schemas.auth import (
     AuthResponse,
     RefreshTokenRequest,
 )
-from app.schemas.user import User, UserCreate
+from app.schemas.user import User, UserCreate, AuthenticatedUser
 from app.api.deps import get_current_active_user
 from app.models.user import UserRole
 from app.services.practice.challenge_service import ChallengeService
@@ -185,7 +185,7 @@ async def refresh_token(
 
 @router.get("/me", response_model=User)
 async def get_current_user(
-    current_user: Annotated[User, Depends(get_current_active_user)]
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_active_user)]
 ) -> User:
     """Get current user info"""
     return User.model_validate(current_user)
@@ -195,7 +195,7 @@ async def get_current_user(
 async def update_push_token(
     push_data: dict,
     db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_active_user)]
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_active_user)]
 ) -> dict:
     """Update user's push notification token"""
     push_token = push_data.get("push_token")
@@ -207,11 +207,11 @@ async def update_push_token(
             detail="Push token is required"
         )
     
-    # Update user's push token
-    current_user.push_token = push_token
-    current_user.push_platform = platform
+    # Update user's push token; current_user is a read-only cached view
+    user = await UserService(db).get_by_id(current_user.id)
+    user.push_token = push_token
+    user.push_platform = platform
     
-    db.add(current_user)
     await db.commit()
     
     return {"detail": "Push token updated successfully"}
\ No newline at end of file
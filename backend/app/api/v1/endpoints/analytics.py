@@ -8,7 +8,7 @@ from sqlalchemy import select, func, and_
 from sqlalchemy.orm import selectinload
 
 from app.api.deps import get_db, get_current_user
-from app.models.user import User
+from app.schemas.user import AuthenticatedUser
 from app.models.analytics import PracticeMetrics, AnalysisResult, MetricType
 from app.models.practice import PracticeSession
 from app.schemas.analytics import (
@@ -16,8 +16,11 @@ from app.schemas.analytics import (
     MetricsResponse,
     MetricDataPoint,
     AnalyticsSummary,
-    TrendAnalysis
+    TrendAnalysis,
+    RescoreResponse
 )
+from app.services.analytics import AudioAnalysisService
+from app.tasks.video_tasks import rescore_session_analysis
 
 router = APIRouter()
 
@@ -26,7 +29,7 @@ router = APIRouter()
 async def get_session_analytics(
     session_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ) -> AnalysisResultResponse:
     """Get the analysis result for a specific practice session."""
     # First verify the user has access to this session
@@ -59,6 +62,36 @@ async def get_session_analytics(
     return AnalysisResultResponse.model_validate(analysis)
 
 
+@router.post("/sessions/{session_id}/analytics/rescore", response_model=RescoreResponse)
+async def rescore_session_analytics(
+    session_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+) -> RescoreResponse:
+    """Recompute a session's scores from its stored audio features."""
+    session_query = select(PracticeSession).where(
+        and_(
+            PracticeSession.id == session_id,
+            PracticeSession.student_id == current_user.id
+        )
+    )
+    session = await db.scalar(session_query)
+    
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found or access denied"
+        )
+    
+    task = rescore_session_analysis.delay(str(session_id))
+    
+    return RescoreResponse(
+        session_id=session_id,
+        task_id=task.id,
+        analysis_version=AudioAnalysisService.ANALYSIS_VERSION
+    )
+
+
 @router.get("/sessions/{session_id}/metrics", response_model=MetricsResponse)
 async def get_session_metrics(
     session_id: UUID,
@@ -66,7 +99,7 @@ async def get_session_metrics(
     start_time: Optional[datetime] = Query(None, description="Start time for time range"),
     end_time: Optional[datetime] = Query(None, description="End time for time range"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ) -> MetricsResponse:
     """Get time-series metrics for a specific practice session."""
     # Verify access to session
@@ -131,7 +164,7 @@ async def get_session_metrics(
 async def get_analytics_summary(
     days: int = Query(30, ge=1, le=365, description="Number of days to include"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ) -> AnalyticsSummary:
     """Get analytics summary for the current user over a time period."""
     start_date = datetime.utcnow() - timedelta(days=days)
@@ -221,7 +254,7 @@ async def get_analytics_trends(
     metric_type: MetricType = Query(..., description="Metric type to analyze"),
     days: int = Query(30, ge=7, le=365, description="Number of days to analyze"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ) -> TrendAnalysis:
     """Get trend analysis for a specific metric type over time."""
     start_date = datetime.utcnow() - timedelta(days=days)
@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.api import deps
-from app.models.user import User
+from app.schemas.user import AuthenticatedUser
 from app.schemas.challenge import (
     Challenge,
     ChallengeWithProgress,
@@ -29,7 +29,7 @@ async def get_challenges(
     limit: int = Query(20, ge=1, le=100),
     only_active: bool = Query(True),
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> ChallengeListResponse:
     """
     Get available challenges for the current user.
@@ -92,7 +92,7 @@ async def get_challenges(
 async def get_challenge(
     challenge_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> ChallengeWithProgress:
     """
     Get details for a specific challenge.
@@ -172,7 +172,7 @@ async def get_challenge(
 async def start_challenge(
     challenge_data: UserChallengeCreate,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> UserChallenge:
     """
     Start a challenge for the current user.
@@ -208,7 +208,7 @@ async def start_challenge(
 @router.get("/user/active", response_model=List[UserChallenge])
 async def get_active_challenges(
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> List[UserChallenge]:
     """
     Get user's active challenges (in progress).
@@ -243,7 +243,7 @@ async def get_completed_challenges(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> List[UserChallenge]:
     """
     Get user's completed challenges.
@@ -274,7 +274,7 @@ async def get_completed_challenges(
 @router.get("/achievements/all", response_model=AchievementListResponse)
 async def get_all_achievements(
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user_optional)
+    current_user: Optional[AuthenticatedUser] = Depends(deps.get_current_user_optional)
 ) -> AchievementListResponse:
     """
     Get all available achievements.
@@ -294,7 +294,7 @@ async def get_all_achievements(
 @router.get("/achievements/earned", response_model=UserAchievementListResponse)
 async def get_user_achievements(
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> UserAchievementListResponse:
     """
     Get achievements earned by the current user.
@@ -330,7 +330,7 @@ async def get_user_achievements(
 async def get_user_achievements_by_id(
     user_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user_optional)
+    current_user: Optional[AuthenticatedUser] = Depends(deps.get_current_user_optional)
 ) -> UserAchievementListResponse:
     """
     Get achievements earned by a specific user.
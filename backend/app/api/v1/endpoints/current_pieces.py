@@ -7,7 +7,7 @@ from sqlalchemy import select, and_, update
 from sqlalchemy.orm import selectinload
 
 from app.api import deps
-from app.models.user import User
+from app.schemas.user import AuthenticatedUser
 from app.models.practice import Tag, user_current_pieces
 from app.schemas.practice import (
     CurrentPieceAdd,
@@ -23,7 +23,7 @@ router = APIRouter()
 @router.get("/", response_model=List[CurrentPieceWithDetails])
 async def get_current_pieces(
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
 ) -> List[CurrentPieceWithDetails]:
@@ -119,7 +119,7 @@ async def add_current_piece(
     piece_id: UUID,
     piece_data: CurrentPieceAdd,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
 ) -> CurrentPieceWithDetails:
     """
     Add a piece to the user's current pieces list.
@@ -168,7 +168,7 @@ async def add_current_piece(
 async def get_current_piece(
     piece_id: UUID,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
 ) -> CurrentPieceWithDetails:
     """
     Get a specific current piece for the user.
@@ -220,7 +220,7 @@ async def update_current_piece(
     piece_id: UUID,
     updates: CurrentPieceUpdate,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
 ) -> CurrentPieceWithDetails:
     """
     Update notes or priority for a current piece.
@@ -265,7 +265,7 @@ async def update_current_piece(
 async def remove_current_piece(
     piece_id: UUID,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
 ) -> dict:
     """
     Remove a piece from the user's current pieces list.
@@ -298,7 +298,7 @@ async def remove_current_piece(
 @router.get("/stats/summary", response_model=dict)
 async def get_current_pieces_summary(
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
 ) -> dict:
     """
     Get summary statistics for user's current pieces.
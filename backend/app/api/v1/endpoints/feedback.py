@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
 from app.api.deps import get_current_teacher
-from app.models.user import User
+from app.schemas.user import AuthenticatedUser
 from app.services.feedback.feedback_service import FeedbackService
 from app.schemas.practice import (
     Feedback,
@@ -21,7 +21,7 @@ router = APIRouter()
 @router.post("/", response_model=Feedback)
 async def create_feedback(
     feedback_data: FeedbackCreate,
-    current_teacher: Annotated[User, Depends(get_current_teacher)],
+    current_teacher: Annotated[AuthenticatedUser, Depends(get_current_teacher)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> Feedback:
     """Create new feedback for a session or video"""
@@ -55,7 +55,7 @@ async def create_feedback(
 @router.get("/sessions/{session_id}", response_model=List[Feedback])
 async def get_session_feedback(
     session_id: UUID,
-    current_teacher: Annotated[User, Depends(get_current_teacher)],
+    current_teacher: Annotated[AuthenticatedUser, Depends(get_current_teacher)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> List[Feedback]:
     """Get all feedback for a specific session"""
@@ -85,7 +85,7 @@ async def get_session_feedback(
 @router.get("/videos/{video_id}", response_model=List[Feedback])
 async def get_video_feedback(
     video_id: UUID,
-    current_teacher: Annotated[User, Depends(get_current_teacher)],
+    current_teacher: Annotated[AuthenticatedUser, Depends(get_current_teacher)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> List[Feedback]:
     """Get all feedback for a specific video, ordered by timestamp"""
@@ -115,7 +115,7 @@ async def get_video_feedback(
 @router.get("/{feedback_id}", response_model=Feedback)
 async def get_feedback(
     feedback_id: UUID,
-    current_teacher: Annotated[User, Depends(get_current_teacher)],
+    current_teacher: Annotated[AuthenticatedUser, Depends(get_current_teacher)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> Feedback:
     """Get a specific feedback item"""
@@ -148,7 +148,7 @@ async def get_feedback(
 async def update_feedback(
     feedback_id: UUID,
     feedback_update: FeedbackBase,
-    current_teacher: Annotated[User, Depends(get_current_teacher)],
+    current_teacher: Annotated[AuthenticatedUser, Depends(get_current_teacher)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> Feedback:
     """Update feedback (only by the teacher who created it)"""
@@ -183,7 +183,7 @@ async def update_feedback(
 @router.delete("/{feedback_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_feedback(
     feedback_id: UUID,
-    current_teacher: Annotated[User, Depends(get_current_teacher)],
+    current_teacher: Annotated[AuthenticatedUser, Depends(get_current_teacher)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> None:
     """Delete feedback (only by the teacher who created it)"""
@@ -204,7 +204,7 @@ async def delete_feedback(
 @router.get("/students/{student_id}/all", response_model=List[Feedback])
 async def get_student_all_feedback(
     student_id: UUID,
-    current_teacher: Annotated[User, Depends(get_current_teacher)],
+    current_teacher: Annotated[AuthenticatedUser, Depends(get_current_teacher)],
     db: Annotated[AsyncSession, Depends(get_db)],
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100)
@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.api import deps
-from app.models.user import User
+from app.schemas.user import AuthenticatedUser
 from app.models.forum import PostStatus, Post as PostModel
 # from app.core.rate_limit import rate_limit  # Temporarily disabled
 from app.schemas.forum import (
@@ -63,7 +63,7 @@ async def test_simple_post(
 @router.post("/test-create-simple")
 async def test_create_simple(
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ):
     """Test simple post creation without any complex logic."""
     try:
@@ -162,7 +162,7 @@ async def convert_media_files_to_urls(media_files: List, db: AsyncSession) -> Li
 @router.post("/posts/", response_model=Post)
 async def create_post(
     post_data: PostCreate,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: AuthenticatedUser = Depends(deps.get_current_user),
     db: AsyncSession = Depends(deps.get_db)
 ) -> Post:
     """
@@ -229,7 +229,7 @@ async def get_posts(
     search: Optional[str] = Query(None, description="Search in title and content"),
     related_piece_id: Optional[UUID] = Query(None, description="Filter by related musical piece"),
     db: AsyncSession = Depends(deps.get_db),
-    current_user: Optional[User] = Depends(deps.get_current_user_optional)
+    current_user: Optional[AuthenticatedUser] = Depends(deps.get_current_user_optional)
 ) -> PostList:
     """
     Get paginated list of forum posts.
@@ -304,7 +304,7 @@ async def get_posts(
 async def get_post(
     post_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: Optional[User] = Depends(deps.get_current_user_optional)
+    current_user: Optional[AuthenticatedUser] = Depends(deps.get_current_user_optional)
 ) -> PostWithComments:
     """
     Get a single post with its comments.
@@ -371,7 +371,7 @@ async def update_post(
     post_id: UUID,
     post_update: PostUpdate,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> Post:
     """
     Update a post.
@@ -437,7 +437,7 @@ async def update_post(
 async def delete_post(
     post_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> dict:
     """
     Delete a post (soft delete).
@@ -469,7 +469,7 @@ async def create_comment(
     post_id: UUID,
     comment_data: CommentCreate,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> Comment:
     """
     Create a comment on a post.
@@ -515,7 +515,7 @@ async def get_comments(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     db: AsyncSession = Depends(deps.get_db),
-    current_user: Optional[User] = Depends(deps.get_current_user_optional)
+    current_user: Optional[AuthenticatedUser] = Depends(deps.get_current_user_optional)
 ) -> List[Comment]:
     """
     Get comments for a post in threaded structure.
@@ -551,7 +551,7 @@ async def update_comment(
     comment_id: UUID,
     comment_update: CommentUpdate,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> Comment:
     """
     Update a comment.
@@ -585,7 +585,7 @@ async def update_comment(
 async def delete_comment(
     comment_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> dict:
     """
     Delete a comment (soft delete).
@@ -618,7 +618,7 @@ async def vote_post(
     post_id: UUID,
     vote_data: VoteCreate,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    current_user: AuthenticatedUser = Depends(deps.get_current_user),
     _: bool = Depends(deps.rate_limit_vote)
 ) -> VoteResponse:
     """
@@ -649,7 +649,7 @@ async def vote_comment(
     comment_id: UUID,
     vote_data: VoteCreate,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> VoteResponse:
     """
     Vote on a comment.
@@ -679,7 +679,7 @@ async def accept_answer(
     post_id: UUID,
     comment_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> dict:
     """
     Mark a comment as the accepted answer.
@@ -1,7 +1,6 @@
 """Forum media upload API endpoints."""
 from typing import List, Optional
 import uuid
-import tempfile
 from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,10 +9,10 @@ import io
 
 from app.api import deps
 from app.db.session import get_db
-from app.models.user import User
+from app.schemas.user import AuthenticatedUser
 from app.models.forum_media import ForumMedia, MediaType
 from app.services.media.forum_media_service import ForumMediaService
-from app.services.storage import StorageService
+from app.services.storage import StorageService, read_chunks
 from app.schemas.forum_media import (
     ForumMediaWithUrl,
     ForumMediaUploadResponse,
@@ -47,7 +46,7 @@ async def upload_forum_media(
     entity_id: str,
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ):
     """Upload media file for a forum post or comment."""
     # Validate entity type
@@ -112,17 +111,12 @@ async def upload_forum_media(
     
     # Upload to S3
     storage_service = get_storage_service()
-    with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-        file.file.seek(0)
-        content = file.file.read()
-        tmp_file.write(content)
-        tmp_file.flush()
-        
-        await storage_service.upload_file(
-            tmp_file.name,
-            s3_key,
-            content_type=file.content_type
-        )
+    await file.seek(0)
+    await storage_service.upload_stream(
+        read_chunks(file),
+        s3_key,
+        content_type=file.content_type
+    )
     
     # Create database record
     media_data = ForumMediaCreate(
@@ -157,7 +151,7 @@ async def upload_forum_media(
 async def get_post_media(
     post_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ):
     """Get all media files for a post."""
     try:
@@ -173,7 +167,7 @@ async def get_post_media(
 async def get_comment_media(
     comment_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ):
     """Get all media files for a comment."""
     try:
@@ -189,7 +183,7 @@ async def get_comment_media(
 async def delete_forum_media(
     media_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ):
     """Delete a forum media file."""
     try:
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.models.user import User
+from app.schemas.user import AuthenticatedUser
 from app.schemas.notification_preferences import (
     NotificationPreferences,
     NotificationPreferencesUpdate,
@@ -18,7 +18,7 @@ router = APIRouter()
 @router.get("/", response_model=NotificationPreferencesFrontend)
 async def get_notification_preferences(
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)]
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)]
 ) -> NotificationPreferencesFrontend:
     """Get current user's notification preferences."""
     service = NotificationPreferencesService(db)
@@ -34,7 +34,7 @@ async def get_notification_preferences(
 async def update_notification_preferences(
     preferences_data: dict,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)]
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)]
 ) -> NotificationPreferencesFrontend:
     """Update current user's notification preferences."""
     service = NotificationPreferencesService(db)
@@ -54,7 +54,7 @@ async def update_notification_preferences(
 @router.post("/reset", response_model=NotificationPreferencesFrontend)
 async def reset_notification_preferences(
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)]
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)]
 ) -> NotificationPreferencesFrontend:
     """Reset notification preferences to defaults."""
     service = NotificationPreferencesService(db)
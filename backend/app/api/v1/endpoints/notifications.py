@@ -5,7 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.models.user import User
+from app.schemas.user import AuthenticatedUser
 from app.schemas.notification import (
     Notification,
     NotificationList,
@@ -22,7 +22,7 @@ async def get_notifications(
     limit: int = Query(20, ge=1, le=100),
     unread_only: bool = Query(False),
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> NotificationList:
     """
     Get notifications for the current user.
@@ -48,7 +48,7 @@ async def get_notifications(
 @router.get("/unread-count", response_model=dict)
 async def get_unread_count(
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> dict:
     """Get the count of unread notifications for the current user"""
     notification_service = NotificationService(db)
@@ -65,7 +65,7 @@ async def get_unread_count(
 @router.put("/mark-all-read", response_model=dict)
 async def mark_all_notifications_as_read(
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> dict:
     """Mark all notifications as read for the current user"""
     notification_service = NotificationService(db)
@@ -81,7 +81,7 @@ async def mark_all_notifications_as_read(
 async def get_notification(
     notification_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> Notification:
     """Get a specific notification"""
     notification_service = NotificationService(db)
@@ -101,7 +101,7 @@ async def get_notification(
 async def mark_notification_as_read(
     notification_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> Notification:
     """Mark a notification as read"""
     notification_service = NotificationService(db)
@@ -130,7 +130,7 @@ async def mark_notification_as_read(
 async def delete_notification(
     notification_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> dict:
     """Delete a notification"""
     notification_service = NotificationService(db)
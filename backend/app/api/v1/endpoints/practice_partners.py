@@ -29,7 +29,7 @@ from app.schemas.practice_partner import (
     CompatiblePartner,
     PartnerSearchFilters
 )
-from app.schemas.user import User
+from app.schemas.user import User, AuthenticatedUser
 from app.schemas.practice import Tag as TagSchema
 
 router = APIRouter()
@@ -39,7 +39,7 @@ router = APIRouter()
 @router.get("/availability", response_model=List[UserAvailabilitySchema])
 async def get_user_availability(
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
 ) -> List[UserAvailabilitySchema]:
     """Get current user's availability schedule."""
     query = (
@@ -55,7 +55,7 @@ async def get_user_availability(
 async def add_availability_slot(
     availability: UserAvailabilityCreate,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
 ) -> UserAvailabilitySchema:
     """Add a new availability slot for the current user."""
     # Check for overlapping slots
@@ -97,7 +97,7 @@ async def add_availability_slot(
 async def delete_availability_slot(
     availability_id: UUID,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
 ) -> dict:
     """Delete an availability slot."""
     query = select(UserAvailability).where(
@@ -121,7 +121,7 @@ async def delete_availability_slot(
 @router.get("/preferences", response_model=UserPracticePreferencesSchema)
 async def get_practice_preferences(
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
 ) -> UserPracticePreferencesSchema:
     """Get current user's practice partner preferences."""
     query = select(UserPracticePreferences).where(
@@ -144,7 +144,7 @@ async def get_practice_preferences(
 async def update_practice_preferences(
     preferences: UserPracticePreferencesUpdate,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
 ) -> UserPracticePreferencesSchema:
     """Update practice partner preferences."""
     # Get existing preferences
@@ -176,7 +176,7 @@ async def update_practice_preferences(
 async def discover_practice_partners(
     filters: PartnerSearchFilters,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
 ) -> List[CompatiblePartner]:
@@ -285,7 +285,7 @@ async def discover_practice_partners(
 @router.get("/matches", response_model=List[PracticePartnerMatchWithUsers])
 async def get_practice_partner_matches(
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
     status: Optional[MatchStatus] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
@@ -345,7 +345,7 @@ async def get_practice_partner_matches(
 async def create_practice_partner_request(
     request: PracticePartnerMatchCreate,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
 ) -> PracticePartnerMatchSchema:
     """Send a practice partner request."""
     # Validate partner exists and is available
@@ -441,7 +441,7 @@ async def update_practice_partner_match(
     match_id: UUID,
     update: PracticePartnerMatchUpdate,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
 ) -> PracticePartnerMatchSchema:
     """Update a practice partner match (accept/decline/end)."""
     query = select(PracticePartnerMatch).where(
@@ -526,7 +526,7 @@ async def update_practice_partner_match(
 async def get_compatible_practice_times(
     match_id: UUID,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
 ) -> List[dict]:
     """Find compatible practice times between matched partners with timezone conversion."""
     from datetime import datetime, date, time
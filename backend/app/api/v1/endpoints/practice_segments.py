@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.models.user import User
+from app.schemas.user import AuthenticatedUser
 from app.schemas.practice_segment import (
     PracticeSegment,
     PracticeSegmentCreate,
@@ -25,7 +25,7 @@ async def get_student_pieces(
     include_completed: bool = Query(True),
     include_archived: bool = Query(False),
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> List[dict]:
     """
     Get all musical pieces the student is working on.
@@ -67,7 +67,7 @@ async def get_student_pieces(
 async def get_piece_segments(
     piece_tag_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> List[PracticeSegment]:
     """Get all practice segments for a specific piece"""
     if current_user.role != "student":
@@ -89,7 +89,7 @@ async def get_piece_segments(
 async def create_segment(
     segment_data: PracticeSegmentCreate,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> PracticeSegment:
     """Create a new practice segment for a piece"""
     if current_user.role != "student":
@@ -115,7 +115,7 @@ async def update_segment(
     segment_id: UUID,
     segment_data: PracticeSegmentUpdate,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> PracticeSegment:
     """Update a practice segment"""
     if current_user.role != "student":
@@ -141,7 +141,7 @@ async def update_segment(
 async def delete_segment(
     segment_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> dict:
     """Delete a practice segment"""
     if current_user.role != "student":
@@ -166,7 +166,7 @@ async def delete_segment(
 async def record_segment_click(
     click_data: SegmentClickCreate,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> SegmentClick:
     """Record a click on a practice segment"""
     if current_user.role != "student":
@@ -188,7 +188,7 @@ async def record_segment_click(
 async def get_piece_progress(
     piece_tag_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> PieceProgress:
     """Get detailed progress for a musical piece"""
     if current_user.role != "student":
@@ -213,7 +213,7 @@ async def get_piece_progress(
 async def get_segment_analytics(
     segment_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> dict:
     """Get detailed analytics for a practice segment"""
     if current_user.role != "student":
@@ -238,7 +238,7 @@ async def get_segment_analytics(
 async def archive_piece(
     piece_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> dict:
     """Archive a musical piece and get summary statistics"""
     if current_user.role != "student":
@@ -263,7 +263,7 @@ async def archive_piece(
 async def unarchive_piece(
     piece_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> dict:
     """Unarchive a musical piece"""
     if current_user.role != "student":
@@ -287,7 +287,7 @@ async def unarchive_piece(
 @router.get("/pieces/archived")
 async def get_archived_pieces(
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> List[dict]:
     """Get all archived pieces with summaries"""
     if current_user.role != "student":
@@ -308,7 +308,7 @@ async def get_archived_pieces(
 async def get_archived_piece_details(
     piece_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> dict:
     """Get full details of an archived piece including all segments"""
     if current_user.role != "student":
@@ -333,7 +333,7 @@ async def get_archived_piece_details(
 async def get_practice_focus_analytics(
     days: int = Query(30, description="Number of days to analyze"),
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> dict:
     """Get overall practice focus analytics for the student"""
     if current_user.role != "student":
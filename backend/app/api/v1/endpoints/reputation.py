@@ -1,11 +1,12 @@
 """Reputation system endpoints."""
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
 from app.models.user import User
+from app.schemas.user import AuthenticatedUser
 from app.schemas.reputation import ReputationHistoryResponse, UserReputationResponse
 from app.services.community.reputation_service import ReputationService
 
@@ -16,7 +17,7 @@ router = APIRouter()
 async def get_user_reputation(
     user_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user_optional)
+    current_user: Optional[AuthenticatedUser] = Depends(deps.get_current_user_optional)
 ) -> UserReputationResponse:
     """
     Get reputation information for a user.
@@ -46,7 +47,7 @@ async def get_reputation_history(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> List[ReputationHistoryResponse]:
     """
     Get reputation history for a user.
@@ -86,7 +87,7 @@ async def get_reputation_leaderboard(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user_optional)
+    current_user: Optional[AuthenticatedUser] = Depends(deps.get_current_user_optional)
 ) -> List[UserReputationResponse]:
     """
     Get the reputation leaderboard.
@@ -5,7 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.models.user import User
+from app.schemas.user import AuthenticatedUser
 from app.models.schedule import EventType, EventStatus
 from app.schemas.schedule import (
     ScheduleEvent,
@@ -28,7 +28,7 @@ router = APIRouter()
 async def create_event(
     event_data: ScheduleEventCreate,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_teacher)]
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_teacher)]
 ) -> ScheduleEventWithParticipants:
     """
     Create a new scheduled event.
@@ -46,7 +46,7 @@ async def create_event(
 @router.get("/", response_model=List[ScheduleEvent])
 async def get_events(
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
     start_date: Optional[date] = Query(None, description="Filter events starting after this date"),
     end_date: Optional[date] = Query(None, description="Filter events ending before this date"),
     event_type: Optional[EventType] = Query(None, description="Filter by event type"),
@@ -98,7 +98,7 @@ async def get_events(
 @router.get("/calendar", response_model=List[CalendarDayEvents])
 async def get_calendar_view(
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
     start_date: date = Query(..., description="Start date for calendar view"),
     end_date: date = Query(..., description="End date for calendar view"),
     include_cancelled: bool = Query(False, description="Include cancelled events")
@@ -135,7 +135,7 @@ async def get_calendar_view(
 async def get_event(
     event_id: UUID,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
     include_conflicts: bool = Query(False, description="Include conflict information")
 ) -> ScheduleEventWithConflicts:
     """
@@ -173,7 +173,7 @@ async def update_event(
     event_id: UUID,
     event_update: ScheduleEventUpdate,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_teacher)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_teacher)],
     update_series: bool = Query(False, description="Update all events in the series")
 ) -> ScheduleEventWithParticipants:
     """
@@ -202,7 +202,7 @@ async def update_event(
 async def delete_event(
     event_id: UUID,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_teacher)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_teacher)],
     delete_series: bool = Query(False, description="Delete all events in the series")
 ) -> None:
     """
@@ -229,7 +229,7 @@ async def resolve_conflict(
     conflict_id: UUID,
     resolution: ConflictResolution,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_teacher)]
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_teacher)]
 ) -> ScheduleConflict:
     """
     Resolve or ignore a scheduling conflict.
@@ -272,7 +272,7 @@ async def resolve_conflict(
 @router.get("/my/upcoming", response_model=List[ScheduleEvent])
 async def get_my_upcoming_events(
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_student)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_student)],
     days_ahead: int = Query(7, ge=1, le=30, description="Number of days to look ahead")
 ) -> List[ScheduleEvent]:
     """
@@ -301,7 +301,7 @@ async def get_my_upcoming_events(
 async def get_student_events(
     student_id: UUID,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_teacher)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_teacher)],
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     skip: int = Query(0, ge=0),
@@ -352,7 +352,7 @@ from app.models.schedule import ScheduleConflict
 @router.get("/calendar/export", response_class=Response)
 async def export_calendar(
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)],
     start_date: Optional[date] = Query(None, description="Start date for events"),
     end_date: Optional[date] = Query(None, description="End date for events"),
     include_cancelled: bool = Query(False, description="Include cancelled events")
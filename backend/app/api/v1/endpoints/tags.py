@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.models.user import User
+from app.schemas.user import AuthenticatedUser
 from app.schemas.practice import Tag, TagCreate, TagUpdate
 from app.services.practice.tag_service import TagService
 
@@ -16,7 +16,7 @@ async def get_tags(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> List[Tag]:
     """
     Get all tags accessible to the current user.
@@ -42,7 +42,7 @@ async def get_tags(
 async def get_popular_tags(
     limit: int = Query(10, ge=1, le=50),
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> List[dict]:
     """
     Get most popular tags with usage count.
@@ -74,7 +74,7 @@ async def get_piece_tags(
     limit: int = Query(100, ge=1, le=100),
     tag_type: Optional[str] = Query("piece", description="Filter by tag type"),
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> List[Tag]:
     """Get all piece-type tags (musical pieces)"""
     tag_service = TagService(db)
@@ -95,7 +95,7 @@ async def get_piece_tags(
 async def get_tag(
     tag_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> Tag:
     """Get a specific tag by ID"""
     tag_service = TagService(db)
@@ -114,7 +114,7 @@ async def get_tag(
 async def create_tag(
     tag_data: TagCreate,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> Tag:
     """
     Create a new tag.
@@ -154,7 +154,7 @@ async def update_tag(
     tag_id: UUID,
     tag_data: TagUpdate,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> Tag:
     """
     Update a tag.
@@ -188,7 +188,7 @@ async def update_tag(
 async def delete_tag(
     tag_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> dict:
     """
     Delete a tag.
@@ -222,7 +222,7 @@ async def delete_tag(
 async def get_tag_usage_count(
     tag_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
 ) -> dict:
     """Get the number of sessions using this tag"""
     tag_service = TagService(db)
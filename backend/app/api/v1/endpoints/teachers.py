@@ -9,11 +9,11 @@ from sqlalchemy.orm import selectinload
 
 from app.db.session import get_db
 from app.api.deps import get_current_teacher
-from app.models.user import User, Student
+from app.models.user import Student
 from app.models.practice import PracticeSession
 from app.services.auth.user_service import UserService
 from app.services.practice.session_service import SessionService
-from app.schemas.user import StudentActivity, StudentProfile, StudentWithUser
+from app.schemas.user import AuthenticatedUser, StudentActivity, StudentProfile, StudentWithUser
 from app.schemas.practice import PracticeSession as PracticeSessionSchema
 
 
@@ -22,7 +22,7 @@ router = APIRouter()
 
 @router.get("/students", response_model=List[StudentActivity])
 async def get_teacher_students(
-    current_teacher: Annotated[User, Depends(get_current_teacher)],
+    current_teacher: Annotated[AuthenticatedUser, Depends(get_current_teacher)],
     db: Annotated[AsyncSession, Depends(get_db)],
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
@@ -101,7 +101,7 @@ async def get_teacher_students(
 @router.get("/students/{student_id}", response_model=StudentProfile)
 async def get_student_profile(
     student_id: UUID,
-    current_teacher: Annotated[User, Depends(get_current_teacher)],
+    current_teacher: Annotated[AuthenticatedUser, Depends(get_current_teacher)],
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> StudentProfile:
     """Get detailed profile for a specific student"""
@@ -202,7 +202,7 @@ async def get_student_profile(
 @router.get("/students/{student_id}/recent-sessions", response_model=List[PracticeSessionSchema])
 async def get_student_recent_sessions(
     student_id: UUID,
-    current_teacher: Annotated[User, Depends(get_current_teacher)],
+    current_teacher: Annotated[AuthenticatedUser, Depends(get_current_teacher)],
     db: Annotated[AsyncSession, Depends(get_db)],
     days: int = Query(7, ge=1, le=90, description="Number of days to look back"),
     limit: int = Query(20, ge=1, le=100),
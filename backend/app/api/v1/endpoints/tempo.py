@@ -7,7 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.models.user import User
+from app.schemas.user import AuthenticatedUser
 from app.schemas.tempo import (
     TempoTracking,
     TempoTrackingCreate,
@@ -28,7 +28,7 @@ async def record_tempo_data(
     session_id: UUID,
     tempo_data: TempoTrackingCreate,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)]
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)]
 ) -> TempoTracking:
     """Record tempo tracking data for a practice session"""
     # Verify session belongs to user (if student) or user's student (if teacher)
@@ -62,7 +62,7 @@ async def record_tempo_batch(
     session_id: UUID,
     batch: TempoTrackingBatch,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)]
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)]
 ) -> List[TempoTracking]:
     """Record multiple tempo tracking entries at once"""
     # Verify session belongs to user
@@ -95,7 +95,7 @@ async def record_tempo_batch(
 async def get_tempo_statistics(
     session_id: UUID,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)]
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)]
 ) -> TempoStats:
     """Get tempo statistics for a practice session"""
     # Verify access to session
@@ -124,7 +124,7 @@ async def update_session_tempo(
     session_id: UUID,
     tempo_update: SessionTempoUpdate,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)]
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)]
 ):
     """Update target tempo and practice mode for a session"""
     # Verify session belongs to user
@@ -155,7 +155,7 @@ async def update_session_tempo(
 async def get_student_tempo_achievements(
     student_id: UUID,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)]
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)]
 ) -> List[TempoAchievement]:
     """Get tempo achievements for a student"""
     # Students can only see their own, teachers can see their students'
@@ -174,7 +174,7 @@ async def get_achievement_progress(
     student_id: UUID,
     achievement_type: str,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)]
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)]
 ) -> AchievementProgress:
     """Get progress towards a specific achievement"""
     # Students can only see their own, teachers can see their students'
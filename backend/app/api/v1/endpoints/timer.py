@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.models.user import User
+from app.schemas.user import AuthenticatedUser
 from app.schemas.timer import (
     SessionTimerCreate, SessionTimerUpdate, SessionTimer,
     TimerEventCreate, TimerEvent, TimerSummary
@@ -19,7 +19,7 @@ async def create_session_timer(
     session_id: UUID,
     timer_data: SessionTimerCreate,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)]
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)]
 ) -> SessionTimer:
     """Create a timer for a practice session"""
     timer_service = TimerService(db)
@@ -45,7 +45,7 @@ async def create_session_timer(
 async def get_session_timer(
     session_id: UUID,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)]
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)]
 ) -> Optional[SessionTimer]:
     """Get timer for a specific session"""
     timer_service = TimerService(db)
@@ -57,7 +57,7 @@ async def update_session_timer(
     session_id: UUID,
     update_data: SessionTimerUpdate,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)]
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)]
 ) -> SessionTimer:
     """Update timer for a session"""
     timer_service = TimerService(db)
@@ -81,7 +81,7 @@ async def add_timer_event(
     session_id: UUID,
     event_data: TimerEventCreate,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)]
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)]
 ) -> TimerEvent:
     """Add a timer event (pause/resume)"""
     timer_service = TimerService(db)
@@ -104,7 +104,7 @@ async def add_timer_event(
 async def get_timer_summary(
     session_id: UUID,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[User, Depends(deps.get_current_active_user)]
+    current_user: Annotated[AuthenticatedUser, Depends(deps.get_current_active_user)]
 ) -> Optional[TimerSummary]:
     """Get a summary of timer data for a session"""
     timer_service = TimerService(db)
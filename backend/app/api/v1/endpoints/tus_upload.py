@@ -1,76 +1,80 @@
 """TUS protocol implementation for resumable video uploads."""
-import os
-import json
-import aiofiles
-from typing import Optional, Dict
-from pathlib import Path
-from datetime import datetime
+import logging
+import uuid
+from typing import Dict, List, Optional
 from fastapi import APIRouter, Request, Response, HTTPException, Depends
-from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import ClientDisconnect
 
 from app.db.session import get_db
 from app.api.deps import get_current_user
-from app.models.user import User
+from app.schemas.user import AuthenticatedUser
+from app.models.practice import PracticeSession
 from app.core.config import settings
+from app.core.tus import CHECKSUM_ALGORITHMS, parse_checksum_header, parse_concat_header
+from app.services.media.processing_queue import queue_session_processing
+from app.services.media.resumable_upload import ResumableUpload, ResumableUploadStore, UploadError
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 # TUS protocol version
 TUS_VERSION = "1.0.0"
 TUS_MAX_SIZE = settings.MAX_VIDEO_SIZE_MB * 1024 * 1024  # Convert MB to bytes
-UPLOAD_DIR = Path("/tmp/tus_uploads")  # Temporary upload directory
 
-# Ensure upload directory exists
-UPLOAD_DIR.mkdir(exist_ok=True)
 
+def get_upload_store() -> ResumableUploadStore:
+    """Get the S3-backed upload store."""
+    return ResumableUploadStore()
+
+
+async def get_owned_upload(
+    upload_id: str,
+    store: ResumableUploadStore,
+    current_user: AuthenticatedUser
+) -> ResumableUpload:
+    """Load an upload, checking it belongs to the current user."""
+    upload = await store.get(upload_id)
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    
+    # Verify ownership
+    if upload.metadata.get("user_id") != str(current_user.id):
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    return upload
+
+
+async def start_processing(upload: ResumableUpload, db: AsyncSession) -> Optional[str]:
+    """
+    Queue processing for a finished upload that names one of the uploader's
+    practice sessions in its metadata.
+    
+    Returns:
+        The processing task ID, or None when there is no session to attach to
+    """
+    try:
+        session_id = uuid.UUID(upload.metadata.get("session_id", ""))
+    except ValueError:
+        return None
+    
+    session = await db.get(PracticeSession, session_id)
+    if not session or str(session.student_id) != upload.metadata.get("user_id"):
+        logger.warning(f"Upload {upload.id} names session {session_id} it can't attach to")
+        return None
+    
+    task_id, _ = await queue_session_processing(db, session, upload.id, upload.object_key)
+    return task_id
 
-class TusUpload:
-    """Represents a TUS upload."""
-    
-    def __init__(self, upload_id: str, metadata: Dict[str, str]):
-        self.id = upload_id
-        self.metadata = metadata
-        self.offset = 0
-        self.size = int(metadata.get("size", "0"))
-        self.created_at = datetime.utcnow()
-        self.file_path = UPLOAD_DIR / f"{upload_id}.bin"
-        self.info_path = UPLOAD_DIR / f"{upload_id}.info"
-    
-    def save_info(self):
-        """Save upload information to disk."""
-        info = {
-            "id": self.id,
-            "metadata": self.metadata,
-            "offset": self.offset,
-            "size": self.size,
-            "created_at": self.created_at.isoformat()
-        }
-        with open(self.info_path, "w") as f:
-            json.dump(info, f)
-    
-    @classmethod
-    def load(cls, upload_id: str) -> Optional["TusUpload"]:
-        """Load upload information from disk."""
-        info_path = UPLOAD_DIR / f"{upload_id}.info"
-        if not info_path.exists():
-            return None
-        
-        with open(info_path, "r") as f:
-            info = json.load(f)
-        
-        upload = cls(upload_id, info["metadata"])
-        upload.offset = info["offset"]
-        upload.size = info["size"]
-        upload.created_at = datetime.fromisoformat(info["created_at"])
-        return upload
-    
-    def delete(self):
-        """Delete upload files."""
-        if self.file_path.exists():
-            self.file_path.unlink()
-        if self.info_path.exists():
-            self.info_path.unlink()
+
+def concat_header(upload: ResumableUpload, base_url: str) -> Optional[str]:
+    """Upload-Concat value for a partial or final upload."""
+    if upload.is_partial:
+        return "partial"
+    if upload.partial_ids:
+        return "final;" + " ".join(f"{base_url}/{partial_id}" for partial_id in upload.partial_ids)
+    return None
 
 
 def parse_metadata(metadata_header: str) -> Dict[str, str]:
@@ -98,10 +102,11 @@ async def tus_options():
             "Tus-Resumable": TUS_VERSION,
             "Tus-Version": TUS_VERSION,
             "Tus-Max-Size": str(TUS_MAX_SIZE),
-            "Tus-Extension": "creation,termination",
+            "Tus-Extension": "creation,termination,checksum,concatenation",
+            "Tus-Checksum-Algorithm": ",".join(CHECKSUM_ALGORITHMS),
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Methods": "POST, GET, HEAD, PATCH, DELETE, OPTIONS",
-            "Access-Control-Allow-Headers": "Origin, X-Requested-With, Content-Type, Upload-Length, Upload-Offset, Tus-Resumable, Upload-Metadata, Authorization",
+            "Access-Control-Allow-Headers": "Origin, X-Requested-With, Content-Type, Upload-Length, Upload-Offset, Tus-Resumable, Upload-Metadata, Upload-Checksum, Upload-Concat, Authorization",
             "Access-Control-Max-Age": "86400",
         }
     )
@@ -110,9 +115,18 @@ async def tus_options():
 @router.post("/upload")
 async def tus_create(
     request: Request,
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    store: ResumableUploadStore = Depends(get_upload_store),
+    db: AsyncSession = Depends(get_db)
 ):
     """Handle TUS creation request."""
+    concat = parse_concat_header(request.headers.get("Upload-Concat"))
+    if request.headers.get("Upload-Concat") and not concat:
+        raise HTTPException(status_code=400, detail="Invalid Upload-Concat")
+    
+    if concat and concat[0] == "final":
+        return await tus_create_final(request, concat[1], current_user, store, db)
+    
     # Get upload length
     upload_length = request.headers.get("Upload-Length")
     if not upload_length:
@@ -133,16 +147,17 @@ async def tus_create(
     metadata["user_id"] = str(current_user.id)
     
     # Generate upload ID
-    import uuid
     upload_id = str(uuid.uuid4())
     
-    # Create upload record
-    upload = TusUpload(upload_id, metadata)
-    upload.save_info()
-    
-    # Create empty file
-    with open(upload.file_path, "wb") as f:
-        pass
+    # Bytes go straight into an S3 multipart upload
+    await store.create(
+        upload_id,
+        object_key=f"uploads/{current_user.id}/{upload_id}",
+        size=upload_size,
+        metadata=metadata,
+        content_type=metadata.get("filetype"),
+        partial=concat is not None
+    )
     
     # Build location URL
     location = f"{request.url.scheme}://{request.url.netloc}{request.url.path}/{upload_id}"
@@ -158,49 +173,93 @@ async def tus_create(
     )
 
 
-@router.head("/upload/{upload_id}")
-async def tus_head(
-    upload_id: str,
-    current_user: User = Depends(get_current_user)
-):
-    """Handle TUS HEAD request to get upload offset."""
-    upload = TusUpload.load(upload_id)
-    if not upload:
-        raise HTTPException(status_code=404, detail="Upload not found")
+async def tus_create_final(
+    request: Request,
+    partial_urls: List[str],
+    current_user: AuthenticatedUser,
+    store: ResumableUploadStore,
+    db: AsyncSession
+) -> Response:
+    """
+    Handle TUS creation of a final upload from the client's partial uploads.
+    
+    The partials are joined inside S3 right away, so the final upload is
+    complete when it is created and processing is queued as for a PATCHed
+    upload.
+    """
+    if request.headers.get("Upload-Length"):
+        raise HTTPException(status_code=400, detail="Upload-Length not allowed for a final upload")
+    
+    partial_ids = [url.rstrip("/").rsplit("/", 1)[-1] for url in partial_urls]
+    partials = [await get_owned_upload(partial_id, store, current_user) for partial_id in partial_ids]
+    if sum(partial.size for partial in partials) > TUS_MAX_SIZE:
+        raise HTTPException(status_code=413, detail="File too large")
     
-    # Verify ownership
-    if upload.metadata.get("user_id") != str(current_user.id):
-        raise HTTPException(status_code=403, detail="Access denied")
+    metadata = parse_metadata(request.headers.get("Upload-Metadata", ""))
+    metadata["user_id"] = str(current_user.id)
+    
+    upload_id = str(uuid.uuid4())
+    
+    try:
+        upload = await store.concatenate(
+            upload_id,
+            object_key=f"uploads/{current_user.id}/{upload_id}",
+            partial_ids=partial_ids,
+            metadata=metadata,
+            content_type=metadata.get("filetype")
+        )
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     
-    # Get actual file size
-    if upload.file_path.exists():
-        upload.offset = upload.file_path.stat().st_size
+    await start_processing(upload, db)
+    
+    location = f"{request.url.scheme}://{request.url.netloc}{request.url.path}/{upload_id}"
     
     return Response(
+        status_code=201,
         headers={
             "Tus-Resumable": TUS_VERSION,
+            "Location": location,
             "Upload-Offset": str(upload.offset),
-            "Upload-Length": str(upload.size),
-            "Cache-Control": "no-store",
-            "Access-Control-Expose-Headers": "Upload-Offset, Upload-Length, Tus-Resumable"
+            "Access-Control-Expose-Headers": "Location, Tus-Resumable, Upload-Offset"
         }
     )
 
 
+@router.head("/upload/{upload_id}")
+async def tus_head(
+    upload_id: str,
+    request: Request,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    store: ResumableUploadStore = Depends(get_upload_store)
+):
+    """Handle TUS HEAD request to get upload offset."""
+    upload = await get_owned_upload(upload_id, store, current_user)
+    
+    headers = {
+        "Tus-Resumable": TUS_VERSION,
+        "Upload-Offset": str(upload.offset),
+        "Upload-Length": str(upload.size),
+        "Cache-Control": "no-store",
+        "Access-Control-Expose-Headers": "Upload-Offset, Upload-Length, Upload-Concat, Tus-Resumable"
+    }
+    concat = concat_header(upload, str(request.url).rsplit("/", 1)[0])
+    if concat:
+        headers["Upload-Concat"] = concat
+    
+    return Response(headers=headers)
+
+
 @router.patch("/upload/{upload_id}")
 async def tus_patch(
     upload_id: str,
     request: Request,
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    store: ResumableUploadStore = Depends(get_upload_store),
+    db: AsyncSession = Depends(get_db)
 ):
     """Handle TUS PATCH request to upload file data."""
-    upload = TusUpload.load(upload_id)
-    if not upload:
-        raise HTTPException(status_code=404, detail="Upload not found")
-    
-    # Verify ownership
-    if upload.metadata.get("user_id") != str(current_user.id):
-        raise HTTPException(status_code=403, detail="Access denied")
+    await get_owned_upload(upload_id, store, current_user)
     
     # Check upload offset
     upload_offset = request.headers.get("Upload-Offset")
@@ -212,43 +271,32 @@ async def tus_patch(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid Upload-Offset")
     
-    # Get current file size
-    current_size = 0
-    if upload.file_path.exists():
-        current_size = upload.file_path.stat().st_size
-    
-    if offset != current_size:
-        raise HTTPException(
-            status_code=409,
-            detail=f"Upload offset mismatch. Expected {current_size}, got {offset}"
-        )
-    
-    # Read and append data
     content_type = request.headers.get("Content-Type", "application/offset+octet-stream")
     
     if content_type != "application/offset+octet-stream":
         raise HTTPException(status_code=415, detail="Invalid Content-Type")
     
-    # Write data to file
-    body = await request.body()
-    async with aiofiles.open(upload.file_path, "ab") as f:
-        await f.write(body)
-    
-    # Update offset
-    new_offset = current_size + len(body)
-    upload.offset = new_offset
-    upload.save_info()
+    checksum = parse_checksum_header(request.headers.get("Upload-Checksum"))
     
-    # Check if upload is complete
-    if new_offset >= upload.size:
-        # TODO: Trigger video processing here
-        pass
+    # The store checks the offset again under the upload's lock
+    try:
+        upload = await store.write(upload_id, offset, request.stream(), checksum)
+    except ClientDisconnect:
+        # Whatever arrived is kept; the client resumes from HEAD's offset
+        return Response(status_code=400, headers={"Tus-Resumable": TUS_VERSION})
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    
+    # Check if upload is complete; retried final PATCHes find the job
+    # already queued. Partial uploads wait for their final upload.
+    if upload.completed and not upload.is_partial:
+        await start_processing(upload, db)
     
     return Response(
         status_code=204,
         headers={
             "Tus-Resumable": TUS_VERSION,
-            "Upload-Offset": str(new_offset),
+            "Upload-Offset": str(upload.offset),
             "Access-Control-Expose-Headers": "Upload-Offset, Tus-Resumable"
         }
     )
@@ -257,19 +305,14 @@ async def tus_patch(
 @router.delete("/upload/{upload_id}")
 async def tus_delete(
     upload_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    store: ResumableUploadStore = Depends(get_upload_store)
 ):
     """Handle TUS DELETE request to cancel upload."""
-    upload = TusUpload.load(upload_id)
-    if not upload:
-        raise HTTPException(status_code=404, detail="Upload not found")
+    await get_owned_upload(upload_id, store, current_user)
     
-    # Verify ownership
-    if upload.metadata.get("user_id") != str(current_user.id):
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    # Delete upload files
-    upload.delete()
+    # Drop the S3 parts and upload state
+    await store.abort(upload_id)
     
     return Response(
         status_code=204,
@@ -282,21 +325,13 @@ async def tus_delete(
 @router.get("/upload/{upload_id}")
 async def tus_get(
     upload_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    store: ResumableUploadStore = Depends(get_upload_store)
 ):
     """Get upload information (not part of TUS spec, but useful)."""
-    upload = TusUpload.load(upload_id)
-    if not upload:
-        raise HTTPException(status_code=404, detail="Upload not found")
-    
-    # Verify ownership
-    if upload.metadata.get("user_id") != str(current_user.id):
-        raise HTTPException(status_code=403, detail="Access denied")
+    upload = await get_owned_upload(upload_id, store, current_user)
     
-    # Get actual file size
-    current_size = 0
-    if upload.file_path.exists():
-        current_size = upload.file_path.stat().st_size
+    current_size = upload.offset
     
     return {
         "id": upload.id,
@@ -305,5 +340,5 @@ async def tus_get(
         "size": upload.size,
         "progress": (current_size / upload.size * 100) if upload.size > 0 else 0,
         "created_at": upload.created_at.isoformat(),
-        "is_complete": current_size >= upload.size
-    }
\ No newline at end of file
+        "is_complete": upload.completed
+    }
@@ -1,14 +1,19 @@
 """Video processing API endpoints."""
+import asyncio
 from typing import List, Optional
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
 from app.api.deps import get_current_user
-from app.models.user import User
+from app.schemas.user import AuthenticatedUser
+from app.core.cache import CacheKeys, cache_get, cache_set
 from app.models.practice import PracticeSession, ProcessingStatus, VideoQuality
-from app.services.storage import StorageService
+from app.services.storage import StorageService, read_chunks
+from app.services.media.hls import HLS_CONTENT_TYPES, playlist_uris, rewrite_playlist_uris
+from app.services.media.processing_queue import enqueue_processing
+from app.services.media.progress import read_progress
 from app.tasks.video_tasks import process_video, process_video_batch
 from app.schemas.video_processing import (
     VideoProcessingRequest,
@@ -29,7 +34,7 @@ async def upload_video_multipart(
     background_tasks: BackgroundTasks,
     video: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     """Upload video using standard multipart form data (for React Native)."""
     import logging
@@ -71,52 +76,50 @@ async def upload_video_multipart(
     
     # Upload to storage
     storage_service = get_storage_service()
+    # Every upload gets its own object, so re-uploading a corrected file
+    # under the same name neither replaces the original nor shares its job
+    upload_id = str(uuid.uuid4())
     # Use appropriate naming based on session type
     if is_temp_session:
-        video_key = f"videos/temp/user_{current_user.id}/session_{session_id}_{video.filename}"
+        video_key = f"videos/temp/user_{current_user.id}/session_{session_id}_{upload_id}_{video.filename}"
     else:
-        video_key = f"videos/original/session_{session_id}_{video.filename}"
-    
-    # Save video to temporary file
-    import tempfile
-    with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-        content = await video.read()
-        tmp_file.write(content)
-        tmp_file.flush()
-        
-        # Upload to S3
-        await storage_service.upload_file(
-            tmp_file.name,
-            video_key,
-            content_type=video.content_type
-        )
+        video_key = f"videos/original/session_{session_id}/{upload_id}_{video.filename}"
+    
+    # Stream to S3 part by part rather than reading the whole video
+    await storage_service.upload_stream(
+        read_chunks(video),
+        video_key,
+        content_type=video.content_type
+    )
     
     # Update session if it exists in database
     if session:
-        session.video_url = video_key
-        session.processing_status = ProcessingStatus.PENDING
-        
-        # Create Video record in database
-        from app.models.practice import Video
-        video_record = Video(
-            session_id=session_uuid,
-            s3_key=video_key,
-            duration_seconds=60,  # Default, will be updated during processing
-            file_size_bytes=file_size,
-            processed=False,
-            upload_completed=True,
-            upload_offset=file_size  # Set to file size since upload is complete
-        )
-        db.add(video_record)
-        await db.commit()
+        async def record_upload():
+            session.video_url = video_key
+            session.processing_status = ProcessingStatus.PENDING
+            
+            # Create Video record in database
+            from app.models.practice import Video
+            video_record = Video(
+                session_id=session_uuid,
+                s3_key=video_key,
+                duration_seconds=60,  # Default, will be updated during processing
+                file_size_bytes=file_size,
+                processed=False,
+                upload_completed=True,
+                upload_offset=file_size  # Set to file size since upload is complete
+            )
+            db.add(video_record)
+            await db.commit()
         
-        # Trigger processing task
-        task = process_video.delay(
-            str(session_uuid),  # Convert UUID to string for Celery
+        # Trigger processing task, once for this upload
+        task_id, _ = await enqueue_processing(
+            upload_id,
+            session_uuid,
             video_key,
-            current_user.id
+            current_user.id,
+            on_claim=record_upload
         )
-        task_id = task.id
     else:
         # For temporary sessions, we'll process later when session is synced
         task_id = None
@@ -147,7 +150,7 @@ async def upload_video(
     background_tasks: BackgroundTasks,
     video: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     """Upload video for a practice session and trigger processing."""
     # Validate file type
@@ -181,19 +184,12 @@ async def upload_video(
     storage_service = get_storage_service()
     video_key = f"videos/original/session_{session_id}_{video.filename}"
     
-    # Save video to temporary file
-    import tempfile
-    with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-        content = await video.read()
-        tmp_file.write(content)
-        tmp_file.flush()
-        
-        # Upload to S3
-        await storage_service.upload_file(
-            tmp_file.name,
-            video_key,
-            content_type=video.content_type
-        )
+    # Stream to S3 part by part rather than reading the whole video
+    await storage_service.upload_stream(
+        read_chunks(video),
+        video_key,
+        content_type=video.content_type
+    )
     
     # Update session
     session.video_url = video_key
@@ -222,7 +218,7 @@ async def trigger_processing(
     session_id: int,
     request: VideoProcessingRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     """Manually trigger video processing for a session."""
     # Get practice session
@@ -264,11 +260,28 @@ async def trigger_processing(
 
 @router.get("/{session_id}/status", response_model=VideoProcessingStatus)
 async def get_processing_status(
-    session_id: int,
+    session_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
-    """Get video processing status for a session."""
+    """
+    Get video processing status for a session.
+    
+    While a job runs, polls are answered from the live progress in Redis;
+    the session row is only read once there's a final result to return.
+    """
+    live = await read_progress(session_id)
+    if (
+        live
+        and live.get("status") == ProcessingStatus.PROCESSING.value
+        and live.get("user_id") == str(current_user.id)
+    ):
+        return VideoProcessingStatus(
+            session_id=session_id,
+            status=ProcessingStatus.PROCESSING,
+            progress=min(live.get("progress", 0), 1.0)
+        )
+    
     # Get practice session
     session = await db.get(PracticeSession, session_id)
     if not session:
@@ -295,7 +308,7 @@ async def get_download_url(
     quality: Optional[VideoQuality] = VideoQuality.MEDIUM,
     file_type: str = "video",
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     """Get presigned download URL for processed video."""
     # Get practice session
@@ -355,7 +368,7 @@ async def get_download_url(
 async def process_batch(
     request: BatchProcessingRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     """Process multiple videos in batch."""
     # Validate sessions
@@ -394,11 +407,113 @@ async def process_batch(
     )
 
 
+async def _get_hls_package(
+    session_id: uuid.UUID,
+    db: AsyncSession,
+    current_user: AuthenticatedUser
+) -> dict:
+    """HLS package info of a processed session the user may watch."""
+    session = await db.get(PracticeSession, session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Practice session not found")
+    
+    if session.student_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    if session.processing_status != ProcessingStatus.COMPLETED:
+        raise HTTPException(status_code=400, detail="Video processing not completed")
+    
+    hls = (session.processing_result or {}).get("hls")
+    if not hls:
+        raise HTTPException(status_code=404, detail="No adaptive stream for this session")
+    
+    return hls
+
+
+@router.get("/{session_id}/hls/master.m3u8")
+async def get_hls_master_playlist(
+    session_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    """
+    HLS master playlist for a processed video.
+    
+    Variant URIs are relative, so players request them from the endpoint
+    below with the same credentials.
+    """
+    hls = await _get_hls_package(session_id, db, current_user)
+    
+    playlist = await get_storage_service().get_bytes(hls["master"])
+    if playlist is None:
+        raise HTTPException(status_code=404, detail="Master playlist not found")
+    
+    return Response(content=playlist, media_type=HLS_CONTENT_TYPES[".m3u8"])
+
+
+@router.get("/{session_id}/hls/{quality}/index.m3u8")
+async def get_hls_media_playlist(
+    session_id: uuid.UUID,
+    quality: VideoQuality,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    """
+    HLS media playlist for one quality, with presigned segment URLs.
+    
+    Segments are then fetched straight from storage, never through the API.
+    Players re-fetch playlists often, so the signed playlist is cached for a
+    while shorter than its URLs stay valid instead of signing every segment
+    on each request.
+    """
+    hls = await _get_hls_package(session_id, db, current_user)
+    
+    variant = hls["variants"].get(quality.value)
+    if not variant:
+        raise HTTPException(status_code=404, detail=f"No stream for quality: {quality.value}")
+    
+    cache_key = CacheKeys.format(CacheKeys.HLS_SIGNED_PLAYLIST, object_key=variant["path"])
+    signed_playlist = await cache_get(cache_key, deserialize=False)
+    
+    if signed_playlist is None:
+        storage_service = get_storage_service()
+        playlist = await storage_service.get_bytes(variant["path"])
+        if playlist is None:
+            raise HTTPException(status_code=404, detail="Media playlist not found")
+        playlist = playlist.decode()
+        
+        variant_prefix = variant["path"].rsplit("/", 1)[0]
+        uris = playlist_uris(playlist)
+        signed = await asyncio.gather(*[
+            storage_service.generate_presigned_url(
+                f"{variant_prefix}/{uri}",
+                expiration=settings.VIDEO_HLS_URL_EXPIRATION
+            )
+            for uri in uris
+        ])
+        signed_uris = dict(zip(uris, signed))
+        
+        signed_playlist = rewrite_playlist_uris(playlist, signed_uris.__getitem__)
+        await cache_set(
+            cache_key,
+            signed_playlist,
+            expire=settings.VIDEO_HLS_PLAYLIST_CACHE_TTL,
+            serialize=False
+        )
+    
+    return Response(
+        content=signed_playlist,
+        media_type=HLS_CONTENT_TYPES[".m3u8"],
+        # Presigned URLs expire; don't let players cache the playlist longer
+        headers={"Cache-Control": "private, max-age=300"}
+    )
+
+
 @router.get("/{session_id}/thumbnails", response_model=List[VideoDownloadUrl])
 async def get_thumbnails(
     session_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     """Get thumbnail URLs for a processed video."""
     # Get practice session
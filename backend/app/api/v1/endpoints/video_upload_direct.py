@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
 from app.api.deps import get_current_user
-from app.models.user import User
+from app.schemas.user import AuthenticatedUser
 from app.services.storage import StorageService
 from app.schemas.video_processing import VideoUploadResponse
 from app.core.config import settings
@@ -29,7 +29,7 @@ async def upload_video_direct(
     video: UploadFile = File(...),
     local_session_id: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     """Upload video directly without requiring a session ID."""
     # Validate file type
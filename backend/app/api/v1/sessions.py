@@ -8,7 +8,7 @@ from sqlalchemy import select
 
 from app.db.session import get_db
 from app.api.deps import get_current_active_user, get_current_student, get_current_teacher
-from app.models.user import User
+from app.schemas.user import AuthenticatedUser
 from app.services.practice.session_service import SessionService
 from app.schemas.practice import (
     PracticeSession,
@@ -25,7 +25,7 @@ router = APIRouter()
 @router.post("/", response_model=PracticeSession)
 async def create_session(
     session_data: PracticeSessionCreate,
-    current_user: Annotated[User, Depends(get_current_student)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_student)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> PracticeSession:
     """Create a new practice session"""
@@ -58,7 +58,7 @@ async def create_session(
 
 @router.get("/", response_model=List[PracticeSession])
 async def get_sessions(
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_active_user)],
     db: Annotated[AsyncSession, Depends(get_db)],
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
@@ -129,7 +129,7 @@ async def get_sessions(
 
 @router.get("/statistics", response_model=PracticeStatistics)
 async def get_statistics(
-    current_user: Annotated[User, Depends(get_current_student)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_student)],
     db: Annotated[AsyncSession, Depends(get_db)],
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
@@ -146,7 +146,7 @@ async def get_statistics(
 @router.get("/{session_id}", response_model=PracticeSession)
 async def get_session(
     session_id: UUID,
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_active_user)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> PracticeSession:
     """Get a specific practice session"""
@@ -204,7 +204,7 @@ async def get_session(
 async def update_session(
     session_id: UUID,
     session_update: PracticeSessionUpdate,
-    current_user: Annotated[User, Depends(get_current_student)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_student)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> PracticeSession:
     """Update a practice session"""
@@ -244,7 +244,7 @@ async def update_session(
 @router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_session(
     session_id: UUID,
-    current_user: Annotated[User, Depends(get_current_student)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_student)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> None:
     """Delete a practice session"""
@@ -266,7 +266,7 @@ async def delete_session(
 @router.get("/students/{student_id}/sessions", response_model=List[PracticeSession])
 async def get_student_sessions(
     student_id: UUID,
-    current_user: Annotated[User, Depends(get_current_teacher)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_teacher)],
     db: Annotated[AsyncSession, Depends(get_db)],
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
@@ -316,7 +316,7 @@ async def get_student_sessions(
 
 @router.get("/search", response_model=List[PracticeSession])
 async def search_sessions(
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_active_user)],
     db: Annotated[AsyncSession, Depends(get_db)],
     q: str = Query(..., description="Search query for techniques in focus, notes, and tags"),
     skip: int = Query(0, ge=0),
@@ -7,19 +7,23 @@ from fastapi import (
 )
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from starlette.requests import ClientDisconnect
 import json
 
 from app.db.session import get_db
 from app.api.deps import get_current_active_user, get_current_student
-from app.models.user import User
+from app.schemas.user import AuthenticatedUser
+from app.models.practice import PracticeSession
 from app.services.media.video_service import VideoService
+from app.services.media.resumable_upload import UploadError
+from app.services.media.processing_queue import queue_session_processing
 from app.schemas.video import (
     VideoUploadInit, VideoUploadResponse, VideoUploadStatus,
     VideoUploadComplete, Video, VideoWithPresignedUrl
 )
 from app.core.tus import (
     TusResponse, TusValidator, TusMetadata,
-    parse_checksum_header, verify_chunk_checksum
+    parse_checksum_header
 )
 from app.core.config import settings
 
@@ -27,12 +31,29 @@ from app.core.config import settings
 router = APIRouter()
 
 
+async def finalize_upload(
+    service: VideoService,
+    db: AsyncSession,
+    upload_id: str,
+    student_id: UUID
+) -> None:
+    """
+    Finalize a fully received upload and queue its processing.
+    
+    Safe to repeat: a retried request finds the processing job already
+    queued instead of starting another.
+    """
+    video = await service.complete_upload(upload_id, student_id)
+    session = await db.get(PracticeSession, video.session_id)
+    await queue_session_processing(db, session, upload_id, video.s3_key)
+
+
 # Standard REST endpoints
 
 @router.post("/upload/init", response_model=VideoUploadResponse)
 async def init_video_upload(
     upload_data: VideoUploadInit,
-    current_user: Annotated[User, Depends(get_current_student)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_student)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> VideoUploadResponse:
     """Initialize a video upload for a practice session"""
@@ -51,7 +72,7 @@ async def init_video_upload(
             upload_id=video.upload_id,
             upload_url=upload_url,
             expires_at=video.upload_expires_at,
-            chunk_size=5242880  # 5MB
+            chunk_size=settings.TUS_PART_SIZE
         )
     except ValueError as e:
         raise HTTPException(
@@ -63,7 +84,7 @@ async def init_video_upload(
 @router.get("/upload/{upload_id}/status", response_model=VideoUploadStatus)
 async def get_upload_status(
     upload_id: str,
-    current_user: Annotated[User, Depends(get_current_student)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_student)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> VideoUploadStatus:
     """Get upload status"""
@@ -86,7 +107,7 @@ async def get_upload_status(
 @router.post("/upload/complete", response_model=Video)
 async def complete_upload(
     complete_data: VideoUploadComplete,
-    current_user: Annotated[User, Depends(get_current_student)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_student)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> Video:
     """Complete the upload"""
@@ -108,7 +129,7 @@ async def complete_upload(
 @router.delete("/upload/{upload_id}")
 async def abort_upload(
     upload_id: str,
-    current_user: Annotated[User, Depends(get_current_student)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_student)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> Response:
     """Abort an upload"""
@@ -137,7 +158,7 @@ async def abort_upload(
 @router.get("/{video_id}", response_model=VideoWithPresignedUrl)
 async def get_video(
     video_id: UUID,
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_active_user)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> VideoWithPresignedUrl:
     """Get video with presigned URL"""
@@ -163,7 +184,7 @@ async def get_video(
 @router.get("/session/{session_id}", response_model=List[Video])
 async def get_session_videos(
     session_id: UUID,
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_active_user)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> List[Video]:
     """Get all videos for a session"""
@@ -183,7 +204,7 @@ async def get_session_videos(
 @router.delete("/{video_id}")
 async def delete_video(
     video_id: UUID,
-    current_user: Annotated[User, Depends(get_current_student)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_student)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> Response:
     """Delete a video"""
@@ -221,7 +242,7 @@ async def tus_options(upload_id: Optional[str] = None) -> Response:
 @router.post("/tus")
 async def tus_create(
     request: Request,
-    current_user: Annotated[User, Depends(get_current_student)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_student)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> Response:
     """Handle TUS POST request for creating upload"""
@@ -269,19 +290,25 @@ async def tus_create(
         # Handle creation-with-upload
         if request.headers.get("Content-Type", "").startswith("application/offset+octet-stream"):
             # Process initial chunk
-            chunk_data = await request.body()
-            if chunk_data:
-                part_number = 1
-                video = await service.update_upload_progress(
+            try:
+                upload = await service.update_upload_progress(
                     upload_id=video.upload_id,
-                    offset=len(chunk_data),
-                    chunk_data=chunk_data,
-                    part_number=part_number
+                    offset=0,
+                    chunks=request.stream()
                 )
-                return TusResponse.created(location, video.upload_offset)
+            except ClientDisconnect:
+                # The upload exists; whatever arrived is kept for the client to resume
+                upload_status = await service.get_upload_status(video.upload_id)
+                return TusResponse.created(location, upload_status.offset)
+            # The whole file may have come with the creation request
+            if upload.completed:
+                await finalize_upload(service, db, video.upload_id, current_user.id)
+            return TusResponse.created(location, upload.offset)
         
         return TusResponse.created(location)
         
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -292,7 +319,7 @@ async def tus_create(
 @router.head("/tus/{upload_id}")
 async def tus_head(
     upload_id: str,
-    current_user: Annotated[User, Depends(get_current_student)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_student)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> Response:
     """Handle TUS HEAD request"""
@@ -339,7 +366,7 @@ async def tus_head(
 async def tus_patch(
     upload_id: str,
     request: Request,
-    current_user: Annotated[User, Depends(get_current_student)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_student)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> Response:
     """Handle TUS PATCH request for uploading chunks"""
@@ -364,50 +391,42 @@ async def tus_patch(
         )
     
     if upload_status.completed:
+        # A retried final PATCH; make sure the upload was finalized
+        try:
+            await finalize_upload(service, db, upload_id, current_user.id)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
         return TusResponse.patch_success(upload_status.size)
     
     # Validate offset
     expected_offset = upload_status.offset
     TusValidator.validate_offset(request, expected_offset)
     
-    # Read chunk data
-    chunk_data = await request.body()
-    chunk_size = len(chunk_data)
-    
-    if chunk_size == 0:
-        return TusResponse.patch_success(expected_offset)
-    
-    # Verify checksum if provided
-    checksum_header = request.headers.get("Upload-Checksum")
-    if checksum_header:
-        checksum_info = parse_checksum_header(checksum_header)
-        if checksum_info:
-            algorithm, expected_checksum = checksum_info
-            if not verify_chunk_checksum(chunk_data, algorithm, expected_checksum):
-                raise HTTPException(
-                    status_code=460,  # Custom status code for checksum mismatch
-                    detail="Checksum mismatch"
-                )
-    
-    # Calculate part number (5MB parts)
-    part_size = 5 * 1024 * 1024
-    part_number = (expected_offset // part_size) + 1
-    
-    # Update upload progress
+    # Stream the body into S3 parts; the offset is checked again under
+    # the upload's lock
     try:
-        video = await service.update_upload_progress(
+        upload = await service.update_upload_progress(
             upload_id=upload_id,
-            offset=expected_offset + chunk_size,
-            chunk_data=chunk_data,
-            part_number=part_number
+            offset=expected_offset,
+            chunks=request.stream(),
+            checksum=parse_checksum_header(request.headers.get("Upload-Checksum"))
         )
         
-        # If upload is complete, finalize it
-        if video.upload_completed:
-            await service.complete_upload(upload_id, current_user.id)
+        # If upload is complete, finalize it and queue processing
+        if upload.completed:
+            await finalize_upload(service, db, upload_id, current_user.id)
         
-        return TusResponse.patch_success(video.upload_offset)
+        return TusResponse.patch_success(upload.offset)
         
+    except ClientDisconnect:
+        # Whatever arrived is kept; the client resumes from this offset
+        upload_status = await service.get_upload_status(upload_id)
+        return TusResponse.interrupted(upload_status.offset)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -418,7 +437,7 @@ async def tus_patch(
 @router.delete("/tus/{upload_id}")
 async def tus_delete(
     upload_id: str,
-    current_user: Annotated[User, Depends(get_current_student)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_student)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> Response:
     """Handle TUS DELETE request"""
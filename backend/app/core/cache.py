@@ -1,19 +1,24 @@
 """Redis caching utilities."""
-from typing import Optional, Any, Callable
+from typing import Optional, Any, Awaitable, Callable, Dict, Generic, Hashable, Type, TypeVar
+from collections import OrderedDict
 from functools import wraps
 import json
-import pickle
 import asyncio
+import time
 from datetime import timedelta
 import logging
 
 import redis.asyncio as redis
+from pydantic import BaseModel
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
 # Redis connection pool
 redis_pool: Optional[redis.ConnectionPool] = None
+redis_client: Optional[redis.Redis] = None
 
 
 async def get_redis_pool() -> redis.ConnectionPool:
@@ -29,9 +34,11 @@ async def get_redis_pool() -> redis.ConnectionPool:
 
 
 async def get_redis_client() -> redis.Redis:
-    """Get Redis client with connection from pool."""
-    pool = await get_redis_pool()
-    return redis.Redis(connection_pool=pool)
+    """Get the shared Redis client backed by the pool."""
+    global redis_client
+    if redis_client is None:
+        redis_client = redis.Redis(connection_pool=await get_redis_pool())
+    return redis_client
 
 
 class CacheKeys:
@@ -52,6 +59,9 @@ class CacheKeys:
     SESSION_BY_ID = "session:id:{session_id}"
     SESSION_STATS = "session:stats:{user_id}:{days}"
     
+    # Video cache keys
+    HLS_SIGNED_PLAYLIST = "hls:playlist:{object_key}"
+    
     # Challenge cache keys
     USER_CHALLENGES = "challenges:user:{user_id}"
     CHALLENGE_BY_ID = "challenge:id:{challenge_id}"
@@ -78,12 +88,7 @@ async def cache_get(key: str, deserialize: bool = True) -> Optional[Any]:
             return None
         
         if deserialize:
-            try:
-                # Try JSON first
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                # Fall back to pickle
-                return pickle.loads(value)
+            return json.loads(value)
         
         return value
     except Exception as e:
@@ -101,13 +106,10 @@ async def cache_set(
     try:
         client = await get_redis_client()
         
-        if serialize:
-            try:
-                # Try JSON for better interoperability
-                serialized = json.dumps(value)
-            except (TypeError, ValueError):
-                # Fall back to pickle for complex objects
-                serialized = pickle.dumps(value)
+        if isinstance(value, BaseModel):
+            serialized = value.model_dump_json()
+        elif serialize:
+            serialized = json.dumps(value)
         else:
             serialized = value
         
@@ -150,10 +152,259 @@ async def cache_delete_pattern(pattern: str) -> int:
         return 0
 
 
+class LocalCache:
+    """
+    Bounded in-process LRU cache with a fixed lifetime per entry.
+    
+    Only ever touched from the event loop's thread, so it needs no lock.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Value for key, or None if absent or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: Hashable, value: Any):
+        """Store value, evicting the least recently used entry when full."""
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def delete(self, key: Hashable):
+        self._entries.pop(key, None)
+    
+    def clear(self):
+        self._entries.clear()
+
+
+class CacheStats:
+    """Hit, miss and load counters for one cache namespace."""
+    
+    FIELDS = ("local_hits", "redis_hits", "misses", "loads", "coalesced", "errors")
+    
+    def __init__(self):
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+    
+    def snapshot(self) -> Dict[str, int]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+# Stats of every TypedCache, by namespace
+cache_stats: Dict[str, CacheStats] = {}
+
+
+def cache_metrics() -> Dict[str, Dict[str, int]]:
+    """Counters of every typed cache namespace in this process."""
+    return {namespace: stats.snapshot() for namespace, stats in cache_stats.items()}
+
+
+class TypedCache(Generic[ModelT]):
+    """
+    Two-tier cache of one Pydantic model type under a key namespace.
+    
+    Reads are served from a small in-process LRU first, then Redis. Values
+    are stored in Redis as the model's JSON (pydantic-core's serializer) and
+    validated back into the model on the way out, so a cache entry can never
+    come back as a different type. Concurrent misses for the same key within
+    a process share one load.
+    
+    By default the in-process tier is not invalidated across processes; keep
+    local_ttl to the staleness the data can tolerate. With broadcast_deletes,
+    deletes are published over Redis pub/sub and every process drops its
+    copy; the in-process tier is then only used while subscribed.
+    """
+    
+    def __init__(
+        self,
+        namespace: str,
+        model: Type[ModelT],
+        ttl: int = 300,
+        local_ttl: float = 5.0,
+        max_local_entries: Optional[int] = None,
+        client: Optional[redis.Redis] = None,
+        broadcast_deletes: bool = False
+    ):
+        """
+        Args:
+            namespace: Key prefix, e.g. "user:id"; also names the metrics
+            model: Pydantic model stored under this namespace
+            ttl: Seconds entries live in Redis
+            local_ttl: Seconds entries live in-process; 0 disables that tier
+            max_local_entries: In-process LRU bound
+            client: Redis client; defaults to the shared one
+            broadcast_deletes: Publish deletes so other processes drop their
+                in-process copy
+        """
+        self.namespace = namespace
+        self.model = model
+        self.ttl = ttl
+        self.local = None
+        if local_ttl:
+            self.local = LocalCache(max_local_entries or settings.CACHE_LOCAL_MAX_ENTRIES, local_ttl)
+        self.client = client
+        self.stats = cache_stats.setdefault(namespace, CacheStats())
+        self.broadcast_deletes = broadcast_deletes
+        self.channel = f"cache:invalidate:{namespace}"
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribed = False
+    
+    def redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+    
+    async def _redis(self) -> redis.Redis:
+        return self.client or await get_redis_client()
+    
+    def _local_ready(self) -> bool:
+        """Whether the in-process tier may be used on this loop."""
+        if not self.broadcast_deletes:
+            return True
+        
+        # The listener lives on one loop; start one here if it isn't running
+        listener = self._listener
+        if listener is None or listener.done() or listener.get_loop() is not asyncio.get_running_loop():
+            self._subscribed = False
+            self.local.clear()
+            self._listener = asyncio.ensure_future(self._listen())
+        return self._subscribed
+    
+    async def _listen(self):
+        """Drop in-process entries deleted by any process."""
+        pubsub = None
+        try:
+            client = await self._redis()
+            pubsub = client.pubsub()
+            await pubsub.subscribe(self.channel)
+            # Entries cached before now may have missed a delete
+            self.local.clear()
+            self._subscribed = True
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    self.local.delete(message["data"].decode())
+        except Exception as e:
+            self.stats.errors += 1
+            logger.error(f"Cache invalidation listener for {self.namespace} stopped: {e}")
+        finally:
+            if self._listener is asyncio.current_task():
+                self._subscribed = False
+                self.local.clear()
+            if pubsub is not None:
+                await pubsub.aclose()
+    
+    async def get(self, key: str) -> Optional[ModelT]:
+        """Cached value for key, or None on a miss or Redis error."""
+        if self.local and self._local_ready():
+            value = self.local.get(key)
+            if value is not None:
+                self.stats.local_hits += 1
+                return value
+        
+        try:
+            client = await self._redis()
+            raw = await client.get(self.redis_key(key))
+            value = self.model.model_validate_json(raw) if raw is not None else None
+        except Exception as e:
+            self.stats.errors += 1
+            logger.error(f"Cache get error for key {self.redis_key(key)}: {e}")
+            value = None
+        
+        if value is None:
+            self.stats.misses += 1
+            return None
+        
+        self.stats.redis_hits += 1
+        if self.local and self._local_ready():
+            self.local.set(key, value)
+        return value
+    
+    async def set(self, key: str, value: ModelT):
+        """Store value in both tiers; Redis errors are logged and skipped."""
+        if self.local and self._local_ready():
+            self.local.set(key, value)
+        
+        try:
+            client = await self._redis()
+            await client.set(self.redis_key(key), value.model_dump_json(), ex=self.ttl)
+        except Exception as e:
+            self.stats.errors += 1
+            logger.error(f"Cache set error for key {self.redis_key(key)}: {e}")
+    
+    async def delete(self, key: str):
+        """Drop key from this process and Redis; with broadcast_deletes, from every process."""
+        if self.local:
+            self.local.delete(key)
+        
+        try:
+            client = await self._redis()
+            await client.delete(self.redis_key(key))
+            if self.broadcast_deletes:
+                await client.publish(self.channel, key)
+        except Exception as e:
+            self.stats.errors += 1
+            logger.error(f"Cache delete error for key {self.redis_key(key)}: {e}")
+    
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Optional[ModelT]]]
+    ) -> Optional[ModelT]:
+        """
+        Cached value for key, calling loader once on a miss.
+        
+        Callers that miss while a load for the key is already running wait
+        for it instead of starting their own. A None result isn't cached.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+        
+        load = self._inflight.get(key)
+        if load is None:
+            load = asyncio.ensure_future(self._load(key, loader))
+            self._inflight[key] = load
+            load.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.stats.coalesced += 1
+        
+        # A cancelled caller mustn't cancel the load others are waiting on
+        return await asyncio.shield(load)
+    
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Optional[ModelT]]]) -> Optional[ModelT]:
+        self.stats.loads += 1
+        value = await loader()
+        if value is not None:
+            await self.set(key, value)
+        return value
+
+
 def cached(
     key_func: Callable,
     expire: int = 300,  # 5 minutes default
-    prefix: str = ""
+    prefix: str = "",
+    model: Optional[Type[BaseModel]] = None,
+    local_ttl: float = 0
 ) -> Callable:
     """
     Decorator for caching function results.
@@ -162,8 +413,29 @@ def cached(
         key_func: Function to generate cache key from arguments
         expire: Cache expiration in seconds
         prefix: Optional prefix for cache keys
+        model: Pydantic model the function returns; results are then kept
+            in a TypedCache, with single-flight loads
+        local_ttl: Seconds results are also kept in-process (model only)
     """
     def decorator(func: Callable) -> Callable:
+        if model is not None:
+            cache = TypedCache(
+                prefix or f"{func.__module__}.{func.__qualname__}",
+                model,
+                ttl=expire,
+                local_ttl=local_ttl
+            )
+            
+            @wraps(func)
+            async def typed_wrapper(*args, **kwargs):
+                return await cache.get_or_load(
+                    key_func(*args, **kwargs),
+                    lambda: func(*args, **kwargs)
+                )
+            
+            typed_wrapper.cache = cache
+            return typed_wrapper
+        
         @wraps(func)
         async def wrapper(*args, **kwargs):
             # Generate cache key
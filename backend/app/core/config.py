@@ -54,6 +54,9 @@ class Settings(BaseSettings):
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_LOCAL_MAX_ENTRIES: int = 1024  # In-process cache entries per namespace
+    USER_CACHE_TTL: int = 60  # Seconds a user lookup for auth is cached in Redis
+    USER_CACHE_LOCAL_TTL: float = 5.0  # Seconds it is also kept in-process; deletes reach every pod over pub/sub
     
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
@@ -67,6 +70,13 @@ class Settings(BaseSettings):
     S3_ENDPOINT_URL: Optional[str] = None  # For local development with MinIO
     S3_ACCESS_KEY: Optional[str] = None  # Alternative for MinIO
     S3_SECRET_KEY: Optional[str] = None  # Alternative for MinIO
+    S3_MULTIPART_PART_SIZE: int = 8 * 1024 * 1024  # Part size for streamed uploads (S3 minimum 5 MiB)
+    S3_IO_THREADS: int = 16  # Threads running blocking S3 calls, per process
+    S3_MAX_POOL_CONNECTIONS: int = 64  # HTTP connections per S3 client; cover threads x transfer concurrency
+    S3_TRANSFER_CONCURRENCY: int = 4  # Parallel part transfers per file upload/download
+    TUS_PART_SIZE: int = 5 * 1024 * 1024  # S3 part size for TUS uploads; shorter PATCH tails wait in Redis
+    TUS_UPLOAD_TTL: int = 24 * 3600  # Lifetime of an unfinished TUS upload's state
+    TUS_LOCK_TIMEOUT: int = 120  # Seconds a PATCH may hold an upload between parts
     
     # Email
     SMTP_TLS: bool = True
@@ -88,10 +98,35 @@ class Settings(BaseSettings):
     
     # Video Processing
     VIDEO_RETENTION_DAYS: int = 30
+    VIDEO_CLEANUP_BATCH_SIZE: int = 500  # Expired sessions per cleanup page and commit
     VIDEO_PROCESSING_TIMEOUT: int = 3600  # 1 hour
     VIDEO_THUMBNAIL_COUNT: int = 5
     VIDEO_PREVIEW_DURATION: int = 30  # seconds
     SUPPORTED_VIDEO_FORMATS: List[str] = [".mp4", ".mov", ".avi", ".webm", ".mkv"]
+    VIDEO_UPLOAD_WORKERS: int = 4  # Concurrent uploads of processed outputs
+    VIDEO_UPLOAD_QUEUE_SIZE: int = 8  # Uploads in flight before submit blocks
+    VIDEO_HLS_SEGMENT_SECONDS: int = 6
+    VIDEO_HLS_URL_EXPIRATION: int = 6 * 3600  # Presigned segment URLs in served playlists
+    VIDEO_HLS_PLAYLIST_CACHE_TTL: int = 5 * 3600  # Signed playlists are reused this long; keep below the URL expiration
+    VIDEO_SEGMENTED_MIN_DURATION: int = 600  # Seconds; longer videos are transcoded in parallel segments, 0 disables
+    VIDEO_SEGMENT_SECONDS: int = 60  # Source segment length for parallel transcoding
+    VIDEO_PROGRESS_INTERVAL: float = 1.0  # Minimum seconds between progress publishes to Redis
+    VIDEO_PROGRESS_MILESTONE: float = 0.25  # Progress is written to the session at these steps
+    VIDEO_PROGRESS_TTL: int = 24 * 3600  # Lifetime of the live progress hash in Redis
+    VIDEO_QUEUE_SOFT_DEPTH: int = 20  # Waiting video_processing jobs past which new uploads get the lowest priority
+    VIDEO_QUEUE_DEFER_DEPTH: int = 100  # Waiting jobs past which new uploads are also deferred
+    VIDEO_QUEUE_DEFER_SECONDS: int = 300  # Delay for deferred jobs; keep below the broker visibility timeout
+    VIDEO_JOB_DEDUP_TTL: int = 7 * 24 * 3600  # How long an upload's processing job is remembered
+    
+    # Audio Analysis
+    AUDIO_ANALYSIS_STREAMING_THRESHOLD_SECONDS: int = 600  # Analyze longer files block by block
+    AUDIO_ANALYSIS_BLOCK_SECONDS: int = 60
+    AUDIO_ANALYSIS_WORKERS: int = 1  # Threads per analysis; raise on multi-core workers
+    AUDIO_ANALYSIS_CACHE_BACKEND: str = "local"  # local, s3 or none
+    AUDIO_ANALYSIS_CACHE_DIR: Optional[str] = None  # Defaults to a temp directory
+    AUDIO_ANALYSIS_CACHE_PREFIX: str = "analysis-cache"
+    AUDIO_ANALYSIS_SERIES_POINTS: int = 500  # Points per stored time series, spread over the whole recording
+    PRACTICE_METRICS_BATCH_SIZE: int = 5000  # Rows per COPY into practice_metrics
     
     # Rate limiting
     RATE_LIMIT_PER_MINUTE: int = 60
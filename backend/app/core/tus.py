@@ -1,5 +1,5 @@
 """TUS Protocol implementation for resumable file uploads"""
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, List, Tuple, Union
 from datetime import datetime, timedelta
 import json
 import base64
@@ -122,6 +122,17 @@ class TusResponse:
             }
         )
     
+    @staticmethod
+    def interrupted(offset: int) -> Response:
+        """Response for a PATCH body cut short by the client"""
+        return Response(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            headers={
+                "Upload-Offset": str(offset),
+                "Tus-Resumable": "1.0.0"
+            }
+        )
+    
     @staticmethod
     def conflict(message: str = "Upload conflict") -> Response:
         """Response for upload conflicts"""
@@ -215,22 +226,66 @@ def parse_checksum_header(header: Optional[str]) -> Optional[Tuple[str, str]]:
     return algorithm.lower(), checksum
 
 
+def parse_concat_header(header: Optional[str]) -> Optional[Tuple[str, List[str]]]:
+    """
+    Parse Upload-Concat header
+    
+    Returns ("partial", []) or ("final", [upload URL, ...]); None when the
+    header is absent or malformed.
+    """
+    if not header:
+        return None
+    
+    if header == "partial":
+        return "partial", []
+    
+    kind, _, urls = header.partition(";")
+    if kind != "final" or not urls.split():
+        return None
+    
+    return "final", urls.split()
+
+
+CHECKSUM_ALGORITHMS = {
+    "sha1": hashlib.sha1,
+    "md5": hashlib.md5,
+    "sha256": hashlib.sha256,
+}
+
+
+def checksum_hasher(algorithm: str) -> Optional[Any]:
+    """New hash object for an Upload-Checksum algorithm, or None if unsupported"""
+    factory = CHECKSUM_ALGORITHMS.get(algorithm)
+    return factory() if factory else None
+
+
 def verify_chunk_checksum(
-    data: bytes, 
+    data: Union[bytes, Any], 
     algorithm: str, 
     expected: str
 ) -> bool:
-    """Verify chunk checksum"""
-    if algorithm == "sha1":
-        computed = hashlib.sha1(data).hexdigest()
-    elif algorithm == "md5":
-        computed = hashlib.md5(data).hexdigest()
-    elif algorithm == "sha256":
-        computed = hashlib.sha256(data).hexdigest()
+    """
+    Verify chunk checksum
+    
+    data may be the chunk itself or a hash object from checksum_hasher that
+    was fed the chunk as it streamed in. The expected value may be base64
+    (as the TUS checksum extension specifies) or hex.
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        hasher = checksum_hasher(algorithm)
+        if hasher is None:
+            return False
+        hasher.update(data)
     else:
-        return False
+        hasher = data
     
-    return computed.lower() == expected.lower()
+    digest = hasher.digest()
+    if hmac.compare_digest(digest.hex(), expected.lower()):
+        return True
+    try:
+        return hmac.compare_digest(digest, base64.b64decode(expected, validate=True))
+    except ValueError:
+        return False
 
 
 def calculate_expiry(hours: int = 24) -> datetime:
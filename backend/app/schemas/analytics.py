@@ -64,6 +64,13 @@ class AnalysisResultResponse(BaseModel):
         from_attributes = True
 
 
+class RescoreResponse(BaseModel):
+    """Response for a queued re-scoring of a session's analysis."""
+    session_id: UUID
+    task_id: str
+    analysis_version: str = Field(description="Analysis version the session will be scored with")
+
+
 class AnalyticsSummary(BaseModel):
     """Summary of analytics over a time period."""
     total_sessions: int
@@ -39,6 +39,15 @@ class User(UserInDBBase):
     reputation_level: str = "newcomer"
 
 
+class AuthenticatedUser(User):
+    """
+    Read-only view of the signed-in user, as served from the user cache.
+    
+    Carries no relationships or credentials; load the User row for those.
+    """
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
 class UserInDB(UserInDBBase):
     hashed_password: str
 
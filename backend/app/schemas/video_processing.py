@@ -1,5 +1,6 @@
 """Schemas for video processing."""
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Union
+import uuid
 from datetime import datetime
 from pydantic import BaseModel, Field
 from enum import Enum
@@ -75,6 +76,7 @@ class VideoProcessingResult(BaseModel):
     thumbnails: List[ThumbnailInfo]
     audio_track: Optional[AudioTrackInfo] = None
     preview_clip: Optional[Dict] = None
+    hls: Optional[Dict] = None  # Adaptive stream: master playlist and variants
     processing_time: Optional[float] = None
     
     class Config:
@@ -99,7 +101,7 @@ class VideoProcessingRequest(BaseModel):
 class VideoProcessingStatus(BaseModel):
     """Current processing status for a video."""
     
-    session_id: int
+    session_id: Union[uuid.UUID, int]
     status: ProcessingStatus
     progress: float = Field(ge=0.0, le=1.0)
     started_at: Optional[datetime] = None
@@ -1,4 +1,5 @@
 """Analytics services for music practice data."""
 from .audio_analysis import AudioAnalysisService
+from .analysis_cache import AnalysisCache
 
-__all__ = ["AudioAnalysisService"]
\ No newline at end of file
+__all__ = ["AudioAnalysisService", "AnalysisCache"]
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""Content-addressed cache for audio features and analysis results."""
+import io
+import json
+import hashlib
+import logging
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.storage import StorageService
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisCache:
+    """
+    Stores extracted features (.npz) and analysis results (.json) under keys
+    derived from the audio content, so unchanged audio is never re-analyzed.
+
+    Entries live either in a local directory or under a prefix in S3/MinIO.
+    Cache failures are logged and treated as misses; they never fail an
+    analysis.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        storage_service: Optional[StorageService] = None,
+        prefix: str = "analysis-cache"
+    ):
+        self.storage_service = storage_service
+        self.prefix = prefix.strip("/")
+        self.cache_dir = None
+        if storage_service is None:
+            self.cache_dir = Path(cache_dir or Path(tempfile.gettempdir()) / "audio_analysis" / "cache")
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_settings(cls) -> Optional["AnalysisCache"]:
+        """Build the cache configured by AUDIO_ANALYSIS_CACHE_BACKEND, if any."""
+        backend = settings.AUDIO_ANALYSIS_CACHE_BACKEND
+
+        if backend == "none":
+            return None
+        if backend == "s3":
+            storage_service = StorageService(
+                bucket_name=settings.S3_BUCKET_NAME,
+                endpoint_url=settings.S3_ENDPOINT_URL,
+                access_key=settings.S3_ACCESS_KEY or settings.AWS_ACCESS_KEY_ID,
+                secret_key=settings.S3_SECRET_KEY or settings.AWS_SECRET_ACCESS_KEY,
+                region_name=settings.AWS_REGION
+            )
+            return cls(storage_service=storage_service, prefix=settings.AUDIO_ANALYSIS_CACHE_PREFIX)
+        if backend == "local":
+            return cls(cache_dir=settings.AUDIO_ANALYSIS_CACHE_DIR)
+
+        raise ValueError(f"Unsupported audio analysis cache backend: {backend}")
+
+    @staticmethod
+    def file_digest(path: str) -> str:
+        """SHA-256 of a file's bytes, read in chunks."""
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+    @staticmethod
+    def encode_features(features: Dict[str, Any]) -> bytes:
+        """Serialize per-frame features as a compressed .npz archive."""
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **features)
+        return buffer.getvalue()
+
+    @staticmethod
+    def decode_features(data: bytes) -> Dict[str, Any]:
+        """Inverse of encode_features."""
+        with np.load(io.BytesIO(data)) as archive:
+            features = {name: archive[name] for name in archive.files}
+        features["n_samples"] = int(features["n_samples"])
+        return features
+
+    async def get_features(self, key: str) -> Optional[Dict[str, Any]]:
+        """Load cached per-frame features, or None on a miss."""
+        data = await self._read(f"features/{key}.npz")
+        if data is None:
+            return None
+
+        try:
+            return self.decode_features(data)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cached features {key}: {e}")
+            return None
+
+    async def set_features(self, key: str, features: Dict[str, Any]):
+        """Store per-frame features as a compressed .npz archive."""
+        await self._write(f"features/{key}.npz", self.encode_features(features), "application/octet-stream")
+
+    async def get_result(self, key: str) -> Optional[Dict[str, Any]]:
+        """Load a cached analysis result, or None on a miss."""
+        data = await self._read(f"results/{key}.json")
+        if data is None:
+            return None
+
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            logger.warning(f"Discarding unreadable cached result {key}: {e}")
+            return None
+
+    async def set_result(self, key: str, result: Dict[str, Any]):
+        """Store an analysis result as JSON."""
+        data = json.dumps(result, default=float).encode()
+        await self._write(f"results/{key}.json", data, "application/json")
+
+    async def _read(self, name: str) -> Optional[bytes]:
+        try:
+            if self.storage_service is not None:
+                return await self.storage_service.get_bytes(f"{self.prefix}/{name}")
+
+            path = self.cache_dir / name
+            return path.read_bytes() if path.exists() else None
+
+        except Exception as e:
+            logger.warning(f"Audio analysis cache read failed for {name}: {e}")
+            return None
+
+    async def _write(self, name: str, data: bytes, content_type: str):
+        try:
+            if self.storage_service is not None:
+                await self.storage_service.put_bytes(f"{self.prefix}/{name}", data, content_type)
+                return
+
+            path = self.cache_dir / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent readers never see a partial entry
+            tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+            tmp_path.write_bytes(data)
+            tmp_path.replace(path)
+
+        except Exception as e:
+            logger.warning(f"Audio analysis cache write failed for {name}: {e}")
@@ -1,20 +1,39 @@
 """Audio analysis service using librosa for music practice metrics extraction."""
 import os
+import asyncio
 import tempfile
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Any
 import numpy as np
 import librosa
+import soundfile as sf
+import soxr
 from scipy import stats
 
+from app.core.config import settings
+from app.services.analytics.analysis_cache import AnalysisCache
+from app.services.analytics.time_series import downsample, encode_series
+from app.services.storage import StorageService
+
 logger = logging.getLogger(__name__)
 
 
 class AudioAnalysisService:
     """Service for analyzing audio from practice session videos."""
     
-    def __init__(self):
+    # Bump when feature extraction changes; invalidates cached features and results
+    FEATURE_VERSION = "2"
+    # Bump when analyzers or scoring change; cached features are reused
+    ANALYSIS_VERSION = "1.1.0"
+    
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        cache: Optional[AnalysisCache] = None
+    ):
         self.temp_dir = Path(tempfile.gettempdir()) / "audio_analysis"
         self.temp_dir.mkdir(exist_ok=True)
         # Default sample rate for analysis
@@ -23,61 +42,660 @@ class AudioAnalysisService:
         self.frame_length = 2048
         # Hop length between frames
         self.hop_length = 512
+        # Pitch tracking ranges (Hz) and relative peak thresholds
+        self.pitch_fmin = 50
+        self.pitch_fmax = 2000
+        self.pitch_threshold = 0.1
+        self.vibrato_fmin = 100
+        self.vibrato_fmax = 1000
+        self.vibrato_threshold = 0.2
+        # Recordings longer than this are analyzed block by block
+        self.streaming_threshold_seconds = settings.AUDIO_ANALYSIS_STREAMING_THRESHOLD_SECONDS
+        # Block size for streaming analysis, in frames
+        self.stream_block_frames = int(
+            settings.AUDIO_ANALYSIS_BLOCK_SECONDS * self.sr / self.hop_length
+        )
+        # Extra context on each side of a block, in frames; covers the STFT
+        # window and the onset envelope's look-back so block edges are exact
+        self.stream_margin_frames = 16
+        # Threads used to run analyzers and streaming blocks concurrently;
+        # 1 keeps everything on the calling thread
+        self.max_workers = max(1, max_workers or settings.AUDIO_ANALYSIS_WORKERS)
+        # Maximum points per time series in the results
+        self.series_points = settings.AUDIO_ANALYSIS_SERIES_POINTS
+        # Content-addressed store for features and results
+        self.cache = cache if cache is not None else AnalysisCache.from_settings()
     
-    async def analyze_audio_file(self, audio_path: str) -> Dict[str, Any]:
+    async def analyze_audio_file(
+        self,
+        audio_path: str,
+        streaming: Optional[bool] = None,
+        force: bool = False
+    ) -> Dict[str, Any]:
         """
         Perform comprehensive audio analysis on a file.
         
+        Results and extracted features are cached by audio content, so
+        re-analyzing unchanged audio returns immediately, and a new
+        ANALYSIS_VERSION only re-runs the analyzers on cached features.
+        
         Args:
             audio_path: Path to the audio file
+            streaming: Analyze in fixed-size blocks instead of loading the
+                whole signal. Defaults to streaming for recordings longer
+                than the configured threshold.
+            force: Ignore cached features and results and recompute both
             
         Returns:
             Dictionary containing analysis results
         """
         try:
-            # Load audio file
-            y, sr = librosa.load(audio_path, sr=self.sr)
-            
-            # Perform various analyses
-            tempo_data = await self._analyze_tempo(y, sr)
-            pitch_data = await self._analyze_pitch(y, sr)
-            dynamics_data = await self._analyze_dynamics(y, sr)
-            vibrato_data = await self._analyze_vibrato(y, sr)
-            onset_data = await self._analyze_note_onsets(y, sr)
-            
-            # Calculate overall metrics
-            overall_metrics = await self._calculate_overall_metrics(
-                tempo_data, pitch_data, dynamics_data, vibrato_data
+            digest = self.cache.file_digest(audio_path) if self.cache is not None else None
+            return await self._analyze_cached(
+                digest,
+                lambda: self._extract_file_features(audio_path, streaming),
+                force
             )
             
-            return {
-                "duration": float(len(y) / sr),
-                "sample_rate": sr,
-                "tempo": tempo_data,
-                "pitch": pitch_data,
-                "dynamics": dynamics_data,
-                "vibrato": vibrato_data,
-                "note_onsets": onset_data,
-                "overall_metrics": overall_metrics,
-                "timestamps": {
-                    "frame_length": self.frame_length,
-                    "hop_length": self.hop_length,
-                    "frames_per_second": sr / self.hop_length
-                }
-            }
-            
         except Exception as e:
             logger.error(f"Error analyzing audio file: {e}")
             raise
     
-    async def _analyze_tempo(self, y: np.ndarray, sr: int) -> Dict[str, Any]:
+    async def analyze_pcm_stream(
+        self,
+        chunks: Iterable[np.ndarray],
+        content_digest: Optional[str] = None,
+        force: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Analyze mono float32 PCM at the analysis sample rate, delivered in chunks.
+        
+        Used to analyze audio decoded straight from a video, without writing
+        an intermediate audio file. The chunks are consumed block by block,
+        so memory stays bounded, and not at all on a cache hit.
+        
+        Args:
+            chunks: Iterable of mono float32 sample arrays at self.sr
+            content_digest: Digest of the source the PCM was decoded from,
+                used as the cache key; no caching without it
+            force: Ignore cached features and results and recompute both
+            
+        Returns:
+            Dictionary containing analysis results
+        """
+        try:
+            return await self._analyze_cached(
+                content_digest,
+                lambda: self._extract_features_from_chunks(chunks),
+                force
+            )
+            
+        except Exception as e:
+            logger.error(f"Error analyzing audio stream: {e}")
+            raise
+    
+    async def extract_pcm_features(
+        self,
+        chunks: Iterable[np.ndarray],
+        content_digest: Optional[str] = None,
+        force: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Extract frame features from chunked PCM without running the analyzers.
+        
+        Lets callers keep the features (see save_session_features) and score
+        them with analyze_features.
+        
+        Args:
+            chunks: Iterable of mono float32 sample arrays at self.sr
+            content_digest: Digest of the source, used as the cache key
+            force: Ignore cached features and recompute them
+            
+        Returns:
+            Per-frame feature arrays
+        """
+        feature_key = self._feature_key(content_digest) if self.cache is not None and content_digest else None
+        return await self._cached_features(
+            feature_key,
+            lambda: self._extract_features_from_chunks(chunks),
+            force
+        )
+    
+    async def _analyze_cached(
+        self,
+        digest: Optional[str],
+        extract: Callable[[], Dict[str, Any]],
+        force: bool
+    ) -> Dict[str, Any]:
+        """Analyze through the cache: reuse results, then features, then extract."""
+        feature_key = None
+        
+        if self.cache is not None and digest:
+            feature_key = self._feature_key(digest)
+            
+            if not force:
+                cached = await self.cache.get_result(self._result_key(feature_key))
+                if cached is not None:
+                    logger.info(f"Using cached audio analysis {feature_key}")
+                    return cached
+        
+        features = await self._cached_features(feature_key, extract, force)
+        result = await self.analyze_features(features)
+        
+        if feature_key:
+            await self.cache.set_result(self._result_key(feature_key), result)
+        
+        return result
+    
+    async def _cached_features(
+        self,
+        feature_key: Optional[str],
+        extract: Callable[[], Dict[str, Any]],
+        force: bool
+    ) -> Dict[str, Any]:
+        """Load features from the cache, or extract and cache them."""
+        if feature_key and not force:
+            features = await self.cache.get_features(feature_key)
+            if features is not None:
+                return features
+        
+        # Compute the STFT-derived features once and share them
+        features = extract()
+        if feature_key:
+            await self.cache.set_features(feature_key, features)
+        
+        return features
+    
+    @staticmethod
+    def session_features_key(session_id: Any) -> str:
+        """Object key of a session's stored analysis features."""
+        return f"videos/sessions/{session_id}/analysis/features.npz"
+    
+    async def save_session_features(
+        self,
+        storage_service: StorageService,
+        session_id: Any,
+        features: Dict[str, Any]
+    ) -> str:
+        """
+        Persist a session's frame features so it can be re-scored later.
+        
+        The extraction parameters are stored alongside the arrays so
+        load_session_features can reject features this service can't use.
+        
+        Args:
+            storage_service: Storage to write to
+            session_id: Practice session ID
+            features: Output of the feature extraction stage
+            
+        Returns:
+            Object key of the stored archive
+        """
+        object_key = self.session_features_key(session_id)
+        data = AnalysisCache.encode_features({
+            **features,
+            "feature_version": self.FEATURE_VERSION,
+            "sample_rate": self.sr,
+            "hop_length": self.hop_length,
+            "frame_length": self.frame_length
+        })
+        await storage_service.put_bytes(object_key, data, "application/octet-stream")
+        return object_key
+    
+    async def load_session_features(
+        self,
+        storage_service: StorageService,
+        session_id: Any
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Load a session's stored frame features.
+        
+        Returns:
+            Per-frame features, or None if the session has none stored or
+            they were extracted with different parameters
+        """
+        data = await storage_service.get_bytes(self.session_features_key(session_id))
+        if data is None:
+            return None
+        
+        features = AnalysisCache.decode_features(data)
+        params = (
+            str(features.pop("feature_version")),
+            int(features.pop("sample_rate")),
+            int(features.pop("hop_length")),
+            int(features.pop("frame_length"))
+        )
+        if params != (self.FEATURE_VERSION, self.sr, self.hop_length, self.frame_length):
+            logger.warning(f"Stored features for session {session_id} are stale: {params}")
+            return None
+        
+        return features
+    
+    async def analyze_features(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run every analyzer over previously extracted frame features.
+        
+        Args:
+            features: Output of the feature extraction stage
+            
+        Returns:
+            Dictionary containing analysis results
+        """
+        sr = self.sr
+        
+        # Perform various analyses; they only read the shared features,
+        # so they can run side by side
+        analyzers = [
+            self._analyze_tempo,
+            self._analyze_pitch,
+            self._analyze_dynamics,
+            self._analyze_vibrato,
+            self._analyze_note_onsets
+        ]
+        
+        if self.max_workers > 1:
+            loop = asyncio.get_running_loop()
+            with ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="audio-analysis"
+            ) as executor:
+                results = await asyncio.gather(*[
+                    loop.run_in_executor(executor, analyzer, features, sr)
+                    for analyzer in analyzers
+                ])
+        else:
+            results = [analyzer(features, sr) for analyzer in analyzers]
+        
+        tempo_data, pitch_data, dynamics_data, vibrato_data, onset_data = results
+        
+        # Calculate overall metrics
+        overall_metrics = await self._calculate_overall_metrics(
+            tempo_data, pitch_data, dynamics_data, vibrato_data
+        )
+        
+        return {
+            "duration": float(features["n_samples"] / sr),
+            "sample_rate": sr,
+            "tempo": tempo_data,
+            "pitch": pitch_data,
+            "dynamics": dynamics_data,
+            "vibrato": vibrato_data,
+            "note_onsets": onset_data,
+            "overall_metrics": overall_metrics,
+            "timestamps": {
+                "frame_length": self.frame_length,
+                "hop_length": self.hop_length,
+                "frames_per_second": sr / self.hop_length
+            }
+        }
+    
+    def _feature_key(self, digest: str) -> str:
+        """Cache key for features of the given audio digest and parameters."""
+        return (
+            f"{digest}/v{self.FEATURE_VERSION}"
+            f"-sr{self.sr}-hop{self.hop_length}-frame{self.frame_length}"
+        )
+    
+    def _result_key(self, feature_key: str) -> str:
+        """Cache key for analysis results computed from the given features."""
+        return f"{feature_key}-analysis{self.ANALYSIS_VERSION}"
+    
+    def _extract_file_features(
+        self,
+        audio_path: str,
+        streaming: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """Extract features from a file, whole or block by block."""
+        if streaming is None:
+            streaming = self._should_stream(audio_path)
+        
+        if streaming:
+            return self._extract_features_from_chunks(self._read_resampled_blocks(audio_path))
+        
+        y, _ = librosa.load(audio_path, sr=self.sr)
+        return self._extract_features(y, self.sr)
+    
+    def _should_stream(self, audio_path: str) -> bool:
+        """Decide whether a file is long enough to need block-wise analysis."""
+        try:
+            duration = librosa.get_duration(path=audio_path)
+        except Exception as e:
+            logger.warning(f"Could not read audio duration, loading whole file: {e}")
+            return False
+        return duration > self.streaming_threshold_seconds
+    
+    def _extract_features(self, y: np.ndarray, sr: int) -> Dict[str, Any]:
+        """
+        Shared spectral front end for all analyzers.
+        
+        The magnitude STFT is computed once; the onset envelopes and the
+        pitch tracks are derived from it instead of each analyzer
+        transforming the signal again. Everything is reduced to one value
+        per frame so the spectrogram can be released straight away.
+        
+        Args:
+            y: Audio time series
+            sr: Sample rate
+            
+        Returns:
+            Dictionary of per-frame feature arrays keyed by name
+        """
+        if len(y) == 0:
+            return self._empty_features()
+        
+        S = np.abs(librosa.stft(y, n_fft=self.frame_length, hop_length=self.hop_length))
+        
+        # Same log-power mel spectrogram librosa.onset.onset_strength builds from y
+        log_mel = librosa.power_to_db(librosa.feature.melspectrogram(S=S ** 2, sr=sr))
+        onset_env = librosa.onset.onset_strength(
+            S=log_mel,
+            sr=sr,
+            hop_length=self.hop_length
+        )
+        # beat_track aggregates the spectral flux with a median rather than a mean
+        beat_onset_env = librosa.onset.onset_strength(
+            S=log_mel,
+            sr=sr,
+            hop_length=self.hop_length,
+            aggregate=np.median
+        )
+        del log_mel
+        
+        # Time-domain RMS is a cheap framing pass, no transform involved
+        rms = librosa.feature.rms(y=y, frame_length=self.frame_length, hop_length=self.hop_length)[0]
+        
+        # One pitch track over the widest range; vibrato narrows it down
+        pitches, magnitudes = librosa.piptrack(
+            S=S,
+            sr=sr,
+            n_fft=self.frame_length,
+            hop_length=self.hop_length,
+            fmin=self.pitch_fmin,
+            fmax=self.pitch_fmax,
+            threshold=self.pitch_threshold
+        )
+        pitch, pitch_confidence = self._best_pitch_per_frame(pitches, magnitudes)
+        vibrato_pitch, _ = self._best_pitch_per_frame(
+            *self._vibrato_pitch_track(S, pitches, magnitudes, sr)
+        )
+        
+        return {
+            "n_samples": len(y),
+            "onset_envelope": onset_env,
+            "beat_onset_envelope": beat_onset_env,
+            "rms": rms,
+            "pitch": pitch,
+            "pitch_confidence": pitch_confidence,
+            "vibrato_pitch": vibrato_pitch
+        }
+    
+    def _extract_features_from_chunks(self, chunks: Iterable[np.ndarray]) -> Dict[str, Any]:
+        """
+        Extract the same per-frame features as _extract_features, block by block.
+        
+        Each block is analyzed together with a margin of neighbouring samples
+        and only its own frames are kept, so frames line up with whole-file
+        analysis. Peak memory is bounded by the block size times the number
+        of workers; only the per-frame series grow with the recording length.
+        
+        Args:
+            chunks: Mono float32 sample arrays at self.sr, of any length
+            
+        Returns:
+            Dictionary of per-frame feature arrays keyed by name
+        """
+        hop = self.hop_length
+        block = self.stream_block_frames * hop
+        margin = self.stream_margin_frames * hop
+        
+        buffer = np.zeros(0, dtype=np.float32)
+        buffer_start = 0  # Sample index of buffer[0] within the recording
+        next_frame = 0  # First frame not yet extracted
+        n_samples = 0
+        blocks = []
+        
+        executor = None
+        pending = deque()
+        if self.max_workers > 1:
+            executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="audio-analysis"
+            )
+        
+        def submit(start_frame: int, end_frame: int):
+            if executor is None:
+                blocks.append(
+                    self._extract_block_features(buffer, buffer_start, start_frame, end_frame)
+                )
+                return
+            # Bound the blocks in flight so memory stays bounded too
+            if len(pending) >= self.max_workers:
+                blocks.append(pending.popleft().result())
+            pending.append(executor.submit(
+                self._extract_block_features, buffer, buffer_start, start_frame, end_frame
+            ))
+        
+        try:
+            for chunk in chunks:
+                buffer = np.concatenate([buffer, chunk])
+                n_samples += len(chunk)
+                
+                # Emit every block whose right-hand margin has arrived
+                while n_samples >= next_frame * hop + block + margin:
+                    end_frame = next_frame + self.stream_block_frames
+                    submit(next_frame, end_frame)
+                    next_frame = end_frame
+                    
+                    # Drop samples no later block will look at
+                    keep_from = max(0, next_frame * hop - margin)
+                    buffer = buffer[keep_from - buffer_start:]
+                    buffer_start = keep_from
+            
+            # Remaining frames up to the end of the recording (centered framing)
+            total_frames = 1 + n_samples // hop
+            if n_samples and next_frame < total_frames:
+                submit(next_frame, total_frames)
+            
+            while pending:
+                blocks.append(pending.popleft().result())
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+        
+        # Nothing was decoded (empty or zero-length recording)
+        if not blocks:
+            return self._empty_features()
+        
+        features = {
+            key: np.concatenate([b[key] for b in blocks])
+            for key in blocks[0]
+            if key != "n_samples"
+        }
+        features["n_samples"] = n_samples
+        return features
+    
+    @staticmethod
+    def _empty_features() -> Dict[str, Any]:
+        """Features of a recording without samples; every analyzer falls back to its defaults."""
+        features = {
+            key: np.zeros(0, dtype=np.float32)
+            for key in (
+                "onset_envelope",
+                "beat_onset_envelope",
+                "rms",
+                "pitch",
+                "pitch_confidence",
+                "vibrato_pitch"
+            )
+        }
+        features["n_samples"] = 0
+        return features
+    
+    def _extract_block_features(
+        self,
+        buffer: np.ndarray,
+        buffer_start: int,
+        start_frame: int,
+        end_frame: int
+    ) -> Dict[str, Any]:
+        """Extract features for frames [start_frame, end_frame) from a sample buffer."""
+        hop = self.hop_length
+        margin = self.stream_margin_frames * hop
+        
+        segment_start = max(buffer_start, start_frame * hop - margin)
+        segment_end = min(buffer_start + len(buffer), end_frame * hop + margin)
+        segment = buffer[segment_start - buffer_start:segment_end - buffer_start]
+        
+        features = self._extract_features(segment, self.sr)
+        
+        # Segments always start on a hop boundary, so frames map one-to-one
+        offset = segment_start // hop
+        keep = slice(start_frame - offset, end_frame - offset)
+        return {
+            key: value[keep] if isinstance(value, np.ndarray) else value
+            for key, value in features.items()
+        }
+    
+    def _read_resampled_blocks(self, audio_path: str) -> Iterator[np.ndarray]:
+        """Yield the file as mono float32 chunks at the analysis sample rate."""
+        block_size = self.stream_block_frames * self.hop_length
+        
+        with sf.SoundFile(audio_path) as audio_file:
+            resampler = None
+            if audio_file.samplerate != self.sr:
+                resampler = soxr.ResampleStream(
+                    audio_file.samplerate, self.sr, 1, dtype="float32", quality="HQ"
+                )
+            
+            for block in audio_file.blocks(blocksize=block_size, dtype="float32", always_2d=True):
+                mono = block.mean(axis=1)
+                yield resampler.resample_chunk(mono) if resampler else mono
+            
+            if resampler:
+                yield resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+    
+    def _vibrato_pitch_track(
+        self,
+        S: np.ndarray,
+        pitches: np.ndarray,
+        magnitudes: np.ndarray,
+        sr: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Narrow the shared pitch track to the vibrato range and threshold.
+        
+        A peak above the stricter threshold is a local maximum regardless of
+        which threshold piptrack was run with, so this matches a separate
+        piptrack call with the vibrato parameters.
+        """
+        fft_freqs = librosa.fft_frequencies(sr=sr, n_fft=self.frame_length)
+        freq_mask = (self.vibrato_fmin <= fft_freqs) & (fft_freqs < self.vibrato_fmax)
+        peak_mask = freq_mask[:, np.newaxis] & (
+            S > self.vibrato_threshold * S.max(axis=0, keepdims=True)
+        )
+        
+        return np.where(peak_mask, pitches, 0.0), np.where(peak_mask, magnitudes, 0.0)
+    
+    def _tempo_track(self, onset_env: np.ndarray, sr: int) -> Tuple[float, np.ndarray]:
+        """
+        Global and per-frame tempo from an onset envelope.
+        
+        Equivalent to librosa's tempo estimate with mean and no aggregation,
+        but the tempogram (one autocorrelation column per frame) is built one
+        block at a time instead of for the whole recording at once.
+        
+        Returns:
+            Tuple of (global BPM, per-frame BPM array)
+        """
+        # Same autocorrelation window librosa.feature.tempo uses by default
+        win_length = librosa.time_to_frames(8.0, sr=sr, hop_length=self.hop_length).item()
+        margin = win_length // 2 + 1
+        n_frames = len(onset_env)
+        
+        tg_sum = np.zeros((win_length, 1))
+        dtempo = []
+        for start in range(0, n_frames, self.stream_block_frames):
+            end = min(start + self.stream_block_frames, n_frames)
+            lo = max(0, start - margin)
+            hi = min(n_frames, end + margin)
+            
+            tg = librosa.feature.tempogram(
+                onset_envelope=onset_env[lo:hi],
+                sr=sr,
+                hop_length=self.hop_length,
+                win_length=win_length
+            )[:, start - lo:end - lo]
+            
+            tg_sum += tg.sum(axis=1, keepdims=True)
+            dtempo.append(
+                librosa.feature.tempo(tg=tg, sr=sr, hop_length=self.hop_length, aggregate=None)
+            )
+        
+        bpm = librosa.feature.tempo(
+            tg=tg_sum / max(n_frames, 1),
+            sr=sr,
+            hop_length=self.hop_length,
+            aggregate=None
+        )[0]
+        
+        return float(bpm), np.concatenate(dtempo) if dtempo else np.zeros(0)
+    
+    def _frame_series(
+        self,
+        values: np.ndarray,
+        features: Dict[str, Any],
+        sr: int,
+        frames: Optional[np.ndarray] = None,
+        means: Optional[Dict[str, np.ndarray]] = None
+    ) -> Dict[str, Any]:
+        """
+        Downsample a per-frame series over the whole recording and encode it.
+        
+        Args:
+            values: Per-frame values, or values at the given frames
+            features: Frame features (for the recording length)
+            sr: Sample rate
+            frames: Frame indices of values when not every frame has one
+            means: Extra arrays aligned with values to average per point
+        """
+        if frames is None:
+            frames = np.arange(len(values))
+        times = librosa.frames_to_time(frames, sr=sr, hop_length=self.hop_length)
+        
+        return encode_series(downsample(
+            times,
+            values,
+            self.series_points,
+            duration=features["n_samples"] / sr,
+            means=means
+        ))
+    
+    @staticmethod
+    def _best_pitch_per_frame(
+        pitches: np.ndarray,
+        magnitudes: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Pick the strongest pitch bin of every frame in a single argmax."""
+        frames = np.arange(pitches.shape[1])
+        best_bins = magnitudes.argmax(axis=0)
+        return pitches[best_bins, frames], magnitudes[best_bins, frames]
+    
+    def _analyze_tempo(self, features: Dict[str, Any], sr: int) -> Dict[str, Any]:
         """Analyze tempo and rhythm consistency."""
         try:
+            # Global tempo estimate, as beat_track would make it internally
+            bpm, _ = self._tempo_track(features["beat_onset_envelope"], sr)
+            
             # Detect tempo and beats
-            tempo, beats = librosa.beat.beat_track(y=y, sr=sr)
+            tempo, beats = librosa.beat.beat_track(
+                onset_envelope=features["beat_onset_envelope"],
+                sr=sr,
+                hop_length=self.hop_length,
+                bpm=bpm
+            )
             
             # Get beat times
-            beat_times = librosa.frames_to_time(beats, sr=sr)
+            beat_times = librosa.frames_to_time(beats, sr=sr, hop_length=self.hop_length)
             
             # Calculate inter-beat intervals
             if len(beat_times) > 1:
@@ -88,18 +706,16 @@ class AudioAnalysisService:
                 tempo_stability = 0.0
             
             # Dynamic tempo tracking (tempo over time)
-            onset_env = librosa.onset.onset_strength(y=y, sr=sr)
-            dtempo = librosa.beat.tempo(
-                onset_envelope=onset_env,
-                sr=sr,
-                aggregate=None
-            )
+            _, dtempo = self._tempo_track(features["onset_envelope"], sr)
             
             return {
                 "bpm": float(tempo),
-                "beat_times": beat_times.tolist(),
+                # Inter-beat intervals at each beat, bounded like the other series
+                "beat_interval_series": self._frame_series(
+                    np.asarray(beat_intervals), features, sr, frames=beats[1:]
+                ),
                 "tempo_stability": float(tempo_stability),
-                "tempo_variations": dtempo.tolist() if len(dtempo.shape) > 0 else [float(tempo)],
+                "tempo_series": self._frame_series(dtempo, features, sr),
                 "beat_count": len(beats),
                 "average_beat_interval": float(np.mean(beat_intervals)) if len(beat_intervals) > 0 else 0.0
             }
@@ -108,39 +724,24 @@ class AudioAnalysisService:
             logger.error(f"Error analyzing tempo: {e}")
             return {
                 "bpm": 0.0,
-                "beat_times": [],
+                "beat_interval_series": None,
                 "tempo_stability": 0.0,
-                "tempo_variations": [],
+                "tempo_series": None,
                 "beat_count": 0,
                 "average_beat_interval": 0.0
             }
     
-    async def _analyze_pitch(self, y: np.ndarray, sr: int) -> Dict[str, Any]:
+    def _analyze_pitch(self, features: Dict[str, Any], sr: int) -> Dict[str, Any]:
         """Analyze pitch accuracy and stability."""
         try:
-            # Extract pitch using piptrack
-            pitches, magnitudes = librosa.piptrack(
-                y=y,
-                sr=sr,
-                fmin=50,  # Minimum frequency
-                fmax=2000,  # Maximum frequency
-                threshold=0.1
-            )
-            
             # Get pitch values over time
-            pitch_values = []
-            pitch_confidences = []
+            frame_pitches = features["pitch"]
+            frame_confidences = features["pitch_confidence"]
+            voiced = np.flatnonzero(frame_pitches > 0)  # Valid pitch detected
+            pitch_values = frame_pitches[voiced].astype(np.float64)
+            pitch_confidences = frame_confidences[voiced].astype(np.float64)
             
-            for t in range(pitches.shape[1]):
-                index = magnitudes[:, t].argmax()
-                pitch = pitches[index, t]
-                confidence = magnitudes[index, t]
-                
-                if pitch > 0:  # Valid pitch detected
-                    pitch_values.append(float(pitch))
-                    pitch_confidences.append(float(confidence))
-            
-            if pitch_values:
+            if pitch_values.size:
                 # Convert to MIDI notes for analysis
                 midi_notes = librosa.hz_to_midi(pitch_values)
                 
@@ -165,19 +766,19 @@ class AudioAnalysisService:
                 }
             
             return {
-                "pitch_values": pitch_values[-1000:],  # Last 1000 values to limit size
-                "pitch_confidences": pitch_confidences[-1000:],
+                "pitch_series": self._frame_series(
+                    pitch_values, features, sr, frames=voiced, means={"confidence": pitch_confidences}
+                ),
                 "pitch_stability": float(pitch_stability),
                 "pitch_range": pitch_range,
-                "average_pitch_hz": float(np.mean(pitch_values)) if pitch_values else 0.0,
-                "pitch_detected_ratio": len(pitch_values) / pitches.shape[1]
+                "average_pitch_hz": float(np.mean(pitch_values)) if pitch_values.size else 0.0,
+                "pitch_detected_ratio": len(pitch_values) / len(frame_pitches)
             }
             
         except Exception as e:
             logger.error(f"Error analyzing pitch: {e}")
             return {
-                "pitch_values": [],
-                "pitch_confidences": [],
+                "pitch_series": None,
                 "pitch_stability": 0.0,
                 "pitch_range": {
                     "min_hz": 0.0,
@@ -189,11 +790,10 @@ class AudioAnalysisService:
                 "pitch_detected_ratio": 0.0
             }
     
-    async def _analyze_dynamics(self, y: np.ndarray, sr: int) -> Dict[str, Any]:
+    def _analyze_dynamics(self, features: Dict[str, Any], sr: int) -> Dict[str, Any]:
         """Analyze dynamic range and volume consistency."""
         try:
-            # Calculate RMS energy
-            rms = librosa.feature.rms(y=y, frame_length=self.frame_length, hop_length=self.hop_length)[0]
+            rms = features["rms"]
             
             # Convert to dB
             db = librosa.amplitude_to_db(rms, ref=np.max)
@@ -208,20 +808,22 @@ class AudioAnalysisService:
             dynamics_changes = []
             window_size = int(sr / self.hop_length)  # 1 second window
             
-            for i in range(0, len(db) - window_size, window_size // 2):
-                window = db[i:i + window_size]
-                slope = np.polyfit(range(len(window)), window, 1)[0]
+            # Fit a line to every half-overlapping window in one polyfit call
+            starts = np.arange(0, len(db) - window_size, window_size // 2)
+            if starts.size:
+                windows = np.lib.stride_tricks.sliding_window_view(db, window_size)[starts]
+                slopes = np.polyfit(np.arange(window_size), windows.T, 1)[0]
                 
-                if abs(slope) > 0.5:  # Significant change
-                    dynamics_changes.append({
-                        "time": float(i * self.hop_length / sr),
-                        "type": "crescendo" if slope > 0 else "diminuendo",
-                        "magnitude": float(abs(slope))
-                    })
+                for i, slope in zip(starts, slopes):
+                    if abs(slope) > 0.5:  # Significant change
+                        dynamics_changes.append({
+                            "time": float(i * self.hop_length / sr),
+                            "type": "crescendo" if slope > 0 else "diminuendo",
+                            "magnitude": float(abs(slope))
+                        })
             
             return {
-                "rms_values": rms.tolist()[-1000:],  # Last 1000 values
-                "db_values": db.tolist()[-1000:],
+                "db_series": self._frame_series(db, features, sr, means={"rms": rms}),
                 "dynamic_range_db": dynamic_range,
                 "dynamics_stability": float(dynamics_stability),
                 "average_db": float(np.mean(db)),
@@ -232,8 +834,7 @@ class AudioAnalysisService:
         except Exception as e:
             logger.error(f"Error analyzing dynamics: {e}")
             return {
-                "rms_values": [],
-                "db_values": [],
+                "db_series": None,
                 "dynamic_range_db": 0.0,
                 "dynamics_stability": 0.0,
                 "average_db": 0.0,
@@ -241,51 +842,70 @@ class AudioAnalysisService:
                 "dynamics_changes": []
             }
     
-    async def _analyze_vibrato(self, y: np.ndarray, sr: int) -> Dict[str, Any]:
+    def _analyze_vibrato(self, features: Dict[str, Any], sr: int) -> Dict[str, Any]:
         """Analyze vibrato characteristics."""
         try:
-            # Extract pitch for vibrato analysis
-            pitches, magnitudes = librosa.piptrack(
-                y=y,
-                sr=sr,
-                fmin=100,
-                fmax=1000,
-                threshold=0.2
-            )
+            frame_pitches = features["vibrato_pitch"]
             
             vibrato_segments = []
             
             # Sliding window for vibrato detection
             window_size = int(0.5 * sr / self.hop_length)  # 0.5 second windows
+            window_duration = window_size * self.hop_length / sr
+            starts = np.arange(0, len(frame_pitches) - window_size, window_size // 4)
+            
+            # Windows only look at voiced frames, so work on the voiced
+            # sequence and map each window to its [first, last) slice of it
+            voiced_frames = np.flatnonzero(frame_pitches > 0)
+            voiced_pitches = frame_pitches[voiced_frames].astype(np.float64)
+            first = np.searchsorted(voiced_frames, starts)
+            last = np.searchsorted(voiced_frames, starts + window_size)
+            counts = last - first
             
-            for i in range(0, pitches.shape[1] - window_size, window_size // 4):
-                window_pitches = []
+            # Enough valid pitches
+            candidates = np.flatnonzero(counts > window_size * 0.8)
+            
+            if candidates.size:
+                # Simple vibrato detection based on zero crossings: a turn in the
+                # pitch contour between voiced steps k and k+1 lies inside a
+                # window when first <= k <= last - 3
+                pitch_diff = np.diff(voiced_pitches)
+                turns = np.diff(np.sign(pitch_diff)) != 0
+                turn_sums = np.concatenate(([0], np.cumsum(turns)))
                 
-                for t in range(i, min(i + window_size, pitches.shape[1])):
-                    index = magnitudes[:, t].argmax()
-                    pitch = pitches[index, t]
-                    if pitch > 0:
-                        window_pitches.append(pitch)
+                # Windowed mean/std from prefix sums, centred for precision
+                offset = voiced_pitches.mean()
+                centred = voiced_pitches - offset
+                sums = np.concatenate(([0.0], np.cumsum(centred)))
+                square_sums = np.concatenate(([0.0], np.cumsum(centred ** 2)))
                 
-                if len(window_pitches) > window_size * 0.8:  # Enough valid pitches
-                    # Detect periodic variation
-                    pitch_array = np.array(window_pitches)
-                    pitch_diff = np.diff(pitch_array)
-                    
-                    # Simple vibrato detection based on zero crossings
-                    zero_crossings = np.where(np.diff(np.sign(pitch_diff)))[0]
-                    
-                    if len(zero_crossings) > 4:  # At least 2 cycles
-                        vibrato_rate = len(zero_crossings) / (window_size * self.hop_length / sr) / 2
-                        vibrato_extent = np.std(pitch_array) / np.mean(pitch_array) * 100
-                        
-                        if 4 <= vibrato_rate <= 8 and vibrato_extent > 0.5:  # Typical vibrato range
-                            vibrato_segments.append({
-                                "time": float(i * self.hop_length / sr),
-                                "duration": float(window_size * self.hop_length / sr),
-                                "rate_hz": float(vibrato_rate),
-                                "extent_percent": float(vibrato_extent)
-                            })
+                w_first = first[candidates]
+                w_last = last[candidates]
+                w_counts = counts[candidates]
+                zero_crossings = turn_sums[w_last - 2] - turn_sums[w_first]
+                
+                w_mean = (sums[w_last] - sums[w_first]) / w_counts
+                w_var = (square_sums[w_last] - square_sums[w_first]) / w_counts - w_mean ** 2
+                w_std = np.sqrt(np.maximum(w_var, 0.0))
+                w_mean += offset
+                
+                vibrato_rate = zero_crossings / window_duration / 2
+                vibrato_extent = w_std / w_mean * 100
+                
+                # At least 2 cycles within the typical vibrato range
+                is_vibrato = (
+                    (zero_crossings > 4) &
+                    (vibrato_rate >= 4) & (vibrato_rate <= 8) &
+                    (vibrato_extent > 0.5)
+                )
+                
+                for j in np.flatnonzero(is_vibrato):
+                    vibrato_segments.append({
+                        "time": float(starts[candidates[j]] * self.hop_length / sr),
+                        "duration": float(window_duration),
+                        "rate_hz": float(vibrato_rate[j]),
+                        "extent_percent": float(vibrato_extent[j])
+                    })
             
             # Calculate overall vibrato metrics
             if vibrato_segments:
@@ -302,7 +922,7 @@ class AudioAnalysisService:
                 "average_rate_hz": float(avg_rate),
                 "average_extent_percent": float(avg_extent),
                 "vibrato_consistency": float(consistency),
-                "vibrato_presence_ratio": len(vibrato_segments) * window_size * self.hop_length / len(y)
+                "vibrato_presence_ratio": len(vibrato_segments) * window_size * self.hop_length / features["n_samples"]
             }
             
         except Exception as e:
@@ -315,12 +935,14 @@ class AudioAnalysisService:
                 "vibrato_presence_ratio": 0.0
             }
     
-    async def _analyze_note_onsets(self, y: np.ndarray, sr: int) -> Dict[str, Any]:
+    def _analyze_note_onsets(self, features: Dict[str, Any], sr: int) -> Dict[str, Any]:
         """Detect and analyze note onsets."""
         try:
+            onset_env = features["onset_envelope"]
+            
             # Detect onsets
             onset_frames = librosa.onset.onset_detect(
-                y=y,
+                onset_envelope=onset_env,
                 sr=sr,
                 hop_length=self.hop_length,
                 backtrack=True
@@ -337,15 +959,12 @@ class AudioAnalysisService:
                 onset_intervals = []
                 timing_consistency = 0.0
             
-            # Onset strength
-            onset_env = librosa.onset.onset_strength(y=y, sr=sr, hop_length=self.hop_length)
-            
             return {
                 "onset_times": onset_times.tolist()[:100],  # Limit to first 100
                 "onset_count": len(onset_frames),
                 "timing_consistency": float(timing_consistency),
                 "average_interval": float(np.mean(onset_intervals)) if len(onset_intervals) > 0 else 0.0,
-                "onset_density": len(onset_frames) / (len(y) / sr),  # Onsets per second
+                "onset_density": len(onset_frames) / (features["n_samples"] / sr),  # Onsets per second
                 "onset_strength_mean": float(np.mean(onset_env)),
                 "onset_strength_std": float(np.std(onset_env))
             }
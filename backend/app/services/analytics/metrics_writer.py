@@ -0,0 +1,96 @@
+"""Bulk ingestion of time-series practice metrics."""
+import io
+import csv
+import json
+import logging
+from itertools import islice
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.database import sync_engine
+from app.models.analytics import PracticeMetrics
+
+logger = logging.getLogger(__name__)
+
+COPY_COLUMNS = ("time", "session_id", "metric_type", "value", "confidence", "extra_data")
+
+
+def write_practice_metrics(
+    rows: Iterable[Dict[str, Any]],
+    batch_size: Optional[int] = None,
+    engine: Optional[Engine] = None
+) -> int:
+    """
+    Stream PracticeMetrics rows into the database in batches.
+
+    On PostgreSQL each batch is one COPY, committed on its own, so no
+    transaction is held open for the whole series and concurrent workers
+    only contend for the hypertable briefly. Other databases get a
+    multi-row INSERT per batch.
+
+    Args:
+        rows: Row mappings with PracticeMetrics column names
+        batch_size: Rows per COPY/transaction
+        engine: Sync engine to write through
+
+    Returns:
+        Number of rows written
+    """
+    engine = engine or sync_engine
+    batch_size = batch_size or settings.PRACTICE_METRICS_BATCH_SIZE
+    rows = iter(rows)
+    written = 0
+
+    if engine.dialect.name != "postgresql":
+        while batch := list(islice(rows, batch_size)):
+            with engine.begin() as connection:
+                connection.execute(insert(PracticeMetrics.__table__), batch)
+            written += len(batch)
+        return written
+
+    copy_sql = (
+        f"COPY {PracticeMetrics.__tablename__} ({', '.join(COPY_COLUMNS)}) "
+        "FROM STDIN WITH (FORMAT csv)"
+    )
+    connection = engine.raw_connection()
+    try:
+        while batch := list(islice(rows, batch_size)):
+            with connection.cursor() as cursor:
+                cursor.copy_expert(copy_sql, _csv_buffer(batch))
+            connection.commit()
+            written += len(batch)
+
+    except Exception as e:
+        connection.rollback()
+        logger.error(f"Practice metrics COPY failed after {written} rows: {e}")
+        raise
+
+    finally:
+        connection.close()
+
+    return written
+
+
+def _csv_buffer(batch: Iterable[Dict[str, Any]]) -> io.StringIO:
+    """Render rows as COPY csv; empty unquoted fields load as NULL."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    for row in batch:
+        confidence = row.get("confidence")
+        extra_data = row.get("extra_data")
+        writer.writerow([
+            row["time"].isoformat(),
+            str(row["session_id"]),
+            # SQLAlchemy stores the enum member name
+            row["metric_type"].name,
+            repr(float(row["value"])),
+            "" if confidence is None else repr(float(confidence)),
+            "" if extra_data is None else json.dumps(extra_data)
+        ])
+
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,90 @@
+"""Downsampling and compact encoding of analysis time series."""
+import base64
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+SERIES_ENCODING = "float32-base64"
+
+
+def downsample(
+    times: np.ndarray,
+    values: np.ndarray,
+    max_points: int,
+    duration: Optional[float] = None,
+    means: Optional[Dict[str, np.ndarray]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Reduce a series to at most max_points min/max/mean buckets.
+
+    Buckets are equal slices of time across the whole recording, so the
+    result covers it end to end; buckets without samples (e.g. unvoiced
+    stretches of a pitch track) are dropped rather than filled.
+
+    Args:
+        times: Sample times in seconds, ascending
+        values: Sample values
+        max_points: Maximum number of buckets
+        duration: Length of the recording; defaults to the last sample time
+        means: Extra per-sample arrays to average per bucket (e.g. confidence)
+
+    Returns:
+        Arrays "time" (mean time of each bucket), "min", "max", "mean" and
+        one per entry in means
+    """
+    means = means or {}
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+
+    if values.size == 0:
+        empty = np.zeros(0)
+        return {"time": empty, "min": empty, "max": empty, "mean": empty, **{name: empty for name in means}}
+
+    span = duration if duration else times[-1]
+    if span > 0:
+        buckets = np.minimum((times / span * max_points).astype(np.int64), max_points - 1)
+    else:
+        buckets = np.zeros(times.size, dtype=np.int64)
+
+    # Times are sorted, so each bucket is a contiguous run of samples
+    starts = np.flatnonzero(np.r_[True, np.diff(buckets) != 0])
+    counts = np.diff(np.r_[starts, values.size])
+
+    series = {
+        "time": np.add.reduceat(times, starts) / counts,
+        "min": np.minimum.reduceat(values, starts),
+        "max": np.maximum.reduceat(values, starts),
+        "mean": np.add.reduceat(values, starts) / counts
+    }
+    for name, extra in means.items():
+        series[name] = np.add.reduceat(np.asarray(extra, dtype=np.float64), starts) / counts
+
+    return series
+
+
+def encode_series(series: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """
+    Pack equal-length arrays as base64 little-endian float32.
+
+    About a third of the size of the same numbers as a JSON list, and
+    decodable in the app with a Float32Array over the decoded bytes.
+    """
+    return {
+        "encoding": SERIES_ENCODING,
+        "length": int(len(next(iter(series.values())))) if series else 0,
+        "fields": {
+            name: base64.b64encode(np.asarray(values, dtype="<f4").tobytes()).decode("ascii")
+            for name, values in series.items()
+        }
+    }
+
+
+def decode_series(encoded: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Inverse of encode_series."""
+    if encoded.get("encoding") != SERIES_ENCODING:
+        raise ValueError(f"Unsupported series encoding: {encoded.get('encoding')}")
+
+    return {
+        name: np.frombuffer(base64.b64decode(data), dtype="<f4")
+        for name, data in encoded["fields"].items()
+    }
@@ -5,8 +5,21 @@ from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload
 
 from app.models.user import User, Teacher, Student
-from app.schemas.user import UserCreate, UserUpdate, TeacherCreate, StudentCreate
+from app.schemas.user import AuthenticatedUser, UserCreate, UserUpdate, TeacherCreate, StudentCreate
+from app.core.cache import TypedCache
+from app.core.config import settings
 from app.core.security import get_password_hash, verify_password
+from app.db.session import AsyncSessionLocal
+
+# User rows looked up on every authenticated request, keyed by user ID
+user_cache = TypedCache(
+    "user:id",
+    AuthenticatedUser,
+    ttl=settings.USER_CACHE_TTL,
+    local_ttl=settings.USER_CACHE_LOCAL_TTL,
+    # A deactivated or demoted user must lose access on every pod at once
+    broadcast_deletes=True
+)
 
 
 class UserService:
@@ -18,6 +31,23 @@ class UserService:
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
     
+    async def get_cached(self, user_id: UUID) -> Optional[AuthenticatedUser]:
+        """
+        Read-only view of a user for authentication, served from user_cache
+        when possible.
+        
+        It is not attached to any session; callers that change the user or
+        need relationships load the row with get_by_id.
+        """
+        async def load():
+            # Concurrent requests may wait on this load, so it mustn't run in
+            # (and fail with) any one request's session
+            async with AsyncSessionLocal() as db:
+                user = await UserService(db).get_by_id(user_id)
+                return AuthenticatedUser.model_validate(user) if user else None
+        
+        return await user_cache.get_or_load(str(user_id), load)
+    
     async def get_by_email(self, email: str) -> Optional[User]:
         query = select(User).where(User.email == email)
         result = await self.db.execute(query)
@@ -71,6 +101,7 @@ class UserService:
         self.db.add(user)
         await self.db.commit()
         await self.db.refresh(user)
+        await user_cache.delete(str(user_id))
         
         return user
     
@@ -9,6 +9,7 @@ from sqlalchemy.orm import selectinload
 from app.models.user import User
 from app.models.reputation import ReputationHistory, REPUTATION_POINTS
 from app.core.cache import cache_get, cache_set, cache_delete, CacheKeys
+from app.services.auth.user_service import user_cache
 
 
 class ReputationService:
@@ -74,6 +75,7 @@ class ReputationService:
             # Invalidate user reputation cache
             cache_key = CacheKeys.format(CacheKeys.USER_REPUTATION, user_id=str(user_id))
             await cache_delete(cache_key)
+            await user_cache.delete(str(user_id))
             
             # Also invalidate leaderboard cache
             await cache_delete("leaderboard:*")
@@ -0,0 +1,115 @@
+"""HLS playlist helpers."""
+import re
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+HLS_CONTENT_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".m4s": "video/iso.segment",
+    ".mp4": "video/mp4",
+}
+
+_MAP_URI = re.compile(r'URI="([^"]+)"')
+
+# ffprobe H.264 profile name -> profile_idc and constraint flags (RFC 6381)
+_AVC_PROFILES = {
+    "Constrained Baseline": "42E0",
+    "Baseline": "4200",
+    "Main": "4D40",
+    "High": "6400",
+}
+# ffprobe AAC profile name -> MPEG-4 audio object type
+_AAC_OBJECT_TYPES = {
+    "LC": 2,
+    "HE-AAC": 5,
+    "HE-AACv2": 29,
+}
+
+
+def segment_peak_bitrate(playlist_path: str) -> int:
+    """
+    Highest bitrate of any segment in a media playlist, in bits per second.
+
+    This is what BANDWIDTH in a master playlist must cover; the file's
+    average bitrate understates it.
+    """
+    playlist = Path(playlist_path)
+    peak = 0
+    duration = None
+
+    for line in playlist.read_text().splitlines():
+        if line.startswith("#EXTINF:"):
+            duration = float(line[len("#EXTINF:"):].split(",")[0])
+        elif line and not line.startswith("#") and duration:
+            size = (playlist.parent / line).stat().st_size
+            peak = max(peak, int(size * 8 / duration))
+            duration = None
+
+    return peak
+
+
+def hls_codecs(info: Dict) -> Optional[str]:
+    """
+    CODECS attribute value for an H.264/AAC rendition, e.g. "avc1.64001f,mp4a.40.2".
+
+    Args:
+        info: Probe of the rendition, as returned by VideoProcessor.get_video_info
+
+    Returns:
+        The codecs string, or None if the video isn't H.264 with a known
+        profile and level
+    """
+    profile = _AVC_PROFILES.get(info.get("video_profile"))
+    level = info.get("video_level")
+    if info.get("video_codec") != "h264" or profile is None or not level or level < 0:
+        return None
+
+    codecs = [f"avc1.{profile}{level:02X}".lower()]
+    if info.get("audio_codec") == "aac":
+        codecs.append(f"mp4a.40.{_AAC_OBJECT_TYPES.get(info.get('audio_profile'), 2)}")
+    return ",".join(codecs)
+
+
+def build_master_playlist(variants: List[Dict]) -> str:
+    """
+    Master playlist listing variants from lowest to highest bandwidth.
+
+    Args:
+        variants: Dicts with "uri", "bandwidth", "average_bandwidth",
+            "width", "height" and optionally "codecs"
+    """
+    lines = ["#EXTM3U", "#EXT-X-VERSION:7", "#EXT-X-INDEPENDENT-SEGMENTS"]
+    for variant in sorted(variants, key=lambda v: v["bandwidth"]):
+        lines.append(
+            f"#EXT-X-STREAM-INF:BANDWIDTH={variant['bandwidth']},"
+            f"AVERAGE-BANDWIDTH={variant['average_bandwidth']},"
+            f"RESOLUTION={variant['width']}x{variant['height']}"
+            + (f',CODECS="{variant["codecs"]}"' if variant.get("codecs") else "")
+        )
+        lines.append(variant["uri"])
+    return "\n".join(lines) + "\n"
+
+
+def rewrite_playlist_uris(playlist: str, rewrite: Callable[[str], str]) -> str:
+    """
+    Replace every segment and init-section URI in a media playlist.
+
+    Args:
+        playlist: Media playlist text
+        rewrite: Maps a URI as written in the playlist to its replacement
+    """
+    lines = []
+    for line in playlist.splitlines():
+        if line.startswith("#EXT-X-MAP:"):
+            line = _MAP_URI.sub(lambda m: f'URI="{rewrite(m.group(1))}"', line)
+        elif line and not line.startswith("#"):
+            line = rewrite(line)
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def playlist_uris(playlist: str) -> List[str]:
+    """Segment and init-section URIs referenced by a media playlist."""
+    uris = []
+    rewrite_playlist_uris(playlist, lambda uri: uris.append(uri) or uri)
+    return uris
@@ -0,0 +1,136 @@
+"""Queueing of video processing when uploads complete."""
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+import redis.asyncio as redis
+from kombu.transport.redis import PRIORITY_STEPS, Channel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import get_redis_client
+from app.core.config import settings
+from app.models.practice import PracticeSession, ProcessingStatus
+from app.tasks.video_tasks import process_video
+
+logger = logging.getLogger(__name__)
+
+PROCESSING_QUEUE = "video_processing"
+PROCESSING_JOB_KEY = "processing:job:{upload_key}"
+LOWEST_PRIORITY = 9  # Redis broker priorities run from 0 (first) to 9 (last)
+
+
+def processing_job_id(upload_key: str) -> str:
+    """Celery task ID for an upload's processing job; the same for every retry."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"process_video:{upload_key}"))
+
+
+async def queue_depth(client: redis.Redis, queue: str = PROCESSING_QUEUE) -> int:
+    """Messages waiting in a Celery queue on the Redis broker, across its priority lists."""
+    pipeline = client.pipeline(transaction=False)
+    for step in PRIORITY_STEPS:
+        pipeline.llen(f"{queue}{Channel.sep}{step}" if step else queue)
+    return sum(await pipeline.execute())
+
+
+async def backpressure_options(client: redis.Redis) -> Dict[str, Any]:
+    """
+    apply_async options for a new job given how busy the queue is.
+
+    Past VIDEO_QUEUE_SOFT_DEPTH waiting jobs, new uploads go to the back of
+    the queue so work already under way (segments, thumbnails) isn't starved;
+    past VIDEO_QUEUE_DEFER_DEPTH they are also held back for a while.
+    """
+    try:
+        depth = await queue_depth(client)
+    except Exception as e:
+        logger.warning(f"Could not read {PROCESSING_QUEUE} depth: {e}")
+        return {}
+
+    if depth >= settings.VIDEO_QUEUE_DEFER_DEPTH:
+        logger.info(f"{PROCESSING_QUEUE} has {depth} waiting jobs; deferring new job")
+        return {"priority": LOWEST_PRIORITY, "countdown": settings.VIDEO_QUEUE_DEFER_SECONDS}
+    if depth >= settings.VIDEO_QUEUE_SOFT_DEPTH:
+        return {"priority": LOWEST_PRIORITY}
+    return {}
+
+
+async def enqueue_processing(
+    upload_key: str,
+    session_id: Union[str, uuid.UUID],
+    video_path: str,
+    user_id: Union[str, uuid.UUID],
+    qualities: Optional[List[str]] = None,
+    on_claim: Optional[Callable[[], Awaitable]] = None,
+    redis_client: Optional[redis.Redis] = None,
+    segment_renditions: Optional[Dict[str, List[str]]] = None
+) -> Tuple[str, bool]:
+    """
+    Queue process_video for a completed upload, once per upload.
+
+    The upload key is claimed in Redis before anything is queued, so repeated
+    completion requests (client retries, a PATCH replayed after a lost
+    response) find the existing job instead of starting another.
+
+    Args:
+        upload_key: Idempotency key; the upload ID, or the object key when
+            the upload has none
+        session_id: Practice session ID
+        video_path: Uploaded video's object key
+        user_id: Owner of the session
+        qualities: Quality levels to generate
+        on_claim: Coroutine function run after the claim and before queueing,
+            e.g. to mark the session pending; if it fails the claim is released
+        redis_client: Async Redis client; defaults to the shared pool
+        segment_renditions: Encoded segments for process_video to join; such
+            a job continues work under way, so it skips back-pressure
+
+    Returns:
+        The job's task ID and whether this call queued it
+    """
+    client = redis_client or await get_redis_client()
+    task_id = processing_job_id(upload_key)
+    claim_key = PROCESSING_JOB_KEY.format(upload_key=upload_key)
+
+    if not await client.set(claim_key, task_id, nx=True, ex=settings.VIDEO_JOB_DEDUP_TTL):
+        logger.info(f"Processing for upload {upload_key} already queued as {task_id}")
+        return task_id, False
+
+    try:
+        if on_claim:
+            await on_claim()
+        if segment_renditions is None:
+            options = await backpressure_options(client)
+        else:
+            options = {"kwargs": {"segment_renditions": segment_renditions}}
+        process_video.apply_async(
+            (str(session_id), video_path, str(user_id), qualities),
+            task_id=task_id,
+            **options
+        )
+    except Exception:
+        await client.delete(claim_key)
+        raise
+
+    logger.info(f"Queued processing for upload {upload_key} as {task_id}")
+    return task_id, True
+
+
+async def queue_session_processing(
+    db: AsyncSession,
+    session: PracticeSession,
+    upload_key: str,
+    video_path: str
+) -> Tuple[str, bool]:
+    """Point a session at its uploaded video and queue processing, once per upload."""
+    async def mark_pending():
+        session.video_url = video_path
+        session.processing_status = ProcessingStatus.PENDING
+        await db.commit()
+
+    return await enqueue_processing(
+        upload_key,
+        session.id,
+        video_path,
+        session.student_id,
+        on_claim=mark_pending
+    )
@@ -0,0 +1,149 @@
+"""Live processing progress, published through Redis."""
+import json
+import logging
+import math
+import time
+from typing import Awaitable, Callable, Dict, Optional, Union
+import uuid
+
+import redis
+
+from app.core.cache import get_redis_client
+from app.core.config import settings
+from app.models.practice import ProcessingStatus
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_KEY = "processing:progress:{session_id}"
+
+_sync_client: Optional[redis.Redis] = None
+
+
+def get_sync_redis_client() -> redis.Redis:
+    """Redis client for Celery workers, created on first use."""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = redis.Redis.from_url(settings.REDIS_URL)
+    return _sync_client
+
+
+def publish_progress(
+    session_id: Union[str, uuid.UUID],
+    status: ProcessingStatus,
+    progress: Optional[float] = None,
+    user_id: Optional[Union[str, uuid.UUID]] = None,
+    client: Optional[redis.Redis] = None
+) -> bool:
+    """
+    Store a session's live progress in a Redis hash and announce it on the
+    channel of the same name.
+    
+    Failures are logged and swallowed; progress is never worth failing a
+    job over.
+    
+    Returns:
+        Whether the update reached Redis
+    """
+    key = PROGRESS_KEY.format(session_id=session_id)
+    fields = {"status": status.value, "updated_at": time.time()}
+    if progress is not None:
+        fields["progress"] = round(progress, 4)
+    if user_id is not None:
+        fields["user_id"] = str(user_id)
+    
+    try:
+        client = client or get_sync_redis_client()
+        pipeline = client.pipeline(transaction=False)
+        pipeline.hset(key, mapping=fields)
+        pipeline.expire(key, settings.VIDEO_PROGRESS_TTL)
+        pipeline.publish(key, json.dumps(fields))
+        pipeline.execute()
+        return True
+    except Exception as e:
+        logger.warning(f"Could not publish progress for session {session_id}: {e}")
+        return False
+
+
+async def read_progress(session_id: Union[str, uuid.UUID]) -> Optional[Dict]:
+    """
+    Live progress for a session, if any has been published.
+    
+    Returns:
+        Dict with "status", "updated_at" and, when known, "progress" and
+        "user_id"; None when absent or Redis is unavailable
+    """
+    try:
+        client = await get_redis_client()
+        fields = await client.hgetall(PROGRESS_KEY.format(session_id=session_id))
+    except Exception as e:
+        logger.warning(f"Could not read progress for session {session_id}: {e}")
+        return None
+    
+    if not fields:
+        return None
+    
+    live = {key.decode(): value.decode() for key, value in fields.items()}
+    live["updated_at"] = float(live["updated_at"])
+    if "progress" in live:
+        live["progress"] = float(live["progress"])
+    return live
+
+
+class ProgressReporter:
+    """
+    Rate-limits progress updates for one processing job.
+    
+    Updates go to Redis at most once per interval. The database is written
+    only when progress crosses a milestone, so a long encode costs a
+    handful of transactions rather than one per ffmpeg progress line.
+    """
+    
+    def __init__(
+        self,
+        session_id: Union[str, uuid.UUID],
+        user_id: Union[str, uuid.UUID],
+        persist: Callable[..., Awaitable],
+        interval: Optional[float] = None,
+        milestone: Optional[float] = None,
+        client: Optional[redis.Redis] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            session_id: Practice session ID
+            user_id: Owner of the session, for access checks on reads
+            persist: Coroutine function taking (session_id, status, progress)
+                that records a milestone durably
+            interval: Minimum seconds between Redis updates
+            milestone: Progress step at which persist is called
+            client: Redis client; defaults to the worker's shared client
+            clock: Monotonic time source
+        """
+        self.session_id = session_id
+        self.user_id = user_id
+        self.persist = persist
+        self.interval = interval if interval is not None else settings.VIDEO_PROGRESS_INTERVAL
+        self.milestone = milestone or settings.VIDEO_PROGRESS_MILESTONE
+        self.client = client
+        self._clock = clock
+        self._last_publish: Optional[float] = None
+        self._next_milestone = self.milestone
+    
+    async def update(self, progress: float):
+        """Report overall progress (0-1) of a job that is still running."""
+        now = self._clock()
+        
+        if progress >= self._next_milestone:
+            self._next_milestone = (math.floor(progress / self.milestone) + 1) * self.milestone
+            await self.persist(self.session_id, ProcessingStatus.PROCESSING, progress)
+        elif self._last_publish is not None and now - self._last_publish < self.interval:
+            return
+        
+        publish_progress(
+            self.session_id,
+            ProcessingStatus.PROCESSING,
+            progress,
+            user_id=self.user_id,
+            client=self.client
+        )
+        self._last_publish = now
@@ -0,0 +1,565 @@
+"""Resumable (TUS) uploads written straight into S3 multipart parts."""
+import json
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+from redis.exceptions import LockError
+
+from app.core.cache import get_redis_client
+from app.core.config import settings
+from app.core.tus import checksum_hasher, verify_chunk_checksum
+from app.services.storage import StorageService
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_KEY = "tus:upload:{upload_id}"
+TAIL_KEY = "tus:upload:{upload_id}:tail"
+LOCK_KEY = "tus:upload:{upload_id}:lock"
+MAX_COPY_PART_SIZE = 5 * 1024 ** 3  # S3's limit for one UploadPartCopy
+
+
+class UploadError(ValueError):
+    """Upload request that can't be applied; status_code is the HTTP answer."""
+    status_code = 400
+
+
+class UploadNotFound(UploadError):
+    status_code = 404
+
+
+class UploadForbidden(UploadError):
+    status_code = 403
+
+
+class UploadOffsetMismatch(UploadError):
+    status_code = 409
+
+
+class UploadBusy(UploadError):
+    status_code = 423
+
+
+class UploadTooLarge(UploadError):
+    status_code = 413
+
+
+class UploadChecksumMismatch(UploadError):
+    status_code = 460
+
+
+class ResumableUpload:
+    """State of one resumable upload, as recorded in Redis."""
+
+    def __init__(
+        self,
+        upload_id: str,
+        object_key: str,
+        s3_upload_id: str,
+        size: int,
+        part_size: int,
+        offset: int = 0,
+        metadata: Optional[Dict[str, str]] = None,
+        created_at: Optional[datetime] = None,
+        completed: bool = False,
+        parts: Optional[Dict[int, str]] = None,
+        concat: Optional[str] = None
+    ):
+        self.id = upload_id
+        self.object_key = object_key
+        self.s3_upload_id = s3_upload_id
+        self.size = size
+        self.part_size = part_size
+        self.offset = offset
+        self.metadata = metadata or {}
+        self.created_at = created_at or datetime.utcnow()
+        self.completed = completed
+        self.parts = parts or {}
+        self.concat = concat
+
+    @property
+    def is_partial(self) -> bool:
+        """Whether this is a partial upload of the concatenation extension."""
+        return self.concat == "partial"
+
+    @property
+    def partial_ids(self) -> List[str]:
+        """IDs of the partial uploads a final upload was concatenated from."""
+        if not self.concat or not self.concat.startswith("final;"):
+            return []
+        return self.concat[len("final;"):].split()
+
+    @property
+    def tail_size(self) -> int:
+        """Durable bytes past the last uploaded part, held in Redis."""
+        return 0 if self.completed else self.offset - len(self.parts) * self.part_size
+
+    def to_fields(self) -> Dict[str, Any]:
+        """Redis hash fields, without parts."""
+        return {
+            "object_key": self.object_key,
+            "s3_upload_id": self.s3_upload_id,
+            "size": self.size,
+            "part_size": self.part_size,
+            "offset": self.offset,
+            "metadata": json.dumps(self.metadata),
+            "created_at": self.created_at.isoformat(),
+            "completed": int(self.completed),
+            "concat": self.concat or ""
+        }
+
+    @classmethod
+    def from_fields(cls, upload_id: str, fields: Dict[bytes, bytes]) -> "ResumableUpload":
+        """Rebuild an upload from its Redis hash."""
+        values = {key.decode(): value.decode() for key, value in fields.items()}
+        parts = {
+            int(key[len("part:"):]): value
+            for key, value in values.items() if key.startswith("part:")
+        }
+        return cls(
+            upload_id,
+            object_key=values["object_key"],
+            s3_upload_id=values["s3_upload_id"],
+            size=int(values["size"]),
+            part_size=int(values["part_size"]),
+            offset=int(values["offset"]),
+            metadata=json.loads(values["metadata"]),
+            created_at=datetime.fromisoformat(values["created_at"]),
+            completed=values["completed"] == "1",
+            parts=parts,
+            concat=values.get("concat") or None
+        )
+
+
+class ResumableUploadStore:
+    """
+    Resumable uploads backed by S3 multipart uploads, with state in Redis.
+
+    PATCH bytes are cut into parts and sent to S3 as they arrive; the part
+    ETags and offset live in one small Redis hash, so any API pod can serve
+    any request and none needs local disk. Bytes past the last full part
+    (less than one part) are kept in Redis with the offset and prepended to
+    the next PATCH. The last byte completes the multipart upload.
+
+    Unfinished uploads expire from Redis after the upload TTL; the bucket's
+    AbortIncompleteMultipartUpload lifecycle rule reclaims their parts.
+    """
+
+    def __init__(
+        self,
+        storage_service: Optional[StorageService] = None,
+        redis_client: Optional[redis.Redis] = None,
+        part_size: Optional[int] = None,
+        ttl: Optional[int] = None
+    ):
+        """
+        Args:
+            storage_service: Destination bucket; defaults to the media bucket
+            redis_client: Async Redis client; defaults to the shared pool
+            part_size: Bytes per S3 part, at least 5 MiB outside tests
+            ttl: Seconds an unfinished upload's state is kept
+        """
+        self.storage_service = storage_service or StorageService.from_settings()
+        self.redis_client = redis_client
+        self.part_size = part_size or settings.TUS_PART_SIZE
+        self.ttl = ttl or settings.TUS_UPLOAD_TTL
+
+    async def _redis(self) -> redis.Redis:
+        if self.redis_client is None:
+            self.redis_client = await get_redis_client()
+        return self.redis_client
+
+    async def create(
+        self,
+        upload_id: str,
+        object_key: str,
+        size: int,
+        metadata: Optional[Dict[str, str]] = None,
+        content_type: Optional[str] = None,
+        object_metadata: Optional[Dict[str, str]] = None,
+        partial: bool = False
+    ) -> ResumableUpload:
+        """
+        Start an upload of size bytes to object_key.
+
+        Args:
+            upload_id: Upload ID used in the TUS URL
+            object_key: Destination S3 key
+            size: Upload-Length
+            metadata: Upload metadata kept with the state (owner, filename, ...)
+            content_type: Content type of the finished object
+            object_metadata: S3 user metadata for the finished object
+            partial: Whether this is a partial upload, to be concatenated
+        """
+        s3_upload_id = await self.storage_service.create_multipart_upload(
+            object_key,
+            metadata=object_metadata,
+            content_type=content_type or "video/mp4"
+        )
+        upload = ResumableUpload(
+            upload_id,
+            object_key=object_key,
+            s3_upload_id=s3_upload_id,
+            size=size,
+            part_size=self.part_size,
+            metadata=metadata,
+            concat="partial" if partial else None
+        )
+        await self._save(upload)
+        return upload
+
+    async def concatenate(
+        self,
+        upload_id: str,
+        object_key: str,
+        partial_ids: List[str],
+        metadata: Optional[Dict[str, str]] = None,
+        content_type: Optional[str] = None
+    ) -> ResumableUpload:
+        """
+        Create a final upload from finished partial uploads, in order.
+
+        Partials are copied inside S3 with UploadPartCopy wherever the
+        copied range makes a valid part. S3 parts other than the last must
+        be at least 5 MiB, so a short partial is read back, and only as much
+        of the next partial as fills the part is read after it; memory stays
+        below one part whatever the partial sizes. The partials are locked
+        throughout and deleted afterwards.
+
+        Args:
+            upload_id: Upload ID of the final upload
+            object_key: Destination S3 key
+            partial_ids: Upload IDs of the partial uploads
+            metadata: Upload metadata kept with the state
+            content_type: Content type of the finished object
+
+        Returns:
+            The final upload, already completed
+
+        Raises:
+            UploadError: A partial is missing, not partial, unfinished or
+                locked by another request
+        """
+        # The partials' locks keep out writers and a second final upload of
+        # the same partials, which would copy them after these deleted them
+        client = await self._redis()
+        locks = []
+        try:
+            for partial_id in dict.fromkeys(partial_ids):
+                lock = client.lock(LOCK_KEY.format(upload_id=partial_id), timeout=settings.TUS_LOCK_TIMEOUT)
+                if not await lock.acquire(blocking=False):
+                    raise UploadBusy(f"Partial upload {partial_id} is in use")
+                locks.append(lock)
+
+            return await self._concatenate(upload_id, object_key, partial_ids, locks, metadata, content_type)
+
+        finally:
+            for lock in locks:
+                try:
+                    await lock.release()
+                except LockError:
+                    logger.warning(f"Lock {lock.name} expired during a concatenation")
+
+    async def _concatenate(
+        self,
+        upload_id: str,
+        object_key: str,
+        partial_ids: List[str],
+        locks: List[Any],
+        metadata: Optional[Dict[str, str]],
+        content_type: Optional[str]
+    ) -> ResumableUpload:
+        partials = []
+        for partial_id in partial_ids:
+            partial = await self.get(partial_id)
+            if partial is None:
+                raise UploadNotFound(f"Partial upload {partial_id} not found")
+            if not partial.is_partial:
+                raise UploadError(f"Upload {partial_id} is not a partial upload")
+            if not partial.completed:
+                raise UploadError(f"Partial upload {partial_id} is not finished")
+            partials.append(partial)
+
+        s3_upload_id = await self.storage_service.create_multipart_upload(
+            object_key,
+            content_type=content_type or "video/mp4"
+        )
+        upload = ResumableUpload(
+            upload_id,
+            object_key=object_key,
+            s3_upload_id=s3_upload_id,
+            size=sum(partial.size for partial in partials),
+            part_size=self.part_size,
+            metadata=metadata,
+            concat="final;" + " ".join(partial_ids)
+        )
+
+        try:
+            buffer = bytearray()
+            pending: Dict[int, str] = {}
+            for index, partial in enumerate(partials):
+                last = index == len(partials) - 1
+                position = 0
+
+                if buffer and partial.size:
+                    # Top up the part being merged, and no more
+                    position = min(self.part_size - len(buffer), partial.size)
+                    buffer.extend(await self.storage_service.get_bytes(partial.object_key, (0, position)))
+                    if len(buffer) == self.part_size:
+                        await self._upload_part(upload, pending, bytes(buffer))
+                        buffer.clear()
+
+                # A partial is only left over once the part above was filled
+                remaining = partial.size - position
+                if remaining and remaining < self.part_size and not last:
+                    # Too short for a part of its own; merge it with what follows
+                    buffer.extend(await self.storage_service.get_bytes(
+                        partial.object_key, (position, partial.size)
+                    ))
+                elif remaining:
+                    await self._copy_range(upload, pending, partial.object_key, position, partial.size)
+
+                for lock in locks:
+                    await lock.reacquire()
+
+            if buffer:
+                await self._upload_part(upload, pending, bytes(buffer))
+
+            upload.parts = pending
+            upload.offset = upload.size
+            await self._complete(upload, save=False)
+        except LockError:
+            await self.storage_service.abort_multipart_upload(object_key, s3_upload_id)
+            raise UploadBusy("Lost a partial upload's lock during the concatenation")
+        except Exception:
+            await self.storage_service.abort_multipart_upload(object_key, s3_upload_id)
+            raise
+
+        await self._save(upload)
+
+        await self.storage_service.delete_files([partial.object_key for partial in partials])
+        client = await self._redis()
+        await client.delete(*[UPLOAD_KEY.format(upload_id=partial.id) for partial in partials])
+        return upload
+
+    async def get(self, upload_id: str) -> Optional[ResumableUpload]:
+        """The upload's current state, or None if unknown or expired."""
+        client = await self._redis()
+        fields = await client.hgetall(UPLOAD_KEY.format(upload_id=upload_id))
+        if not fields:
+            return None
+        return ResumableUpload.from_fields(upload_id, fields)
+
+    async def write(
+        self,
+        upload_id: str,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+        checksum: Optional[Tuple[str, str]] = None
+    ) -> ResumableUpload:
+        """
+        Append a PATCH body at offset.
+
+        Without a checksum the offset advances with every part written, and
+        if the body is cut short (e.g. the client disconnects) whatever
+        arrived is kept before the error propagates. With a checksum the
+        whole body is accepted or discarded at the end; parts sent before
+        then stay unrecorded. Either way the lock is renewed after every part.
+
+        Args:
+            upload_id: Upload ID
+            offset: Upload-Offset sent by the client
+            chunks: Request body
+            checksum: (algorithm, expected) from Upload-Checksum
+
+        Returns:
+            The upload after the write
+
+        Raises:
+            UploadError: subclass matching the TUS error response
+        """
+        client = await self._redis()
+        lock = client.lock(LOCK_KEY.format(upload_id=upload_id), timeout=settings.TUS_LOCK_TIMEOUT)
+        if not await lock.acquire(blocking=False):
+            raise UploadBusy("Another request is writing to this upload")
+
+        try:
+            upload = await self.get(upload_id)
+            if upload is None:
+                raise UploadNotFound("Upload not found")
+            if upload.partial_ids:
+                raise UploadForbidden("A final upload can't be patched")
+            if upload.completed:
+                return upload
+            if offset != upload.offset:
+                raise UploadOffsetMismatch(f"Expected offset {upload.offset}, got {offset}")
+
+            hasher = None
+            if checksum:
+                hasher = checksum_hasher(checksum[0])
+                if hasher is None:
+                    raise UploadError("Unsupported checksum algorithm")
+
+            buffer = bytearray()
+            if upload.tail_size:
+                buffer.extend(await client.get(TAIL_KEY.format(upload_id=upload_id)) or b"")
+            received = upload.offset
+            pending: Dict[int, str] = {}
+
+            try:
+                async for chunk in chunks:
+                    if received + len(chunk) > upload.size:
+                        raise UploadTooLarge("Chunk exceeds Upload-Length")
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    buffer.extend(chunk)
+                    received += len(chunk)
+
+                    while len(buffer) >= upload.part_size:
+                        await self._upload_part(upload, pending, bytes(buffer[:upload.part_size]))
+                        del buffer[:upload.part_size]
+                        # Long bodies must keep the lock, or a second writer at
+                        # this offset would upload the same part numbers
+                        await lock.reacquire()
+                        if hasher is None:
+                            parts_end = (len(upload.parts) + len(pending)) * upload.part_size
+                            await self._commit(upload, pending, b"", parts_end)
+
+            except LockError:
+                # Someone else may own the upload now; record nothing
+                raise UploadBusy("Lost the upload's lock during the write")
+            except Exception:
+                if hasher is None and received > upload.offset:
+                    await self._commit(upload, pending, buffer, received)
+                raise
+
+            if hasher is not None and not verify_chunk_checksum(hasher, *checksum):
+                # Parts already sent are unrecorded and get overwritten on retry
+                raise UploadChecksumMismatch("Checksum mismatch")
+
+            if received < upload.size:
+                await self._commit(upload, pending, buffer, received)
+                return upload
+
+            if buffer:
+                await self._upload_part(upload, pending, bytes(buffer))
+            await self._commit(upload, pending, b"", received)
+            await self._complete(upload)
+            return upload
+
+        finally:
+            try:
+                await lock.release()
+            except LockError:
+                logger.warning(f"Lock on upload {upload_id} expired during a write")
+
+    async def abort(self, upload_id: str) -> bool:
+        """
+        Drop an upload's state, aborting its multipart upload if unfinished.
+
+        A finished upload's object is kept, except for partial uploads.
+
+        Returns:
+            Whether the upload existed
+        """
+        upload = await self.get(upload_id)
+        if upload is None:
+            return False
+
+        if not upload.completed:
+            await self.storage_service.abort_multipart_upload(upload.object_key, upload.s3_upload_id)
+        elif upload.is_partial:
+            # Nothing else will use a finished partial's object
+            await self.storage_service.delete_file(upload.object_key)
+
+        client = await self._redis()
+        await client.delete(UPLOAD_KEY.format(upload_id=upload_id), TAIL_KEY.format(upload_id=upload_id))
+        return True
+
+    async def _save(self, upload: ResumableUpload):
+        """Write the upload's whole state, parts included."""
+        client = await self._redis()
+        key = UPLOAD_KEY.format(upload_id=upload.id)
+        fields = upload.to_fields()
+        fields.update({f"part:{number}": etag for number, etag in upload.parts.items()})
+
+        pipeline = client.pipeline(transaction=True)
+        pipeline.hset(key, mapping=fields)
+        pipeline.expire(key, self.ttl)
+        await pipeline.execute()
+
+    async def _upload_part(self, upload: ResumableUpload, pending: Dict[int, str], data: bytes):
+        part_number = len(upload.parts) + len(pending) + 1
+        part = await self.storage_service.upload_part(
+            upload.object_key, upload.s3_upload_id, part_number, data
+        )
+        pending[part_number] = part["ETag"]
+
+    async def _copy_range(
+        self,
+        upload: ResumableUpload,
+        pending: Dict[int, str],
+        source_key: str,
+        start: int,
+        end: int
+    ):
+        """Copy source_key[start:end] into the upload inside S3, in as few parts as allowed."""
+        count = -(-(end - start) // MAX_COPY_PART_SIZE)
+        # Equal pieces; with several, each is far above the part minimum
+        bounds = [start + (end - start) * i // count for i in range(count + 1)]
+        for piece_start, piece_end in zip(bounds, bounds[1:]):
+            part_number = len(upload.parts) + len(pending) + 1
+            part = await self.storage_service.upload_part_copy(
+                upload.object_key, upload.s3_upload_id, part_number, source_key, (piece_start, piece_end)
+            )
+            pending[part_number] = part["ETag"]
+
+    async def _commit(
+        self,
+        upload: ResumableUpload,
+        pending: Dict[int, str],
+        tail: bytes,
+        offset: int
+    ):
+        """Record new parts, the tail and the offset in one transaction."""
+        client = await self._redis()
+        fields = {f"part:{number}": etag for number, etag in pending.items()}
+        fields["offset"] = offset
+
+        pipeline = client.pipeline(transaction=True)
+        pipeline.hset(UPLOAD_KEY.format(upload_id=upload.id), mapping=fields)
+        # Uploads making progress don't expire mid-way
+        pipeline.expire(UPLOAD_KEY.format(upload_id=upload.id), self.ttl)
+        if tail:
+            pipeline.set(TAIL_KEY.format(upload_id=upload.id), bytes(tail), ex=self.ttl)
+        else:
+            pipeline.delete(TAIL_KEY.format(upload_id=upload.id))
+        await pipeline.execute()
+
+        upload.parts.update(pending)
+        upload.offset = offset
+        pending.clear()
+
+    async def _complete(self, upload: ResumableUpload, save: bool = True):
+        """Assemble the parts into the final object."""
+        if upload.parts:
+            await self.storage_service.complete_multipart_upload(
+                upload.object_key,
+                upload.s3_upload_id,
+                [{"PartNumber": number, "ETag": etag} for number, etag in sorted(upload.parts.items())]
+            )
+        else:
+            # S3 can't complete a multipart upload without parts
+            await self.storage_service.abort_multipart_upload(upload.object_key, upload.s3_upload_id)
+            await self.storage_service.put_bytes(upload.object_key, b"")
+
+        upload.completed = True
+        if save:
+            # Kept for a full TTL so retried final PATCHes get the completed state
+            client = await self._redis()
+            pipeline = client.pipeline(transaction=True)
+            pipeline.hset(UPLOAD_KEY.format(upload_id=upload.id), "completed", 1)
+            pipeline.expire(UPLOAD_KEY.format(upload_id=upload.id), self.ttl)
+            await pipeline.execute()
+        logger.info(f"Completed upload {upload.id} to {upload.object_key}")
@@ -0,0 +1,105 @@
+"""Bounded background upload queue for processed media."""
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
+
+from app.core.config import settings
+from app.services.storage import StorageService
+
+logger = logging.getLogger(__name__)
+
+
+class UploadQueue:
+    """
+    Uploads files to storage on worker threads while the caller keeps
+    processing.
+
+    At most max_pending uploads are queued or running; submit blocks
+    beyond that, so a fast producer can't pile up an unbounded amount of
+    local output. Use as a context manager, or call close: leaving the block
+    on an error cancels uploads that haven't started.
+    """
+
+    def __init__(
+        self,
+        storage_service: StorageService,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None
+    ):
+        self.storage_service = storage_service
+        self.max_workers = max_workers or settings.VIDEO_UPLOAD_WORKERS
+        self.max_pending = max(max_pending or settings.VIDEO_UPLOAD_QUEUE_SIZE, self.max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="media-upload"
+        )
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._futures: List[Future] = []
+
+    def __enter__(self) -> "UploadQueue":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(cancel=exc_type is not None)
+
+    def close(self, cancel: bool = False):
+        """Stop the workers, optionally dropping uploads that haven't started."""
+        if cancel:
+            for future in self._futures:
+                future.cancel()
+        self._executor.shutdown(wait=True)
+
+    def submit(
+        self,
+        file_path: str,
+        object_key: str,
+        content_type: Optional[str] = None
+    ) -> Future:
+        """
+        Queue a file for upload, blocking while the queue is full.
+
+        Args:
+            file_path: Local file path; must stay in place until wait returns
+            object_key: S3 object key
+            content_type: Optional content type
+
+        Returns:
+            Future resolving to the object key
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._upload, file_path, object_key, content_type)
+        except Exception:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+        return future
+
+    def wait(self) -> List[str]:
+        """
+        Wait for every submitted upload.
+
+        Returns:
+            Uploaded object keys, in submission order
+
+        Raises:
+            The first upload error, once all uploads have finished
+        """
+        keys = []
+        error = None
+        for future in self._futures:
+            try:
+                keys.append(future.result())
+            except Exception as e:
+                error = error or e
+
+        if error:
+            raise error
+        return keys
+
+    def _upload(self, file_path: str, object_key: str, content_type: Optional[str]) -> str:
+        # Already on an upload thread; no event loop is needed for boto3
+        return self.storage_service.upload_file_sync(file_path, object_key, content_type=content_type)
@@ -2,8 +2,10 @@
 import os
 import tempfile
 import logging
+import subprocess
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
+import numpy as np
 import ffmpeg
 from PIL import Image
 import boto3
@@ -11,6 +13,7 @@ from botocore.exceptions import ClientError
 
 from app.core.config import settings
 from app.services.storage import StorageService
+from app.services.media.hls import build_master_playlist, hls_codecs, segment_peak_bitrate
 from app.models.practice import VideoQuality
 
 logger = logging.getLogger(__name__)
@@ -25,6 +28,7 @@ class VideoProcessor:
             "height": 360,
             "bitrate": "500k",
             "audio_bitrate": "96k",
+            "profile": "high",
             "preset": "fast",
             "crf": 28
         },
@@ -33,6 +37,7 @@ class VideoProcessor:
             "height": 720,
             "bitrate": "1500k",
             "audio_bitrate": "128k",
+            "profile": "high",
             "preset": "medium",
             "crf": 23
         },
@@ -41,6 +46,7 @@ class VideoProcessor:
             "height": 1080,
             "bitrate": "3000k",
             "audio_bitrate": "192k",
+            "profile": "high",
             "preset": "medium",
             "crf": 20
         },
@@ -79,6 +85,11 @@ class VideoProcessor:
                 "fps": eval(video_stream["r_frame_rate"]),
                 "video_codec": video_stream["codec_name"],
                 "audio_codec": audio_stream["codec_name"] if audio_stream else None,
+                "pix_fmt": video_stream.get("pix_fmt"),
+                "video_profile": video_stream.get("profile"),
+                "video_level": video_stream.get("level"),
+                "audio_profile": audio_stream.get("profile") if audio_stream else None,
+                "video_bitrate": int(video_stream["bit_rate"]) if video_stream.get("bit_rate") else None,
                 "bitrate": int(probe["format"]["bit_rate"]),
                 "size": int(probe["format"]["size"]),
             }
@@ -97,29 +108,15 @@ class VideoProcessor:
         try:
             settings = self.QUALITY_SETTINGS[quality]
             
+            # Get input video info
+            info = await self.get_video_info(input_path)
+            
             if settings.get("copy"):
                 # Copy original without re-encoding
                 stream = ffmpeg.input(input_path)
                 stream = ffmpeg.output(stream, output_path, codec="copy")
             else:
-                # Get input video info
-                info = await self.get_video_info(input_path)
-                
-                # Calculate output dimensions maintaining aspect ratio
-                aspect_ratio = info["width"] / info["height"]
-                target_width = settings["width"]
-                target_height = settings["height"]
-                
-                if aspect_ratio > target_width / target_height:
-                    output_height = int(target_width / aspect_ratio)
-                    output_width = target_width
-                else:
-                    output_width = int(target_height * aspect_ratio)
-                    output_height = target_height
-                
-                # Ensure dimensions are even (required for H.264)
-                output_width = output_width if output_width % 2 == 0 else output_width - 1
-                output_height = output_height if output_height % 2 == 0 else output_height - 1
+                output_width, output_height = self._output_dimensions(info, settings)
                 
                 # Build FFmpeg command
                 stream = ffmpeg.input(input_path)
@@ -127,34 +124,12 @@ class VideoProcessor:
                 stream = ffmpeg.output(
                     stream,
                     output_path,
-                    vcodec="libx264",
-                    acodec="aac",
-                    video_bitrate=settings["bitrate"],
-                    audio_bitrate=settings["audio_bitrate"],
-                    preset=settings["preset"],
-                    crf=settings["crf"],
-                    movflags="faststart",  # Enable progressive download
-                    pix_fmt="yuv420p"  # Ensure compatibility
+                    **self._encoder_options(settings)
                 )
             
             # Run FFmpeg with progress monitoring
             if progress_callback:
-                stream = stream.global_args("-progress", "pipe:1")
-                process = stream.run_async(pipe_stdout=True, pipe_stderr=True)
-                
-                # Monitor progress
-                while True:
-                    stdout_line = process.stdout.readline()
-                    if not stdout_line:
-                        break
-                    
-                    # Parse progress info
-                    if stdout_line.startswith(b"out_time_ms="):
-                        time_ms = int(stdout_line.split(b"=")[1])
-                        progress = min(time_ms / (info["duration"] * 1000000), 1.0)
-                        await progress_callback(progress)
-                
-                process.wait()
+                await self._run_with_progress(stream, info["duration"], progress_callback)
             else:
                 stream.run(overwrite_output=True)
             
@@ -164,6 +139,321 @@ class VideoProcessor:
             logger.error(f"Error transcoding video: {e}")
             raise
     
+    async def transcode_renditions(
+        self,
+        input_path: str,
+        outputs: Dict[VideoQuality, str],
+        thumbnail_dir: Optional[str] = None,
+        thumbnail_count: int = 5,
+        thumbnail_size: Tuple[int, int] = (320, 180),
+        audio_output: Optional[str] = None,
+        audio_bitrate: str = "192k",
+        video_info: Optional[Dict] = None,
+        plan: Optional[Dict[VideoQuality, Dict]] = None,
+        progress_callback: Optional[callable] = None
+    ) -> Dict:
+        """
+        Produce every rendition, the thumbnails and the audio track in one
+        ffmpeg run.
+        
+        The source is decoded once and the decoded video is fanned out with a
+        split filter to one scaler per rendition (plus one for thumbnails),
+        instead of decoding it again for each output.
+        
+        Args:
+            input_path: Path to the source video
+            outputs: Output path per quality
+            thumbnail_dir: Directory for thumbnails; None skips them
+            thumbnail_count: Thumbnails, evenly spaced through the video
+            thumbnail_size: Thumbnail width and height
+            audio_output: Path for an MP3 of the audio track; None skips it
+            audio_bitrate: MP3 bitrate
+            video_info: Result of get_video_info, if already known
+            plan: Result of plan_renditions, if already decided; qualities
+                missing from it are not produced
+            progress_callback: Async callable receiving progress 0-1
+            
+        Returns:
+            Dictionary with "renditions" (quality -> path, only the ones
+            plan_renditions kept), "plan" (action per kept quality),
+            "thumbnails" (paths in time order) and "audio" (path or None)
+        """
+        try:
+            info = video_info or await self.get_video_info(input_path)
+            has_audio = info.get("audio_codec") is not None
+            if plan is None:
+                plan = self.plan_renditions(info, list(outputs))
+            plan = {quality: step for quality, step in plan.items() if quality in outputs}
+            
+            source = ffmpeg.input(input_path)
+            encoded = [quality for quality, step in plan.items() if step["action"] == "encode"]
+            branch_count = len(encoded) + (1 if thumbnail_dir and thumbnail_count else 0)
+            
+            # One decoded video stream per consumer
+            if branch_count > 1:
+                split = source.video.filter_multi_output("split", branch_count)
+                branches = iter([split[i] for i in range(branch_count)])
+            else:
+                branches = iter([source.video])
+            
+            streams = []
+            for quality, step in plan.items():
+                output_path = outputs[quality]
+                
+                if step["action"] == "copy":
+                    # Stream copy straight from the demuxer; never decoded
+                    streams.append(ffmpeg.output(source, output_path, codec="copy", movflags="faststart"))
+                    continue
+                
+                video = next(branches).filter("scale", step["width"], step["height"])
+                inputs = [video, source.audio] if has_audio else [video]
+                streams.append(ffmpeg.output(
+                    *inputs, output_path, **self._encoder_options(self.QUALITY_SETTINGS[quality])
+                ))
+            
+            thumbnails = []
+            if thumbnail_dir and thumbnail_count:
+                # Keep the first frame at or after each evenly spaced timestamp
+                interval = info["duration"] / (thumbnail_count + 1)
+                select = "+".join(
+                    f"lt(prev_pts*TB,{interval * (i + 1):.3f})*gte(pts*TB,{interval * (i + 1):.3f})"
+                    for i in range(thumbnail_count)
+                )
+                width, height = thumbnail_size
+                thumbs = next(branches).filter("select", select).filter("scale", width, height)
+                pattern = str(Path(thumbnail_dir) / "thumb_%d.jpg")
+                streams.append(ffmpeg.output(
+                    thumbs, pattern, vsync="vfr", start_number=0, vframes=thumbnail_count
+                ))
+                thumbnails = [pattern % i for i in range(thumbnail_count)]
+            
+            audio = None
+            if audio_output and has_audio:
+                streams.append(ffmpeg.output(
+                    source.audio, audio_output, acodec="libmp3lame", audio_bitrate=audio_bitrate
+                ))
+                audio = audio_output
+            
+            stream = ffmpeg.merge_outputs(*streams)
+            if progress_callback:
+                await self._run_with_progress(stream, info["duration"], progress_callback)
+            else:
+                stream.run(overwrite_output=True)
+            
+            return {
+                "renditions": {quality: outputs[quality] for quality in plan},
+                "plan": {quality.value: step for quality, step in plan.items()},
+                "thumbnails": [path for path in thumbnails if os.path.exists(path)],
+                "audio": audio
+            }
+            
+        except Exception as e:
+            logger.error(f"Error transcoding renditions: {e}")
+            raise
+    
+    def plan_renditions(self, info: Dict, qualities: List[VideoQuality]) -> Dict[VideoQuality, Dict]:
+        """
+        Decide how to produce each requested quality from the probed source.
+        
+        Tiers that shrink the source are encoded as usual. Of the tiers at or
+        above the source size only the smallest is kept, at the source's own
+        resolution: stream-copied when the source already meets the tier
+        (H.264/yuv420p, AAC or no audio, bitrate within the tier's budget),
+        encoded otherwise. Larger tiers would only be upscales and are
+        dropped. The original quality is always a copy.
+        
+        Args:
+            info: Result of get_video_info
+            qualities: Requested qualities
+            
+        Returns:
+            Kept qualities mapped to {"action": "encode" | "copy"} plus the
+            output "width" and "height" for encodes
+        """
+        tiers = sorted(
+            (quality for quality in qualities if not self.QUALITY_SETTINGS[quality].get("copy")),
+            key=lambda quality: self.QUALITY_SETTINGS[quality]["width"] * self.QUALITY_SETTINGS[quality]["height"]
+        )
+        plan = {}
+        native_tier = None
+        
+        for quality in tiers:
+            quality_settings = self.QUALITY_SETTINGS[quality]
+            output_width, output_height = self._output_dimensions(info, quality_settings)
+            
+            if output_width < info["width"]:
+                plan[quality] = {"action": "encode", "width": output_width, "height": output_height}
+            elif native_tier is None:
+                native_tier = quality
+                if self._source_fits_tier(info, quality_settings):
+                    plan[quality] = {"action": "copy"}
+                else:
+                    plan[quality] = {
+                        "action": "encode",
+                        "width": info["width"] - info["width"] % 2,
+                        "height": info["height"] - info["height"] % 2
+                    }
+            else:
+                logger.info(
+                    f"Skipping {quality.value}: source {info['width']}x{info['height']} "
+                    f"already covered by {native_tier.value}"
+                )
+        
+        for quality in qualities:
+            if self.QUALITY_SETTINGS[quality].get("copy"):
+                plan[quality] = {"action": "copy"}
+        
+        return plan
+    
+    def _source_fits_tier(self, info: Dict, quality_settings: Dict) -> bool:
+        """Whether the source can be served as a tier without re-encoding."""
+        budget = int(quality_settings["bitrate"].rstrip("k")) * 1000
+        source_bitrate = info.get("video_bitrate") or info["bitrate"]
+        
+        return (
+            info["video_codec"] == "h264"
+            and info.get("pix_fmt") in (None, "yuv420p")
+            and info.get("audio_codec") in (None, "aac")
+            # Some headroom: CRF output routinely overshoots the nominal rate
+            and source_bitrate <= budget * 1.5
+        )
+    
+    def _output_dimensions(self, info: Dict, settings: Dict) -> Tuple[int, int]:
+        """Fit the source into a quality's frame size, keeping aspect ratio."""
+        # Calculate output dimensions maintaining aspect ratio
+        aspect_ratio = info["width"] / info["height"]
+        target_width = settings["width"]
+        target_height = settings["height"]
+        
+        if aspect_ratio > target_width / target_height:
+            output_height = int(target_width / aspect_ratio)
+            output_width = target_width
+        else:
+            output_width = int(target_height * aspect_ratio)
+            output_height = target_height
+        
+        # Ensure dimensions are even (required for H.264)
+        output_width = output_width if output_width % 2 == 0 else output_width - 1
+        output_height = output_height if output_height % 2 == 0 else output_height - 1
+        
+        return output_width, output_height
+    
+    def _encoder_options(self, quality_settings: Dict) -> Dict:
+        """ffmpeg output options for an H.264/AAC rendition."""
+        return {
+            "vcodec": "libx264",
+            "acodec": "aac",
+            "video_bitrate": quality_settings["bitrate"],
+            "audio_bitrate": quality_settings["audio_bitrate"],
+            # Fixed so the master playlist's CODECS matches every rendition
+            "profile:v": quality_settings["profile"],
+            "preset": quality_settings["preset"],
+            "crf": quality_settings["crf"],
+            # Keyframes on HLS segment boundaries, identical across renditions
+            "force_key_frames": f"expr:gte(t,n_forced*{settings.VIDEO_HLS_SEGMENT_SECONDS})",
+            "movflags": "faststart",  # Enable progressive download
+            "pix_fmt": "yuv420p"  # Ensure compatibility
+        }
+    
+    async def package_hls(
+        self,
+        renditions: Dict[VideoQuality, str],
+        output_dir: str,
+        segment_seconds: Optional[int] = None
+    ) -> Dict:
+        """
+        Package transcoded MP4 renditions as HLS with a master playlist.
+        
+        Each rendition is remuxed without re-encoding into fMP4 (CMAF)
+        segments under output_dir/<quality>/, next to output_dir/master.m3u8.
+        The original quality is skipped: its codec may not be playable as HLS.
+        
+        Args:
+            renditions: MP4 path per quality, as made by transcode_renditions
+            output_dir: Local directory for the package
+            segment_seconds: Target segment duration
+            
+        Returns:
+            Dictionary with "master" (path), "variants" (per-quality playlist
+            and bandwidth) and "files" (every file, relative to output_dir)
+        """
+        try:
+            segment_seconds = segment_seconds or settings.VIDEO_HLS_SEGMENT_SECONDS
+            package_dir = Path(output_dir)
+            variants = []
+            
+            for quality, input_path in renditions.items():
+                if self.QUALITY_SETTINGS[quality].get("copy"):
+                    continue
+                
+                variant_dir = package_dir / quality.value
+                variant_dir.mkdir(parents=True, exist_ok=True)
+                playlist_path = variant_dir / "index.m3u8"
+                
+                stream = ffmpeg.input(input_path)
+                stream = ffmpeg.output(
+                    stream,
+                    str(playlist_path),
+                    codec="copy",
+                    format="hls",
+                    hls_time=segment_seconds,
+                    hls_playlist_type="vod",
+                    hls_segment_type="fmp4",
+                    hls_fmp4_init_filename="init.mp4",
+                    hls_segment_filename=str(variant_dir / "seg_%05d.m4s")
+                )
+                stream.run(overwrite_output=True)
+                
+                info = await self.get_video_info(input_path)
+                variants.append({
+                    "quality": quality.value,
+                    "uri": f"{quality.value}/index.m3u8",
+                    "bandwidth": max(segment_peak_bitrate(str(playlist_path)), info["bitrate"]),
+                    "average_bandwidth": info["bitrate"],
+                    "width": info["width"],
+                    "height": info["height"],
+                    "codecs": hls_codecs(info)
+                })
+            
+            master_path = package_dir / "master.m3u8"
+            master_path.write_text(build_master_playlist(variants))
+            
+            return {
+                "master": str(master_path),
+                "segment_seconds": segment_seconds,
+                "variants": variants,
+                "files": sorted(
+                    str(path.relative_to(package_dir))
+                    for path in package_dir.rglob("*") if path.is_file()
+                )
+            }
+            
+        except Exception as e:
+            logger.error(f"Error packaging HLS: {e}")
+            raise
+    
+    async def _run_with_progress(self, stream, duration: float, progress_callback: callable):
+        """Run an ffmpeg graph, reporting progress parsed from -progress output."""
+        stream = stream.global_args("-progress", "pipe:1", "-nostats").overwrite_output()
+        process = stream.run_async(pipe_stdout=True)
+        
+        # Monitor progress
+        while True:
+            stdout_line = process.stdout.readline()
+            if not stdout_line:
+                break
+            
+            # Parse progress info
+            if stdout_line.startswith(b"out_time_ms="):
+                try:
+                    time_ms = int(stdout_line.split(b"=")[1])
+                except ValueError:
+                    continue  # "N/A" before the first frame
+                progress = min(time_ms / (duration * 1000000), 1.0)
+                await progress_callback(progress)
+        
+        self.wait_for_process(process, "ffmpeg transcode")
+    
     async def generate_thumbnail(
         self,
         input_path: str,
@@ -244,6 +534,60 @@ class VideoProcessor:
             logger.error(f"Error extracting audio: {e}")
             raise
     
+    def wait_for_process(self, process: subprocess.Popen, description: str = "ffmpeg"):
+        """Wait for a background ffmpeg process and raise if it failed."""
+        returncode = process.wait()
+        if returncode != 0:
+            logger.error(f"{description} exited with code {returncode}")
+            raise RuntimeError(f"{description} failed with exit code {returncode}")
+    
+    def stream_audio_pcm(
+        self,
+        input_path: str,
+        sample_rate: int = 22050,
+        block_size: int = 1 << 20
+    ) -> Iterator[np.ndarray]:
+        """
+        Decode the audio track to mono float32 PCM, yielded in blocks.
+        
+        ffmpeg downmixes and resamples on the fly and writes raw samples to
+        stdout, so there is no lossy intermediate encode and no temp file.
+        The process is only started once the first block is requested.
+        
+        Args:
+            input_path: Path to the video (or audio) file
+            sample_rate: Output sample rate in Hz
+            block_size: Samples per yielded block
+        """
+        process = (
+            ffmpeg
+            .input(input_path)
+            .output("pipe:", format="f32le", acodec="pcm_f32le", ac=1, ar=sample_rate, vn=None)
+            .global_args("-loglevel", "error", "-nostdin")
+            .run_async(pipe_stdout=True)
+        )
+        bytes_per_sample = np.dtype(np.float32).itemsize
+        finished = False
+        
+        try:
+            while True:
+                data = process.stdout.read(block_size * bytes_per_sample)
+                if not data:
+                    break
+                usable = len(data) - len(data) % bytes_per_sample
+                yield np.frombuffer(data[:usable], dtype=np.float32)
+            
+            finished = True
+            
+        finally:
+            process.stdout.close()
+            if not finished:
+                # Consumer stopped early (error or cache hit); don't leave ffmpeg running
+                process.kill()
+                process.wait()
+        
+        self.wait_for_process(process, "ffmpeg audio decode")
+    
     async def create_preview_clip(
         self,
         input_path: str,
@@ -315,14 +659,66 @@ class VideoProcessor:
             logger.error(f"Error adding watermark: {e}")
             raise
     
+    async def split_segments(
+        self,
+        input_path: str,
+        output_dir: str,
+        segment_seconds: int
+    ) -> List[str]:
+        """
+        Cut the video stream into segments of about segment_seconds.
+        
+        The stream is copied, so cuts land on the first keyframe after each
+        boundary and every segment decodes on its own. Audio is left out;
+        see concatenate_videos for putting it back after the segments have
+        been encoded.
+        
+        Returns:
+            Segment paths in playback order
+        """
+        try:
+            Path(output_dir).mkdir(parents=True, exist_ok=True)
+            (
+                ffmpeg.input(input_path)
+                .video
+                .output(
+                    str(Path(output_dir) / "segment_%05d.mp4"),
+                    vcodec="copy",
+                    f="segment",
+                    segment_time=segment_seconds,
+                    reset_timestamps=1
+                )
+                .run(overwrite_output=True)
+            )
+            
+            return sorted(str(path) for path in Path(output_dir).glob("segment_*.mp4"))
+            
+        except Exception as e:
+            logger.error(f"Error splitting video into segments: {e}")
+            raise
+    
     async def concatenate_videos(
         self,
         input_paths: List[str],
         output_path: str,
-        transition: Optional[str] = None
+        transition: Optional[str] = None,
+        stream_copy: bool = False,
+        audio_source: Optional[str] = None,
+        audio_bitrate: str = "128k"
     ) -> str:
-        """Concatenate multiple videos."""
+        """
+        Concatenate multiple videos.
+        
+        With stream_copy the inputs must share codec parameters, e.g.
+        segments of one encode, and are joined by the concat demuxer without
+        decoding. Their audio is ignored: audio_source, if given, supplies
+        the track, encoded once over the whole video so there are no
+        priming gaps at the joins.
+        """
         try:
+            if stream_copy:
+                return self._join_segments(input_paths, output_path, audio_source, audio_bitrate)
+            
             inputs = [ffmpeg.input(path) for path in input_paths]
             
             if transition:
@@ -342,6 +738,42 @@ class VideoProcessor:
             logger.error(f"Error concatenating videos: {e}")
             raise
     
+    def _join_segments(
+        self,
+        input_paths: List[str],
+        output_path: str,
+        audio_source: Optional[str],
+        audio_bitrate: str
+    ) -> str:
+        """Concat-demux segments with stream copy, muxing in audio_source."""
+        list_path = Path(output_path).with_suffix(".txt")
+        list_path.write_text("".join(
+            "file '{}'\n".format(str(Path(path).resolve()).replace("'", "'\\''"))
+            for path in input_paths
+        ))
+        
+        try:
+            video = ffmpeg.input(str(list_path), f="concat", safe=0).video
+            if audio_source:
+                stream = ffmpeg.output(
+                    video,
+                    ffmpeg.input(audio_source).audio,
+                    output_path,
+                    vcodec="copy",
+                    acodec="aac",
+                    audio_bitrate=audio_bitrate,
+                    movflags="faststart",
+                    shortest=None
+                )
+            else:
+                stream = ffmpeg.output(video, output_path, vcodec="copy", movflags="faststart")
+            stream.run(overwrite_output=True)
+            
+            return output_path
+            
+        finally:
+            list_path.unlink(missing_ok=True)
+    
     def cleanup_temp_files(self, files: List[str]):
         """Clean up temporary files."""
         for file_path in files:
@@ -1,5 +1,5 @@
 """Video storage and management service"""
-from typing import Optional, List, BinaryIO
+from typing import Optional, List, BinaryIO, AsyncIterator, Tuple
 from datetime import datetime, timedelta
 from uuid import UUID
 import json
@@ -16,6 +16,7 @@ from app.schemas.video import (
 )
 from app.core.config import settings
 from app.core.tus import generate_upload_id, calculate_expiry
+from app.services.media.resumable_upload import ResumableUpload, ResumableUploadStore
 
 
 class VideoService:
@@ -23,6 +24,7 @@ class VideoService:
         self.db = db
         self._s3_client = None
         self._bucket_name = settings.S3_BUCKET_NAME
+        self._uploads = None
     
     @property
     def s3_client(self):
@@ -37,6 +39,13 @@ class VideoService:
             )
         return self._s3_client
     
+    @property
+    def uploads(self) -> ResumableUploadStore:
+        """Store holding in-flight upload offsets and S3 parts"""
+        if self._uploads is None:
+            self._uploads = ResumableUploadStore()
+        return self._uploads
+    
     async def init_upload(
         self, 
         student_id: UUID,
@@ -59,7 +68,7 @@ class VideoService:
         upload_id = generate_upload_id(str(upload_data.session_id), upload_data.filename)
         s3_key = f"videos/{student_id}/{upload_data.session_id}/{upload_id}.mp4"
         
-        # Create video record
+        # Create video record; progress is tracked by the upload store
         video = Video(
             session_id=upload_data.session_id,
             s3_key=s3_key,
@@ -81,25 +90,20 @@ class VideoService:
         await self.db.refresh(video)
         
         # Initiate multipart upload in S3
-        response = self.s3_client.create_multipart_upload(
-            Bucket=self._bucket_name,
-            Key=s3_key,
-            ContentType=upload_data.content_type or "video/mp4",
-            Metadata={
+        upload = await self.uploads.create(
+            upload_id,
+            object_key=s3_key,
+            size=upload_data.file_size,
+            metadata={"student_id": str(student_id)},
+            content_type=upload_data.content_type or "video/mp4",
+            object_metadata={
                 "upload-id": upload_id,
                 "session-id": str(upload_data.session_id),
                 "student-id": str(student_id)
             }
         )
         
-        # Store S3 upload ID in metadata
-        metadata = json.loads(video.upload_metadata or "{}")
-        metadata["s3_upload_id"] = response["UploadId"]
-        video.upload_metadata = json.dumps(metadata)
-        
-        await self.db.commit()
-        
-        return video, response["UploadId"]
+        return video, upload.s3_upload_id
     
     async def get_upload_status(
         self, 
@@ -124,11 +128,18 @@ class VideoService:
         if video.upload_expires_at and video.upload_expires_at < datetime.utcnow():
             return None
         
-        percentage = (video.upload_offset / video.file_size_bytes * 100) if video.file_size_bytes > 0 else 0
+        offset = video.upload_offset
+        if not video.upload_completed:
+            upload = await self.uploads.get(upload_id)
+            if not upload:
+                return None
+            offset = upload.offset
+        
+        percentage = (offset / video.file_size_bytes * 100) if video.file_size_bytes > 0 else 0
         
         return VideoUploadStatus(
             upload_id=upload_id,
-            offset=video.upload_offset,
+            offset=offset,
             size=video.file_size_bytes,
             completed=video.upload_completed,
             expires_at=video.upload_expires_at,
@@ -139,62 +150,33 @@ class VideoService:
         self, 
         upload_id: str,
         offset: int,
-        chunk_data: Optional[bytes] = None,
-        part_number: Optional[int] = None
-    ) -> Video:
-        """Update upload progress"""
-        # Get video record
-        result = await self.db.execute(
-            select(Video).where(Video.upload_id == upload_id).with_for_update()
-        )
-        video = result.scalar_one_or_none()
-        
-        if not video:
-            raise ValueError("Upload not found")
-        
-        if video.upload_completed:
-            raise ValueError("Upload already completed")
-        
-        if video.upload_expires_at and video.upload_expires_at < datetime.utcnow():
-            raise ValueError("Upload expired")
-        
-        # Upload chunk to S3 if provided
-        if chunk_data and part_number:
-            metadata = json.loads(video.upload_metadata or "{}")
-            s3_upload_id = metadata.get("s3_upload_id")
-            
-            if not s3_upload_id:
-                raise ValueError("S3 upload ID not found")
-            
-            response = self.s3_client.upload_part(
-                Bucket=self._bucket_name,
-                Key=video.s3_key,
-                PartNumber=part_number,
-                UploadId=s3_upload_id,
-                Body=chunk_data
+        chunks: AsyncIterator[bytes],
+        checksum: Optional[Tuple[str, str]] = None
+    ) -> ResumableUpload:
+        """
+        Write a PATCH body into the upload's S3 parts.
+        
+        Offsets and part ETags live in the upload store; the video row is
+        only written once, when the last byte arrives.
+        
+        Raises:
+            UploadError: The write was rejected (offset, size, checksum, ...)
+        """
+        upload = await self.uploads.write(upload_id, offset, chunks, checksum)
+        
+        if upload.completed:
+            await self.db.execute(
+                update(Video)
+                .where(Video.upload_id == upload_id, Video.upload_completed == False)
+                .values(
+                    upload_offset=upload.size,
+                    upload_completed=True,
+                    upload_expires_at=None
+                )
             )
-            
-            # Store ETag for part
-            parts = metadata.get("parts", [])
-            parts.append({
-                "PartNumber": part_number,
-                "ETag": response["ETag"]
-            })
-            metadata["parts"] = parts
-            video.upload_metadata = json.dumps(metadata)
-        
-        # Update offset
-        video.upload_offset = offset
-        
-        # Check if upload is complete
-        if offset >= video.file_size_bytes:
-            video.upload_completed = True
-            video.upload_expires_at = None
+            await self.db.commit()
         
-        await self.db.commit()
-        await self.db.refresh(video)
-        
-        return video
+        return upload
     
     async def complete_upload(
         self, 
@@ -218,18 +200,9 @@ class VideoService:
         if not video.upload_completed:
             raise ValueError("Upload not completed")
         
-        # Complete S3 multipart upload
-        metadata = json.loads(video.upload_metadata or "{}")
-        s3_upload_id = metadata.get("s3_upload_id")
-        parts = metadata.get("parts", [])
-        
-        if s3_upload_id and parts:
-            self.s3_client.complete_multipart_upload(
-                Bucket=self._bucket_name,
-                Key=video.s3_key,
-                UploadId=s3_upload_id,
-                MultipartUpload={"Parts": sorted(parts, key=lambda x: x["PartNumber"])}
-            )
+        # The S3 object was assembled when the last byte arrived. The upload's
+        # state is left to expire, so a retried final PATCH still finds it
+        # completed instead of missing
         
         # Clear upload metadata
         video.upload_metadata = None
@@ -260,18 +233,7 @@ class VideoService:
             raise ValueError("Access denied")
         
         # Abort S3 multipart upload
-        metadata = json.loads(video.upload_metadata or "{}")
-        s3_upload_id = metadata.get("s3_upload_id")
-        
-        if s3_upload_id:
-            try:
-                self.s3_client.abort_multipart_upload(
-                    Bucket=self._bucket_name,
-                    Key=video.s3_key,
-                    UploadId=s3_upload_id
-                )
-            except ClientError:
-                pass  # Upload might not exist
+        await self.uploads.abort(upload_id)
         
         # Delete video record
         await self.db.delete(video)
@@ -427,18 +389,7 @@ class VideoService:
         count = 0
         for video in expired_videos:
             # Abort S3 upload
-            metadata = json.loads(video.upload_metadata or "{}")
-            s3_upload_id = metadata.get("s3_upload_id")
-            
-            if s3_upload_id:
-                try:
-                    self.s3_client.abort_multipart_upload(
-                        Bucket=self._bucket_name,
-                        Key=video.s3_key,
-                        UploadId=s3_upload_id
-                    )
-                except ClientError:
-                    pass
+            await self.uploads.abort(video.upload_id)
             
             # Delete record
             await self.db.delete(video)
@@ -16,6 +16,7 @@ from app.models.analytics import AnalysisResult
 from app.services.community.reputation_service import ReputationService
 from app.services.notification_service import NotificationService
 from app.schemas.notification import NotificationCreate
+from app.schemas.user import AuthenticatedUser
 
 
 class ChallengeService:
@@ -29,7 +30,7 @@ class ChallengeService:
     # Challenge management
     async def get_challenges(
         self,
-        user: User,
+        user: AuthenticatedUser,
         only_active: bool = True,
         include_progress: bool = True
     ) -> List[Challenge]:
@@ -93,7 +94,7 @@ class ChallengeService:
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
     
-    async def start_challenge(self, user: User, challenge_id: UUID) -> UserChallenge:
+    async def start_challenge(self, user: AuthenticatedUser, challenge_id: UUID) -> UserChallenge:
         """Start a challenge for a user."""
         # Check if challenge exists and is active
         challenge = await self.get_challenge(challenge_id)
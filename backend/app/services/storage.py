@@ -2,18 +2,57 @@
 import os
 import logging
 import asyncio
-from typing import Optional, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional, Dict, Any, List, AsyncIterator, Callable, Tuple
 from datetime import datetime, timedelta
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 from botocore.client import Config
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
+_io_executor: Optional[ThreadPoolExecutor] = None
+_io_lock = threading.Lock()
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """
+    Bounded thread pool for blocking S3 calls, shared by every
+    StorageService in the process.
+    """
+    global _io_executor
+    with _io_lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(
+                max_workers=settings.S3_IO_THREADS,
+                thread_name_prefix="s3-io"
+            )
+    return _io_executor
+
+
+async def read_chunks(file: Any, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+    """Read an async file object, such as an UploadFile, chunk by chunk."""
+    while chunk := await file.read(chunk_size):
+        yield chunk
+
 
 class StorageService:
     """Service for handling S3/MinIO storage operations."""
     
+    # DeleteObjects accepts at most this many keys
+    DELETE_BATCH_SIZE = 1000
+    
+    # boto3 clients are thread-safe and own the HTTP connection pool, so
+    # one per endpoint and credentials is shared by every instance
+    _clients: Dict[Tuple, Any] = {}
+    _ready_buckets: set = set()
+    _clients_lock = threading.Lock()
+    
     def __init__(
         self,
         bucket_name: str,
@@ -23,19 +62,51 @@ class StorageService:
         region_name: str = "us-east-1"
     ):
         self.bucket_name = bucket_name
+        self.transfer_config = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_PART_SIZE,
+            multipart_chunksize=settings.S3_MULTIPART_PART_SIZE,
+            max_concurrency=settings.S3_TRANSFER_CONCURRENCY
+        )
         
         # Initialize S3 client
-        self.s3_client = boto3.client(
-            "s3",
-            endpoint_url=endpoint_url,
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=region_name,
-            config=Config(signature_version="s3v4")
-        )
+        client_key = (endpoint_url, access_key, secret_key, region_name)
+        with self._clients_lock:
+            if client_key not in self._clients:
+                self._clients[client_key] = boto3.client(
+                    "s3",
+                    endpoint_url=endpoint_url,
+                    aws_access_key_id=access_key,
+                    aws_secret_access_key=secret_key,
+                    region_name=region_name,
+                    config=Config(
+                        signature_version="s3v4",
+                        max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                        retries={"max_attempts": 3, "mode": "standard"}
+                    )
+                )
+            self.s3_client = self._clients[client_key]
         
-        # Ensure bucket exists
-        self._ensure_bucket_exists()
+        # Ensure bucket exists, once per process
+        bucket_key = (client_key, bucket_name)
+        if bucket_key not in self._ready_buckets:
+            self._ensure_bucket_exists()
+            self._ready_buckets.add(bucket_key)
+    
+    @classmethod
+    def from_settings(cls) -> "StorageService":
+        """Media bucket client, preferring S3_* credentials over AWS_* ones."""
+        return cls(
+            bucket_name=settings.S3_BUCKET_NAME,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            access_key=settings.S3_ACCESS_KEY or settings.AWS_ACCESS_KEY_ID,
+            secret_key=settings.S3_SECRET_KEY or settings.AWS_SECRET_ACCESS_KEY,
+            region_name=settings.AWS_REGION
+        )
+    
+    async def _call(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking boto3 call on the shared I/O pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_io_executor(), partial(func, *args, **kwargs))
     
     def _ensure_bucket_exists(self):
         """Create bucket if it doesn't exist."""
@@ -73,6 +144,22 @@ class StorageService:
         Returns:
             S3 object key
         """
+        return await self._call(
+            self.upload_file_sync,
+            file_path,
+            object_key,
+            metadata=metadata,
+            content_type=content_type
+        )
+    
+    def upload_file_sync(
+        self,
+        file_path: str,
+        object_key: str,
+        metadata: Optional[Dict[str, str]] = None,
+        content_type: Optional[str] = None
+    ) -> str:
+        """Blocking upload_file, for callers already on a worker thread."""
         try:
             extra_args = {}
             if metadata:
@@ -84,7 +171,8 @@ class StorageService:
                 file_path,
                 self.bucket_name,
                 object_key,
-                ExtraArgs=extra_args if extra_args else None
+                ExtraArgs=extra_args if extra_args else None,
+                Config=self.transfer_config
             )
             
             logger.info(f"Uploaded file to S3: {object_key}")
@@ -94,6 +182,65 @@ class StorageService:
             logger.error(f"Error uploading file: {e}")
             raise
     
+    async def upload_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        object_key: str,
+        content_type: Optional[str] = None,
+        part_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Upload a stream of bytes without holding it in memory or on disk.
+        
+        Chunks are gathered into parts of part_size and sent as a multipart
+        upload, so memory use is bounded by one part whatever the total
+        size. A stream shorter than one part is stored with a single PUT.
+        The multipart upload is aborted if the stream or a part fails.
+        
+        Args:
+            chunks: Async iterator of byte chunks, e.g. read_chunks(upload)
+            object_key: S3 object key
+            content_type: Optional content type
+            part_size: Bytes per part; S3 requires at least 5 MiB
+        
+        Returns:
+            Dictionary with "key" and "size"
+        """
+        part_size = part_size or settings.S3_MULTIPART_PART_SIZE
+        buffer = bytearray()
+        parts = []
+        upload_id = None
+        size = 0
+        
+        try:
+            async for chunk in chunks:
+                buffer.extend(chunk)
+                size += len(chunk)
+                
+                while len(buffer) >= part_size:
+                    if upload_id is None:
+                        upload_id = await self.create_multipart_upload(object_key, content_type=content_type)
+                    parts.append(await self.upload_part(
+                        object_key, upload_id, len(parts) + 1, bytes(buffer[:part_size])
+                    ))
+                    del buffer[:part_size]
+            
+            if upload_id is None:
+                await self.put_bytes(object_key, bytes(buffer), content_type=content_type)
+            else:
+                if buffer:
+                    parts.append(await self.upload_part(object_key, upload_id, len(parts) + 1, bytes(buffer)))
+                await self.complete_multipart_upload(object_key, upload_id, parts)
+            
+            logger.info(f"Streamed {size} bytes to S3: {object_key}")
+            return {"key": object_key, "size": size}
+            
+        except Exception as e:
+            logger.error(f"Error streaming upload to {object_key}: {e}")
+            if upload_id is not None:
+                await self.abort_multipart_upload(object_key, upload_id)
+            raise
+    
     async def download_file(self, object_key: str, download_path: str) -> str:
         """
         Download a file from S3/MinIO.
@@ -109,10 +256,12 @@ class StorageService:
             # Ensure directory exists
             os.makedirs(os.path.dirname(download_path), exist_ok=True)
             
-            self.s3_client.download_file(
+            await self._call(
+                self.s3_client.download_file,
                 self.bucket_name,
                 object_key,
-                download_path
+                download_path,
+                Config=self.transfer_config
             )
             
             logger.info(f"Downloaded file from S3: {object_key}")
@@ -133,7 +282,8 @@ class StorageService:
             Success status
         """
         try:
-            self.s3_client.delete_object(
+            await self._call(
+                self.s3_client.delete_object,
                 Bucket=self.bucket_name,
                 Key=object_key
             )
@@ -145,6 +295,103 @@ class StorageService:
             logger.error(f"Error deleting file: {e}")
             return False
     
+    async def delete_files(self, object_keys: List[str]) -> List[str]:
+        """
+        Delete many files with DeleteObjects, up to 1000 keys per request.
+        
+        Args:
+            object_keys: S3 object keys; keys that don't exist count as deleted
+        
+        Returns:
+            Keys that could not be deleted
+        """
+        failed = []
+        for start in range(0, len(object_keys), self.DELETE_BATCH_SIZE):
+            batch = object_keys[start:start + self.DELETE_BATCH_SIZE]
+            try:
+                response = await self._call(
+                    self.s3_client.delete_objects,
+                    Bucket=self.bucket_name,
+                    Delete={
+                        "Objects": [{"Key": key} for key in batch],
+                        "Quiet": True
+                    }
+                )
+                errors = response.get("Errors", [])
+                failed.extend(error["Key"] for error in errors)
+                for error in errors[:5]:
+                    logger.error(f"Error deleting {error['Key']}: {error.get('Code')} {error.get('Message')}")
+                
+            except ClientError as e:
+                logger.error(f"Error deleting {len(batch)} files: {e}")
+                failed.extend(batch)
+        
+        logger.info(f"Deleted {len(object_keys) - len(failed)} files from S3")
+        return failed
+    
+    async def put_bytes(
+        self,
+        object_key: str,
+        data: bytes,
+        content_type: Optional[str] = None
+    ) -> str:
+        """
+        Store an in-memory payload as an S3/MinIO object.
+        
+        Args:
+            object_key: S3 object key
+            data: Object contents
+            content_type: Optional content type
+        
+        Returns:
+            S3 object key
+        """
+        try:
+            args = {"Bucket": self.bucket_name, "Key": object_key, "Body": data}
+            if content_type:
+                args["ContentType"] = content_type
+            
+            await self._call(self.s3_client.put_object, **args)
+            
+            logger.info(f"Stored object in S3: {object_key}")
+            return object_key
+            
+        except ClientError as e:
+            logger.error(f"Error storing object: {e}")
+            raise
+    
+    async def get_bytes(
+        self,
+        object_key: str,
+        byte_range: Optional[Tuple[int, int]] = None
+    ) -> Optional[bytes]:
+        """
+        Read an S3/MinIO object, or a range of it, into memory.
+        
+        Args:
+            object_key: S3 object key
+            byte_range: (start, end) byte offsets to read, end exclusive
+        
+        Returns:
+            Object contents, or None if the object does not exist
+        """
+        try:
+            def _read_object():
+                args = {"Bucket": self.bucket_name, "Key": object_key}
+                if byte_range:
+                    args["Range"] = f"bytes={byte_range[0]}-{byte_range[1] - 1}"
+                response = self.s3_client.get_object(**args)
+                return response["Body"].read()
+            
+            return await self._call(_read_object)
+            
+        except ClientError as e:
+            error_code = e.response["Error"]["Code"]
+            if error_code in ("404", "NoSuchKey"):
+                return None
+            logger.error(f"Error reading object: {e}")
+            raise
+    
     async def file_exists(self, object_key: str) -> bool:
         """
         Check if a file exists in S3/MinIO.
@@ -155,9 +402,6 @@ class StorageService:
         Returns:
             Existence status
         """
-        # Run synchronous boto3 call in thread pool
-        loop = asyncio.get_event_loop()
-        
         def _check_exists():
             try:
                 self.s3_client.head_object(
@@ -172,7 +416,7 @@ class StorageService:
                 logger.error(f"Error checking file existence: {e}")
                 raise
         
-        return await loop.run_in_executor(None, _check_exists)
+        return await self._call(_check_exists)
     
     async def get_file_info(self, object_key: str) -> Optional[Dict[str, Any]]:
         """
@@ -185,7 +429,8 @@ class StorageService:
             File metadata
         """
         try:
-            response = self.s3_client.head_object(
+            response = await self._call(
+                self.s3_client.head_object,
                 Bucket=self.bucket_name,
                 Key=object_key
             )
@@ -222,9 +467,6 @@ class StorageService:
         Returns:
             Presigned URL
         """
-        # Run synchronous boto3 call in thread pool to avoid blocking async context
-        loop = asyncio.get_event_loop()
-        
         def _generate_url():
             try:
                 if http_method == "GET":
@@ -254,14 +496,14 @@ class StorageService:
                 logger.error(f"Error generating presigned URL: {e}")
                 raise
         
-        # Execute sync function in thread pool
-        return await loop.run_in_executor(None, _generate_url)
+        return await self._call(_generate_url)
     
     async def list_files(
         self,
         prefix: str = "",
         max_keys: int = 1000,
-        delimiter: Optional[str] = None
+        delimiter: Optional[str] = None,
+        continuation_token: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         List files in S3/MinIO bucket.
@@ -270,6 +512,7 @@ class StorageService:
             prefix: Object key prefix
             max_keys: Maximum number of keys to return
             delimiter: Delimiter for grouping keys
+            continuation_token: next_token of the previous page
         
         Returns:
             List response
@@ -284,8 +527,10 @@ class StorageService:
                 params["Prefix"] = prefix
             if delimiter:
                 params["Delimiter"] = delimiter
+            if continuation_token:
+                params["ContinuationToken"] = continuation_token
             
-            response = self.s3_client.list_objects_v2(**params)
+            response = await self._call(self.s3_client.list_objects_v2, **params)
             
             files = []
             for obj in response.get("Contents", []):
@@ -329,7 +574,8 @@ class StorageService:
                 "Key": source_key
             }
             
-            self.s3_client.copy_object(
+            await self._call(
+                self.s3_client.copy_object,
                 CopySource=copy_source,
                 Bucket=self.bucket_name,
                 Key=dest_key
@@ -367,7 +613,7 @@ class StorageService:
             if content_type:
                 args["ContentType"] = content_type
             
-            response = self.s3_client.create_multipart_upload(**args)
+            response = await self._call(self.s3_client.create_multipart_upload, **args)
             
             return response["UploadId"]
             
@@ -395,7 +641,8 @@ class StorageService:
             Part info
         """
         try:
-            response = self.s3_client.upload_part(
+            response = await self._call(
+                self.s3_client.upload_part,
                 Bucket=self.bucket_name,
                 Key=object_key,
                 PartNumber=part_number,
@@ -412,6 +659,55 @@ class StorageService:
             logger.error(f"Error uploading part: {e}")
             raise
     
+    async def upload_part_copy(
+        self,
+        object_key: str,
+        upload_id: str,
+        part_number: int,
+        source_key: str,
+        source_range: Optional[Tuple[int, int]] = None
+    ) -> Dict[str, Any]:
+        """
+        Copy an existing object, or a range of it, into a multipart upload
+        as one part.
+        
+        The copy happens inside S3; no data passes through this process.
+        
+        Args:
+            object_key: S3 object key
+            upload_id: Upload ID
+            part_number: Part number (1-10000)
+            source_key: Object to copy, from the same bucket
+            source_range: (start, end) byte offsets to copy, end exclusive;
+                at most 5 GiB
+        
+        Returns:
+            Part info
+        """
+        try:
+            args = {}
+            if source_range:
+                args["CopySourceRange"] = f"bytes={source_range[0]}-{source_range[1] - 1}"
+            
+            response = await self._call(
+                self.s3_client.upload_part_copy,
+                Bucket=self.bucket_name,
+                Key=object_key,
+                PartNumber=part_number,
+                UploadId=upload_id,
+                CopySource={"Bucket": self.bucket_name, "Key": source_key},
+                **args
+            )
+            
+            return {
+                "ETag": response["CopyPartResult"]["ETag"],
+                "PartNumber": part_number
+            }
+            
+        except ClientError as e:
+            logger.error(f"Error copying part: {e}")
+            raise
+    
     async def complete_multipart_upload(
         self,
         object_key: str,
@@ -430,7 +726,8 @@ class StorageService:
             Object key
         """
         try:
-            self.s3_client.complete_multipart_upload(
+            await self._call(
+                self.s3_client.complete_multipart_upload,
                 Bucket=self.bucket_name,
                 Key=object_key,
                 UploadId=upload_id,
@@ -460,7 +757,8 @@ class StorageService:
             Success status
         """
         try:
-            self.s3_client.abort_multipart_upload(
+            await self._call(
+                self.s3_client.abort_multipart_upload,
                 Bucket=self.bucket_name,
                 Key=object_key,
                 UploadId=upload_id
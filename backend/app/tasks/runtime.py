@@ -0,0 +1,80 @@
+"""Per-process async runtime shared by Celery tasks."""
+import asyncio
+import logging
+import threading
+from typing import Awaitable, Optional, TypeVar
+
+from celery.signals import worker_process_init, worker_process_shutdown
+
+from app.core.database import sync_engine
+from app.db.session import engine as async_engine
+from app.services.storage import StorageService
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_local = threading.local()
+
+
+class WorkerRuntime:
+    """
+    Event loop and storage client kept for the life of a worker process.
+
+    Tasks used to build a fresh loop (or asyncio.run) per task, or even per
+    S3 call, and a new boto3 client each time. Sharing them also keeps
+    pooled async DB connections usable between tasks, since those are bound
+    to the loop that opened them.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.storage_service = StorageService.from_settings()
+
+    def run(self, awaitable: Awaitable[T]) -> T:
+        """Run a coroutine to completion on the shared loop."""
+        return self.loop.run_until_complete(awaitable)
+
+    def close(self):
+        """Release pooled async DB connections and close the loop."""
+        try:
+            self.run(async_engine.dispose())
+        finally:
+            self.loop.close()
+
+
+def get_runtime() -> WorkerRuntime:
+    """
+    The calling thread's runtime.
+
+    Prefork workers create it at process start; other pools, eager tasks
+    and scripts get one on first use.
+    """
+    runtime: Optional[WorkerRuntime] = getattr(_local, "runtime", None)
+    if runtime is None or runtime.loop.is_closed():
+        runtime = _local.runtime = WorkerRuntime()
+    return runtime
+
+
+def run_async(awaitable: Awaitable[T]) -> T:
+    """Run a coroutine on the calling thread's shared loop."""
+    return get_runtime().run(awaitable)
+
+
+@worker_process_init.connect
+def init_worker_runtime(**kwargs):
+    """Set up the runtime in a freshly forked worker process."""
+    # Pooled connections inherited from the parent must not be shared
+    sync_engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+    _local.runtime = WorkerRuntime()
+    logger.info("Worker runtime initialized")
+
+
+@worker_process_shutdown.connect
+def close_worker_runtime(**kwargs):
+    """Tear down the runtime when the worker process exits."""
+    runtime: Optional[WorkerRuntime] = getattr(_local, "runtime", None)
+    if runtime is not None and not runtime.loop.is_closed():
+        runtime.close()
@@ -1,25 +1,32 @@
 """Celery tasks for video processing."""
 import os
+import shutil
 import tempfile
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union
+from typing import Dict, Iterator, List, Optional, Union
+from itertools import chain
 from pathlib import Path
-import asyncio
 import uuid
 
-from celery import Task
+from celery import Task, chord
 from sqlalchemy.orm import Session
 
 from app.core.celery_app import celery_app
+from app.tasks.runtime import get_runtime, run_async
 from app.core.database import get_db_sync
 from app.core.config import settings
 from app.services.media.video_processor import VideoProcessor
+from app.services.media.upload_queue import UploadQueue
+from app.services.media.hls import HLS_CONTENT_TYPES
+from app.services.media.progress import ProgressReporter, publish_progress
 from app.services.storage import StorageService
-from app.services.analytics import AudioAnalysisService
+from app.services.analytics import AudioAnalysisService, AnalysisCache
+from app.services.analytics.metrics_writer import write_practice_metrics
+from app.services.analytics.time_series import decode_series
 from app.models.practice import PracticeSession, VideoQuality, ProcessingStatus
 from app.models.notification import Notification, NotificationType
-from app.models.analytics import PracticeMetrics, AnalysisResult, MetricType
+from app.models.analytics import AnalysisResult, MetricType
 from app.schemas.video_processing import (
     VideoProcessingResult,
     ProcessingProgress,
@@ -42,13 +49,8 @@ class CallbackTask(Task):
 
 
 def get_storage_service():
-    """Get storage service instance."""
-    return StorageService(
-        bucket_name=settings.S3_BUCKET_NAME,
-        endpoint_url=settings.S3_ENDPOINT_URL,
-        access_key=settings.S3_ACCESS_KEY,
-        secret_key=settings.S3_SECRET_KEY
-    )
+    """Get the worker's shared storage service instance."""
+    return get_runtime().storage_service
 
 
 async def update_processing_status(
@@ -58,7 +60,12 @@ async def update_processing_status(
     error_message: Optional[str] = None,
     result: Optional[Dict] = None
 ):
-    """Update practice session processing status."""
+    """
+    Update practice session processing status.
+    
+    The change is also published as the session's live progress, so
+    status polls served from Redis never lag behind the database.
+    """
     # Skip database updates for non-UUID session IDs (temporary sessions)
     try:
         # Try to parse as UUID
@@ -87,6 +94,7 @@ async def update_processing_status(
                 session.processing_result = result
             
             db.commit()
+            publish_progress(session_uuid, status, progress, user_id=session.student_id)
     finally:
         db.close()
 
@@ -132,28 +140,142 @@ async def send_processing_notification(
         db.close()
 
 
+def analysis_result_fields(analysis_results: Dict) -> Dict:
+    """Map an audio analysis result onto AnalysisResult columns."""
+    overall = analysis_results["overall_metrics"]
+    return {
+        "analysis_version": AudioAnalysisService.ANALYSIS_VERSION,
+        "overall_consistency_score": overall["overall_consistency"],
+        "tempo_score": overall["tempo_score"],
+        "pitch_score": overall["pitch_score"],
+        "dynamics_score": overall["dynamics_score"],
+        "vibrato_score": overall["vibrato_score"],
+        "technical_proficiency_score": overall["technical_proficiency"],
+        "musical_expression_score": overall["musical_expression"],
+        "average_tempo_bpm": analysis_results["tempo"]["bpm"],
+        "tempo_stability": analysis_results["tempo"]["tempo_stability"],
+        "pitch_range_min_hz": analysis_results["pitch"]["pitch_range"]["min_hz"],
+        "pitch_range_max_hz": analysis_results["pitch"]["pitch_range"]["max_hz"],
+        "pitch_stability": analysis_results["pitch"]["pitch_stability"],
+        "dynamic_range_db": analysis_results["dynamics"]["dynamic_range_db"],
+        "dynamics_stability": analysis_results["dynamics"]["dynamics_stability"],
+        "vibrato_rate_hz": analysis_results["vibrato"]["average_rate_hz"],
+        "vibrato_extent_percent": analysis_results["vibrato"]["average_extent_percent"],
+        "note_onset_count": analysis_results["note_onsets"]["onset_count"],
+        "timing_consistency": analysis_results["note_onsets"]["timing_consistency"],
+        "full_analysis_data": analysis_results,
+        "processing_time_seconds": analysis_results.get("duration", 0)
+    }
+
+
+def series_metric_rows(
+    encoded_series: Optional[Dict],
+    metric_type: MetricType,
+    session_id: uuid.UUID,
+    base_time: datetime
+) -> Iterator[Dict]:
+    """Turn an encoded analysis time series into PracticeMetrics rows."""
+    if not encoded_series:
+        return
+    
+    series = decode_series(encoded_series)
+    confidences = series.get("confidence")
+    
+    for i, (offset, value) in enumerate(zip(series["time"], series["mean"])):
+        yield {
+            "time": base_time + timedelta(seconds=float(offset)),
+            "session_id": session_id,
+            "metric_type": metric_type,
+            "value": float(value),
+            "confidence": float(confidences[i]) if confidences is not None else None
+        }
+
+
+def use_segmented_transcode(video_info: Dict) -> bool:
+    """Whether a recording is long enough to spread its encode over workers."""
+    min_duration = settings.VIDEO_SEGMENTED_MIN_DURATION
+    return min_duration > 0 and video_info["duration"] >= min_duration
+
+
+async def list_prefix_keys(storage_service: StorageService, prefix: str) -> List[str]:
+    """Every object key under a storage prefix."""
+    keys = []
+    token = None
+    while True:
+        listing = await storage_service.list_files(prefix=prefix, continuation_token=token)
+        keys.extend(file["key"] for file in listing["files"])
+        token = listing["next_token"]
+        if not listing["is_truncated"] or not token:
+            return keys
+
+
+async def delete_prefix(storage_service: StorageService, prefix: str) -> int:
+    """
+    Delete every object under a storage prefix.
+    
+    Returns:
+        Number of objects deleted
+    """
+    keys = await list_prefix_keys(storage_service, prefix)
+    failed = await storage_service.delete_files(keys)
+    return len(keys) - len(failed)
+
+
+def session_storage_keys(session: PracticeSession) -> List[str]:
+    """Storage keys of a session's original video and recorded outputs."""
+    result = session.processing_result or {}
+    keys = [info["path"] for info in result.get("transcoded_videos", {}).values()]
+    keys.extend(thumb["path"] for thumb in result.get("thumbnails", []))
+    for output in ("audio_track", "preview_clip"):
+        if result.get(output):
+            keys.append(result[output]["path"])
+    if session.video_url:
+        keys.append(session.video_url)
+    
+    # Qualities served by another rendition share its path
+    return list(dict.fromkeys(keys))
+
+
+def session_storage_prefixes(session: PracticeSession) -> List[str]:
+    """Storage prefixes holding a session's unrecorded objects."""
+    result = session.processing_result or {}
+    prefixes = []
+    if result.get("hls"):
+        prefixes.append(result["hls"]["prefix"] + "/")
+    if session.processing_status != ProcessingStatus.COMPLETED:
+        # An unfinished parallel transcode may have left segments behind
+        prefixes.append(f"videos/sessions/{session.id}/segments/")
+    return prefixes
+
+
 @celery_app.task(base=CallbackTask, bind=True, max_retries=3)
 def process_video(
     self,
     session_id: Union[str, uuid.UUID],
     video_path: str,
     user_id: Union[str, uuid.UUID],
-    qualities: List[str] = None
+    qualities: List[str] = None,
+    segment_renditions: Optional[Dict[str, List[str]]] = None
 ) -> Dict:
     """
     Main video processing task.
     
+    Recordings longer than VIDEO_SEGMENTED_MIN_DURATION are split into
+    segments that transcode_segment encodes in parallel; the chord callback
+    then runs this task again with the encoded segments, which are joined
+    in place of the single-pass encode.
+    
     Args:
         session_id: Practice session ID
         video_path: Path to original video in storage
         user_id: User ID for notifications
         qualities: List of quality levels to generate
+        segment_renditions: Encoded segment keys per quality, in order
     
     Returns:
-        Processing result dictionary
+        Processing result dictionary, or the segment fan-out summary
     """
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+    uploads = None
     
     try:
         # Default qualities if not specified
@@ -161,25 +283,26 @@ def process_video(
             qualities = ["low", "medium", "high"]
         
         # Update status to processing
-        loop.run_until_complete(
+        run_async(
             update_processing_status(session_id, ProcessingStatus.PROCESSING, 0.1)
         )
         
         # Initialize services
         storage_service = get_storage_service()
         video_processor = VideoProcessor(storage_service)
+        uploads = UploadQueue(storage_service)
         
         # Download original video to temp
         temp_dir = Path(tempfile.mkdtemp())
         original_path = temp_dir / "original.mp4"
         
         logger.info(f"Downloading video from {video_path}")
-        loop.run_until_complete(
+        run_async(
             storage_service.download_file(video_path, str(original_path))
         )
         
         # Get video info
-        video_info = loop.run_until_complete(
+        video_info = run_async(
             video_processor.get_video_info(str(original_path))
         )
         
@@ -192,94 +315,209 @@ def process_video(
             "audio_analysis": None
         }
         
-        # Progress tracking
+        # Progress tracking; ffmpeg reports many times a second, so updates
+        # are throttled and only milestones reach the database
         total_steps = len(qualities) + 4  # qualities + thumbnails + audio + analysis + preview
         current_step = 0
+        progress_reporter = ProgressReporter(session_id, user_id, persist=update_processing_status)
         
         async def update_progress(progress: float):
             """Update task progress."""
             overall_progress = (current_step + progress) / total_steps
-            await update_processing_status(
-                session_id,
-                ProcessingStatus.PROCESSING,
-                overall_progress
-            )
+            await progress_reporter.update(overall_progress)
         
-        # Process each quality level
-        for quality in qualities:
-            current_step += 1
-            quality_enum = VideoQuality(quality)
-            
-            output_filename = f"session_{session_id}_{quality}.mp4"
-            output_path = temp_dir / output_filename
-            
-            logger.info(f"Transcoding to {quality} quality")
-            loop.run_until_complete(
-                video_processor.transcode_video(
+        output_paths = {
+            VideoQuality(quality): temp_dir / f"session_{session_id}_{quality}.mp4"
+            for quality in qualities
+        }
+        audio_path = temp_dir / f"session_{session_id}_audio.mp3"
+        plan = video_processor.plan_renditions(video_info, list(output_paths))
+        encoded_plan = {
+            quality.value: step for quality, step in plan.items() if step["action"] == "encode"
+        }
+        segments_prefix = f"videos/sessions/{session_id}/segments"
+        
+        if segment_renditions is None and encoded_plan and use_segmented_transcode(video_info):
+            # Split at keyframes and fan the encodes out over the worker pool;
+            # the chord callback queues this task again to finish up
+            segment_paths = run_async(
+                video_processor.split_segments(
                     str(original_path),
-                    str(output_path),
-                    quality_enum,
-                    update_progress
+                    str(temp_dir / "segments"),
+                    settings.VIDEO_SEGMENT_SECONDS
                 )
             )
+            segment_keys = []
+            for segment_path in segment_paths:
+                segment_key = f"{segments_prefix}/source/{Path(segment_path).name}"
+                uploads.submit(segment_path, segment_key)
+                segment_keys.append(segment_key)
+            uploads.wait()
+            
+            chord([
+                transcode_segment.s(session_id, user_id, segment_key, encoded_plan)
+                for segment_key in segment_keys
+            ])(assemble_segmented_video.s(session_id, video_path, user_id, qualities, self.request.id))
+            
+            logger.info(f"Transcoding session {session_id} in {len(segment_keys)} segments")
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return {
+                "segments": len(segment_keys),
+                "qualities": list(encoded_plan)
+            }
+        
+        single_pass_plan = plan
+        if segment_renditions:
+            # Join the segments the workers encoded; stream-copied qualities,
+            # thumbnails and audio still come from the pass below
+            logger.info(f"Joining {', '.join(segment_renditions)} from encoded segments")
+            for quality_value, segment_keys in segment_renditions.items():
+                quality = VideoQuality(quality_value)
+                segment_dir = temp_dir / "segments" / quality_value
+                segment_paths = [
+                    run_async(
+                        storage_service.download_file(segment_key, str(segment_dir / Path(segment_key).name))
+                    )
+                    for segment_key in segment_keys
+                ]
+                run_async(
+                    video_processor.concatenate_videos(
+                        segment_paths,
+                        str(output_paths[quality]),
+                        stream_copy=True,
+                        audio_source=str(original_path) if video_info.get("audio_codec") else None,
+                        audio_bitrate=VideoProcessor.QUALITY_SETTINGS[quality]["audio_bitrate"]
+                    )
+                )
+                shutil.rmtree(segment_dir, ignore_errors=True)
             
-            # Upload to storage
-            storage_key = f"videos/sessions/{session_id}/{output_filename}"
-            loop.run_until_complete(
-                storage_service.upload_file(str(output_path), storage_key)
+            single_pass_plan = {
+                quality: step for quality, step in plan.items()
+                if quality.value not in segment_renditions
+            }
+        
+        # Transcode the qualities the source warrants, grab thumbnails and
+        # extract the audio track from a single decode of the original
+        logger.info(f"Transcoding to {', '.join(qualities)} with thumbnails and audio")
+        transcode_steps = len(qualities) + 2  # qualities + thumbnails + audio
+        outputs = run_async(
+            video_processor.transcode_renditions(
+                str(original_path),
+                {quality: str(output_paths[quality]) for quality in single_pass_plan},
+                thumbnail_dir=str(temp_dir),
+                thumbnail_count=5,
+                audio_output=str(audio_path),
+                video_info=video_info,
+                plan=single_pass_plan,
+                # One ffmpeg run covers several steps
+                progress_callback=lambda progress: update_progress(progress * transcode_steps)
             )
+        )
+        for quality_value in segment_renditions or {}:
+            quality = VideoQuality(quality_value)
+            outputs["renditions"][quality] = str(output_paths[quality])
+            outputs["plan"][quality_value] = plan[quality]
+        current_step += transcode_steps
+        
+        # Uploads run on worker threads while analysis and the preview encode
+        for quality, output_path in outputs["renditions"].items():
+            output_path = Path(output_path)
+            storage_key = f"videos/sessions/{session_id}/{output_path.name}"
+            uploads.submit(str(output_path), storage_key)
             
-            results["transcoded_videos"][quality] = {
+            results["transcoded_videos"][quality.value] = {
                 "path": storage_key,
                 "size": output_path.stat().st_size,
-                "quality": quality
+                "quality": quality.value,
+                "method": outputs["plan"][quality.value]["action"]
             }
         
-        # Generate thumbnails
-        current_step += 1
-        logger.info("Generating thumbnails")
-        thumbnail_paths = loop.run_until_complete(
-            video_processor.generate_thumbnails(str(original_path), count=5)
+        # Tiers above the source resolution weren't produced; serve the
+        # largest rendition that was
+        produced_tiers = [
+            quality for quality in outputs["renditions"]
+            if not VideoProcessor.QUALITY_SETTINGS[quality].get("copy")
+        ]
+        for quality in output_paths:
+            if quality not in outputs["renditions"] and produced_tiers:
+                served_by = max(produced_tiers, key=lambda q: VideoProcessor.QUALITY_SETTINGS[q]["width"])
+                results["transcoded_videos"][quality.value] = {
+                    **results["transcoded_videos"][served_by.value],
+                    "served_by": served_by.value
+                }
+        
+        # Segment the renditions for adaptive streaming (remux only)
+        hls_dir = temp_dir / "hls"
+        hls_prefix = f"videos/sessions/{session_id}/hls"
+        hls_package = run_async(
+            video_processor.package_hls(outputs["renditions"], str(hls_dir))
         )
+        for relative_path in hls_package["files"]:
+            uploads.submit(
+                str(hls_dir / relative_path),
+                f"{hls_prefix}/{relative_path}",
+                content_type=HLS_CONTENT_TYPES.get(Path(relative_path).suffix)
+            )
+        results["hls"] = {
+            "prefix": hls_prefix,
+            "master": f"{hls_prefix}/master.m3u8",
+            "segment_seconds": hls_package["segment_seconds"],
+            "variants": {
+                variant["quality"]: {
+                    "path": f"{hls_prefix}/{variant['uri']}",
+                    "bandwidth": variant["bandwidth"],
+                    "width": variant["width"],
+                    "height": variant["height"]
+                }
+                for variant in hls_package["variants"]
+            }
+        }
         
+        thumbnail_paths = outputs["thumbnails"]
         for i, thumb_path in enumerate(thumbnail_paths):
             thumb_key = f"videos/sessions/{session_id}/thumb_{i}.jpg"
-            loop.run_until_complete(
-                storage_service.upload_file(thumb_path, thumb_key)
-            )
+            uploads.submit(thumb_path, thumb_key)
             results["thumbnails"].append({
                 "path": thumb_key,
                 "index": i
             })
         
-        # Extract audio
-        current_step += 1
-        logger.info("Extracting audio track")
-        audio_path = temp_dir / f"session_{session_id}_audio.mp3"
-        loop.run_until_complete(
-            video_processor.extract_audio(
-                str(original_path),
-                str(audio_path)
-            )
-        )
-        
-        audio_key = f"videos/sessions/{session_id}/audio.mp3"
-        loop.run_until_complete(
-            storage_service.upload_file(str(audio_path), audio_key)
-        )
-        results["audio_track"] = {
-            "path": audio_key,
-            "format": "mp3",
-            "bitrate": "192k"
-        }
+        if outputs["audio"]:
+            audio_key = f"videos/sessions/{session_id}/audio.mp3"
+            uploads.submit(str(audio_path), audio_key)
+            results["audio_track"] = {
+                "path": audio_key,
+                "format": "mp3",
+                "bitrate": "192k"
+            }
         
         # Perform audio analysis
         current_step += 1
         logger.info("Analyzing audio for practice metrics")
+        run_async(update_progress(0))
         try:
+            # Decode PCM straight from the source video instead of re-decoding the MP3
             audio_analysis_service = AudioAnalysisService()
-            analysis_results = loop.run_until_complete(
-                audio_analysis_service.analyze_audio_file(str(audio_path))
+            features = run_async(
+                audio_analysis_service.extract_pcm_features(
+                    video_processor.stream_audio_pcm(
+                        str(original_path),
+                        sample_rate=audio_analysis_service.sr
+                    ),
+                    content_digest=AnalysisCache.file_digest(str(original_path))
+                )
+            )
+            
+            # Keep the features so the session can be re-scored without the video
+            results["analysis_features"] = {
+                "path": run_async(
+                    audio_analysis_service.save_session_features(storage_service, session_id, features)
+                ),
+                "feature_version": audio_analysis_service.FEATURE_VERSION
+            }
+            
+            analysis_results = run_async(
+                audio_analysis_service.analyze_features(features)
             )
             
             # Store analysis results
@@ -297,73 +535,34 @@ def process_video(
                 # Create analysis result record
                 analysis_record = AnalysisResult(
                     session_id=session_uuid,
-                    overall_consistency_score=analysis_results["overall_metrics"]["overall_consistency"],
-                    tempo_score=analysis_results["overall_metrics"]["tempo_score"],
-                    pitch_score=analysis_results["overall_metrics"]["pitch_score"],
-                    dynamics_score=analysis_results["overall_metrics"]["dynamics_score"],
-                    vibrato_score=analysis_results["overall_metrics"]["vibrato_score"],
-                    technical_proficiency_score=analysis_results["overall_metrics"]["technical_proficiency"],
-                    musical_expression_score=analysis_results["overall_metrics"]["musical_expression"],
-                    average_tempo_bpm=analysis_results["tempo"]["bpm"],
-                    tempo_stability=analysis_results["tempo"]["tempo_stability"],
-                    pitch_range_min_hz=analysis_results["pitch"]["pitch_range"]["min_hz"],
-                    pitch_range_max_hz=analysis_results["pitch"]["pitch_range"]["max_hz"],
-                    pitch_stability=analysis_results["pitch"]["pitch_stability"],
-                    dynamic_range_db=analysis_results["dynamics"]["dynamic_range_db"],
-                    dynamics_stability=analysis_results["dynamics"]["dynamics_stability"],
-                    vibrato_rate_hz=analysis_results["vibrato"]["average_rate_hz"],
-                    vibrato_extent_percent=analysis_results["vibrato"]["average_extent_percent"],
-                    note_onset_count=analysis_results["note_onsets"]["onset_count"],
-                    timing_consistency=analysis_results["note_onsets"]["timing_consistency"],
-                    full_analysis_data=analysis_results,
-                    processing_time_seconds=analysis_results.get("duration", 0)
+                    **analysis_result_fields(analysis_results)
                 )
                 db.add(analysis_record)
+                db.commit()
                 
-                # Store time-series metrics
-                # Use bulk insert to avoid TimescaleDB composite key issues
-                metrics_to_insert = []
+                # Store time-series metrics, streamed in COPY batches outside
+                # this session so its transaction stays short
                 base_time = datetime.utcnow()
+                metric_rows = chain.from_iterable(
+                    series_metric_rows(
+                        analysis_results[section][name],
+                        metric_type,
+                        session_uuid,
+                        base_time
+                    )
+                    # Downsampled series cover the whole recording
+                    for (section, name), metric_type in [
+                        (("tempo", "tempo_series"), MetricType.TEMPO_BPM),
+                        (("pitch", "pitch_series"), MetricType.PITCH_HZ),
+                        (("dynamics", "db_series"), MetricType.DYNAMICS_DB)
+                    ]
+                )
+                metrics_written = write_practice_metrics(metric_rows)
                 
-                # Tempo variations over time
-                for i, tempo in enumerate(analysis_results["tempo"]["tempo_variations"]):
-                    time_offset = i * (analysis_results["duration"] / len(analysis_results["tempo"]["tempo_variations"]))
-                    metrics_to_insert.append({
-                        "time": base_time + timedelta(seconds=time_offset),
-                        "session_id": session_uuid,
-                        "metric_type": MetricType.TEMPO_BPM,
-                        "value": tempo
-                    })
-                
-                # Store sample of pitch values
-                pitch_values = analysis_results["pitch"]["pitch_values"][:100]  # Limit to 100 samples
-                for i, pitch in enumerate(pitch_values):
-                    time_offset = i * (analysis_results["duration"] / len(pitch_values))
-                    metrics_to_insert.append({
-                        "time": base_time + timedelta(seconds=time_offset),
-                        "session_id": session_uuid,
-                        "metric_type": MetricType.PITCH_HZ,
-                        "value": pitch,
-                        "confidence": analysis_results["pitch"]["pitch_confidences"][i] if i < len(analysis_results["pitch"]["pitch_confidences"]) else None
-                    })
-                
-                # Store dynamics values
-                db_values = analysis_results["dynamics"]["db_values"][:100]  # Limit to 100 samples
-                for i, db_val in enumerate(db_values):
-                    time_offset = i * (analysis_results["duration"] / len(db_values))
-                    metrics_to_insert.append({
-                        "time": base_time + timedelta(seconds=time_offset),
-                        "session_id": session_uuid,
-                        "metric_type": MetricType.DYNAMICS_DB,
-                        "value": db_val
-                    })
-                
-                # Bulk insert all metrics to avoid composite key issues
-                if metrics_to_insert:
-                    db.bulk_insert_mappings(PracticeMetrics, metrics_to_insert)
-                
-                db.commit()
-                logger.info(f"Audio analysis completed and saved for session {session_id}")
+                logger.info(
+                    f"Audio analysis completed and saved for session {session_id} "
+                    f"({metrics_written} metric points)"
+                )
                 
                 # Track challenge progress with analysis results
                 try:
@@ -379,20 +578,15 @@ def process_video(
                             from app.services.practice.challenge_service import ChallengeService
                             challenge_service = ChallengeService(async_db)
                             
-                            # Run async code in sync context
-                            import asyncio
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                            
                             # Track with analysis results
-                            loop.run_until_complete(
+                            run_async(
                                 challenge_service.track_practice_session(session, analysis_record)
                             )
-                            loop.run_until_complete(async_db.commit())
+                            run_async(async_db.commit())
                             
                             logger.info(f"Challenge progress tracked for session {session_id}")
                         finally:
-                            loop.run_until_complete(async_db.close())
+                            run_async(async_db.close())
                 except Exception as e:
                     logger.error(f"Error tracking challenge progress: {str(e)}")
                     # Don't fail the task if challenge tracking fails
@@ -407,11 +601,12 @@ def process_video(
         # Create preview clip
         current_step += 1
         logger.info("Creating preview clip")
+        run_async(update_progress(0))
         preview_path = temp_dir / f"session_{session_id}_preview.mp4"
         
         # Start preview at 10% of video duration
         start_time = video_info["duration"] * 0.1
-        loop.run_until_complete(
+        run_async(
             video_processor.create_preview_clip(
                 str(original_path),
                 str(preview_path),
@@ -421,17 +616,20 @@ def process_video(
         )
         
         preview_key = f"videos/sessions/{session_id}/preview.mp4"
-        loop.run_until_complete(
-            storage_service.upload_file(str(preview_path), preview_key)
-        )
+        uploads.submit(str(preview_path), preview_key)
         results["preview_clip"] = {
             "path": preview_key,
             "duration": 30,
             "start_time": start_time
         }
         
+        # Outputs must be in storage before the session is marked complete
+        uploads.wait()
+        if segment_renditions:
+            run_async(delete_prefix(storage_service, f"{segments_prefix}/"))
+        
         # Update status to completed
-        loop.run_until_complete(
+        run_async(
             update_processing_status(
                 session_id,
                 ProcessingStatus.COMPLETED,
@@ -441,7 +639,7 @@ def process_video(
         )
         
         # Send completion notification
-        loop.run_until_complete(
+        run_async(
             send_processing_notification(
                 user_id,
                 session_id,
@@ -451,6 +649,7 @@ def process_video(
         )
         
         # Cleanup temp files
+        shutil.rmtree(hls_dir, ignore_errors=True)
         video_processor.cleanup_temp_files(
             [str(original_path), str(audio_path), str(preview_path)] +
             thumbnail_paths +
@@ -463,7 +662,7 @@ def process_video(
         logger.error(f"Video processing failed: {e}")
         
         # Update status to failed
-        loop.run_until_complete(
+        run_async(
             update_processing_status(
                 session_id,
                 ProcessingStatus.FAILED,
@@ -472,7 +671,7 @@ def process_video(
         )
         
         # Send failure notification
-        loop.run_until_complete(
+        run_async(
             send_processing_notification(
                 user_id,
                 session_id,
@@ -485,7 +684,128 @@ def process_video(
         raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
     
     finally:
-        loop.close()
+        if uploads is not None:
+            # No-op after a successful wait; drops queued uploads on failure
+            uploads.close(cancel=True)
+
+
+@celery_app.task(bind=True, max_retries=3)
+def transcode_segment(
+    self,
+    session_id: Union[str, uuid.UUID],
+    user_id: Union[str, uuid.UUID],
+    segment_key: str,
+    plan: Dict[str, Dict]
+) -> Dict[str, str]:
+    """
+    Encode one source segment to every planned quality.
+    
+    Args:
+        session_id: Practice session ID
+        user_id: User ID for notifications
+        segment_key: Source segment in storage
+        plan: Encode steps per quality, from plan_renditions on the full source
+    
+    Returns:
+        Encoded segment key per quality
+    """
+    temp_dir = Path(tempfile.mkdtemp())
+    
+    try:
+        storage_service = get_storage_service()
+        video_processor = VideoProcessor(storage_service)
+        
+        segment_name = Path(segment_key).name
+        segment_path = run_async(
+            storage_service.download_file(segment_key, str(temp_dir / segment_name))
+        )
+        
+        # Segments carry no audio; it is added back when they are joined
+        outputs = run_async(
+            video_processor.transcode_renditions(
+                segment_path,
+                {VideoQuality(quality): str(temp_dir / f"{quality}_{segment_name}") for quality in plan},
+                plan={VideoQuality(quality): step for quality, step in plan.items()}
+            )
+        )
+        
+        segment_keys = {}
+        for quality, output_path in outputs["renditions"].items():
+            encoded_key = f"videos/sessions/{session_id}/segments/{quality.value}/{segment_name}"
+            run_async(storage_service.upload_file(output_path, encoded_key))
+            segment_keys[quality.value] = encoded_key
+        
+        return segment_keys
+        
+    except Exception as e:
+        logger.error(f"Segment transcode failed for {segment_key}: {e}")
+        
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=30 * (2 ** self.request.retries))
+        
+        # The chord callback never runs once a segment gives up
+        run_async(
+            update_processing_status(
+                session_id,
+                ProcessingStatus.FAILED,
+                error_message=str(e)
+            )
+        )
+        run_async(
+            send_processing_notification(
+                user_id,
+                session_id,
+                ProcessingStatus.FAILED,
+                f"Video processing failed: {str(e)}"
+            )
+        )
+        raise
+    
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+@celery_app.task
+def assemble_segmented_video(
+    segment_results: List[Dict[str, str]],
+    session_id: Union[str, uuid.UUID],
+    video_path: str,
+    user_id: Union[str, uuid.UUID],
+    qualities: List[str],
+    job_id: str
+) -> str:
+    """
+    Chord callback: queue process_video to join the encoded segments.
+    
+    The join is claimed under the fanned-out job's ID, so a redelivered
+    callback (acks_late, a worker lost mid-join) finds it already queued.
+    
+    Args:
+        segment_results: transcode_segment results, in segment order
+        session_id: Practice session ID
+        video_path: Path to original video in storage
+        user_id: User ID for notifications
+        qualities: Quality levels requested
+        job_id: Task ID of the process_video run that fanned out
+    
+    Returns:
+        ID of the queued process_video task
+    """
+    from app.services.media.processing_queue import enqueue_processing
+    
+    segment_renditions = {
+        quality: [result[quality] for result in segment_results]
+        for quality in segment_results[0]
+    }
+    task_id, _ = run_async(enqueue_processing(
+        f"{job_id}:segments",
+        session_id,
+        video_path,
+        user_id,
+        qualities,
+        segment_renditions=segment_renditions
+    ))
+    return task_id
 
 
 @celery_app.task
@@ -509,51 +829,44 @@ def generate_thumbnail(
     Returns:
         Thumbnail information
     """
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+    storage_service = get_storage_service()
+    video_processor = VideoProcessor(storage_service)
     
-    try:
-        storage_service = get_storage_service()
-        video_processor = VideoProcessor(storage_service)
-        
-        # Download video
-        temp_dir = Path(tempfile.mkdtemp())
-        video_local_path = temp_dir / "video.mp4"
-        
-        loop.run_until_complete(
-            storage_service.download_file(video_path, str(video_local_path))
-        )
-        
-        # Generate thumbnail
-        thumb_path = temp_dir / f"thumb_{timestamp}.jpg"
-        loop.run_until_complete(
-            video_processor.generate_thumbnail(
-                str(video_local_path),
-                str(thumb_path),
-                timestamp,
-                width,
-                height
-            )
-        )
-        
-        # Upload thumbnail
-        thumb_key = f"videos/sessions/{session_id}/thumb_custom_{timestamp}.jpg"
-        loop.run_until_complete(
-            storage_service.upload_file(str(thumb_path), thumb_key)
+    # Download video
+    temp_dir = Path(tempfile.mkdtemp())
+    video_local_path = temp_dir / "video.mp4"
+    
+    run_async(
+        storage_service.download_file(video_path, str(video_local_path))
+    )
+    
+    # Generate thumbnail
+    thumb_path = temp_dir / f"thumb_{timestamp}.jpg"
+    run_async(
+        video_processor.generate_thumbnail(
+            str(video_local_path),
+            str(thumb_path),
+            timestamp,
+            width,
+            height
         )
-        
-        # Cleanup
-        video_processor.cleanup_temp_files([str(video_local_path), str(thumb_path)])
-        
-        return {
-            "path": thumb_key,
-            "timestamp": timestamp,
-            "width": width,
-            "height": height
-        }
-        
-    finally:
-        loop.close()
+    )
+    
+    # Upload thumbnail
+    thumb_key = f"videos/sessions/{session_id}/thumb_custom_{timestamp}.jpg"
+    run_async(
+        storage_service.upload_file(str(thumb_path), thumb_key)
+    )
+    
+    # Cleanup
+    video_processor.cleanup_temp_files([str(video_local_path), str(thumb_path)])
+    
+    return {
+        "path": thumb_key,
+        "timestamp": timestamp,
+        "width": width,
+        "height": height
+    }
 
 
 @celery_app.task
@@ -575,123 +888,123 @@ def extract_audio(
     Returns:
         Audio track information
     """
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+    storage_service = get_storage_service()
+    video_processor = VideoProcessor(storage_service)
     
-    try:
-        storage_service = get_storage_service()
-        video_processor = VideoProcessor(storage_service)
-        
-        # Download video
-        temp_dir = Path(tempfile.mkdtemp())
-        video_local_path = temp_dir / "video.mp4"
-        
-        loop.run_until_complete(
-            storage_service.download_file(video_path, str(video_local_path))
-        )
-        
-        # Extract audio
-        audio_path = temp_dir / f"audio.{format}"
-        loop.run_until_complete(
-            video_processor.extract_audio(
-                str(video_local_path),
-                str(audio_path),
-                format,
-                bitrate
-            )
-        )
-        
-        # Upload audio
-        audio_key = f"videos/sessions/{session_id}/audio_extracted.{format}"
-        loop.run_until_complete(
-            storage_service.upload_file(str(audio_path), audio_key)
+    # Download video
+    temp_dir = Path(tempfile.mkdtemp())
+    video_local_path = temp_dir / "video.mp4"
+    
+    run_async(
+        storage_service.download_file(video_path, str(video_local_path))
+    )
+    
+    # Extract audio
+    audio_path = temp_dir / f"audio.{format}"
+    run_async(
+        video_processor.extract_audio(
+            str(video_local_path),
+            str(audio_path),
+            format,
+            bitrate
         )
-        
-        # Cleanup
-        video_processor.cleanup_temp_files([str(video_local_path), str(audio_path)])
-        
-        return {
-            "path": audio_key,
-            "format": format,
-            "bitrate": bitrate,
-            "size": audio_path.stat().st_size
-        }
-        
-    finally:
-        loop.close()
+    )
+    
+    # Upload audio
+    audio_key = f"videos/sessions/{session_id}/audio_extracted.{format}"
+    run_async(
+        storage_service.upload_file(str(audio_path), audio_key)
+    )
+    
+    # Cleanup
+    video_processor.cleanup_temp_files([str(video_local_path), str(audio_path)])
+    
+    return {
+        "path": audio_key,
+        "format": format,
+        "bitrate": bitrate,
+        "size": audio_path.stat().st_size
+    }
 
 
 @celery_app.task
-def cleanup_expired_videos():
+def cleanup_expired_videos(batch_size: Optional[int] = None) -> Dict:
     """
     Cleanup expired video files and database entries.
     Runs periodically to remove old processed videos.
+    
+    Expired sessions are read a page at a time in id order. Each page's
+    objects are removed with DeleteObjects batches and the page is
+    committed before the next is read. Sessions with objects that couldn't
+    be deleted keep their video and are retried on the next run.
+    
+    Args:
+        batch_size: Sessions per page
+    
+    Returns:
+        Cleanup summary
     """
+    batch_size = batch_size or settings.VIDEO_CLEANUP_BATCH_SIZE
+    retention_days = settings.VIDEO_RETENTION_DAYS
+    cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
+    storage_service = get_storage_service()
+    
+    cleaned_sessions = 0
+    failed_sessions = 0
+    deleted_objects = 0
+    last_id = None
+    
     db = next(get_db_sync())
     try:
-        # Find sessions older than retention period
-        retention_days = settings.VIDEO_RETENTION_DAYS
-        cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
-        
-        expired_sessions = db.query(PracticeSession).filter(
-            PracticeSession.created_at < cutoff_date,
-            PracticeSession.video_url.isnot(None)
-        ).all()
-        
-        storage_service = get_storage_service()
-        
-        for session in expired_sessions:
-            try:
-                # Delete video files from storage
-                if session.processing_result:
-                    # Delete transcoded videos
-                    for quality, info in session.processing_result.get("transcoded_videos", {}).items():
-                        asyncio.run(
-                            storage_service.delete_file(info["path"])
-                        )
-                    
-                    # Delete thumbnails
-                    for thumb in session.processing_result.get("thumbnails", []):
-                        asyncio.run(
-                            storage_service.delete_file(thumb["path"])
-                        )
-                    
-                    # Delete audio
-                    if session.processing_result.get("audio_track"):
-                        asyncio.run(
-                            storage_service.delete_file(
-                                session.processing_result["audio_track"]["path"]
-                            )
-                        )
-                    
-                    # Delete preview
-                    if session.processing_result.get("preview_clip"):
-                        asyncio.run(
-                            storage_service.delete_file(
-                                session.processing_result["preview_clip"]["path"]
-                            )
-                        )
-                
-                # Delete original video
-                if session.video_url:
-                    asyncio.run(
-                        storage_service.delete_file(session.video_url)
-                    )
+        while True:
+            # Find sessions older than retention period
+            query = db.query(PracticeSession).filter(
+                PracticeSession.created_at < cutoff_date,
+                PracticeSession.video_url.isnot(None)
+            )
+            if last_id is not None:
+                query = query.filter(PracticeSession.id > last_id)
+            sessions = query.order_by(PracticeSession.id).limit(batch_size).all()
+            if not sessions:
+                break
+            last_id = sessions[-1].id
+            
+            keys_by_session = {}
+            for session in sessions:
+                try:
+                    keys = session_storage_keys(session)
+                    for prefix in session_storage_prefixes(session):
+                        keys.extend(run_async(list_prefix_keys(storage_service, prefix)))
+                    keys_by_session[session.id] = keys
+                except Exception as e:
+                    logger.error(f"Error listing files for session {session.id}: {e}")
+            
+            page_keys = [key for keys in keys_by_session.values() for key in keys]
+            failed_keys = set(run_async(storage_service.delete_files(page_keys)))
+            deleted_objects += len(page_keys) - len(failed_keys)
+            
+            for session in sessions:
+                keys = keys_by_session.get(session.id)
+                if keys is None or failed_keys.intersection(keys):
+                    failed_sessions += 1
+                    continue
                 
                 # Clear video data from database
                 session.video_url = None
                 session.processing_result = None
                 session.processing_status = None
-                
-                logger.info(f"Cleaned up video files for session {session.id}")
-                
-            except Exception as e:
-                logger.error(f"Error cleaning up session {session.id}: {e}")
-        
-        db.commit()
+                cleaned_sessions += 1
+            
+            db.commit()
+            logger.info(
+                f"Cleaned up video files for {cleaned_sessions} sessions "
+                f"({deleted_objects} objects) so far"
+            )
         
         return {
-            "cleaned_sessions": len(expired_sessions),
+            "cleaned_sessions": cleaned_sessions,
+            "failed_sessions": failed_sessions,
+            "deleted_objects": deleted_objects,
             "cutoff_date": cutoff_date.isoformat()
         }
         
@@ -699,6 +1012,91 @@ def cleanup_expired_videos():
         db.close()
 
 
+@celery_app.task(base=CallbackTask)
+def rescore_session_analysis(session_id: Union[str, uuid.UUID]) -> Dict:
+    """
+    Recompute a session's analysis scores from its stored features.
+    
+    Only the analyzers and overall scoring run; nothing is decoded or
+    transcoded, so this is cheap enough to run over the whole history
+    after a scoring change. Time-series PracticeMetrics are left as they are.
+    
+    Args:
+        session_id: Practice session ID
+    
+    Returns:
+        Re-scoring status
+    """
+    session_uuid = uuid.UUID(str(session_id))
+    audio_analysis_service = AudioAnalysisService()
+    storage_service = get_storage_service()
+    
+    features = run_async(
+        audio_analysis_service.load_session_features(storage_service, session_uuid)
+    )
+    if features is None:
+        return {"session_id": str(session_uuid), "status": "skipped", "reason": "No usable stored features"}
+    
+    analysis_results = run_async(audio_analysis_service.analyze_features(features))
+    
+    db = next(get_db_sync())
+    try:
+        analysis_record = db.query(AnalysisResult).filter(
+            AnalysisResult.session_id == session_uuid
+        ).first()
+        
+        if analysis_record is None:
+            analysis_record = AnalysisResult(session_id=session_uuid)
+            db.add(analysis_record)
+        
+        for field, value in analysis_result_fields(analysis_results).items():
+            setattr(analysis_record, field, value)
+        analysis_record.analyzed_at = datetime.utcnow()
+        
+        db.commit()
+        
+    finally:
+        db.close()
+    
+    logger.info(f"Re-scored session {session_uuid} with analysis {AudioAnalysisService.ANALYSIS_VERSION}")
+    return {
+        "session_id": str(session_uuid),
+        "status": "rescored",
+        "analysis_version": AudioAnalysisService.ANALYSIS_VERSION
+    }
+
+
+@celery_app.task
+def rescore_outdated_analyses(limit: Optional[int] = None) -> Dict:
+    """
+    Queue re-scoring for every analysis made with an older ANALYSIS_VERSION.
+    
+    Args:
+        limit: Maximum number of sessions to queue
+    
+    Returns:
+        Number of sessions queued
+    """
+    db = next(get_db_sync())
+    try:
+        query = db.query(AnalysisResult.session_id).filter(
+            AnalysisResult.analysis_version != AudioAnalysisService.ANALYSIS_VERSION
+        ).order_by(AnalysisResult.session_id)
+        if limit:
+            query = query.limit(limit)
+        session_ids = [row.session_id for row in query]
+    finally:
+        db.close()
+    
+    for session_id in session_ids:
+        rescore_session_analysis.delay(str(session_id))
+    
+    return {
+        "queued_sessions": len(session_ids),
+        "analysis_version": AudioAnalysisService.ANALYSIS_VERSION
+    }
+
+
 @celery_app.task
 def process_video_batch(session_ids: List[Union[str, uuid.UUID]], qualities: Optional[List[str]] = None):
     """
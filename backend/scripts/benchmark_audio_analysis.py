@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Benchmark AudioAnalysisService on synthetic practice recordings.
+
+Usage:
+    python benchmark_audio_analysis.py [--minutes 1 5 15 30 60] [--signals click vibrato crescendo]
+                                       [--workers N] [--json results.json] [--check]
+
+For every signal and length this script will:
+1. Write a deterministic synthetic recording (click track, vibrato tone or crescendo)
+2. Extract features and time each analyzer in a fresh process
+3. Report seconds of audio processed per CPU-second and peak RSS
+4. Compare the detected BPM, vibrato rate and dynamic range with the known values
+
+With --check the exit code is non-zero if any accuracy check fails.
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import resource
+import tempfile
+import multiprocessing
+from pathlib import Path
+from typing import Dict, Any, List
+
+import numpy as np
+import soundfile as sf
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.analytics.audio_analysis import AudioAnalysisService
+
+SAMPLE_RATE = 22050
+
+# Known properties of the synthetic signals, used for the accuracy checks
+CLICK_BPM = 96
+VIBRATO_FREQUENCY = 440
+VIBRATO_RATE_HZ = 5.5
+VIBRATO_DEPTH = 0.01
+CRESCENDO_FREQUENCY = 330
+CRESCENDO_RANGE_DB = 40
+
+# Maximum error allowed by --check
+TOLERANCES = {
+    "click": 2.0,       # BPM
+    "vibrato": 0.5,     # Hz
+    "crescendo": 5.0    # dB
+}
+
+ANALYZERS = ["tempo", "pitch", "dynamics", "vibrato", "note_onsets"]
+
+
+def click_track(t, duration, seed):
+    """
+    Metronome clicks at CLICK_BPM with an accented first beat of each bar,
+    shaped like the clicks from generate_metronome_sounds.py
+    """
+    period = 60.0 / CLICK_BPM
+    beat = np.floor(t / period)
+    phase = t - beat * period
+
+    accent = (beat % 4) == 0
+    frequency = np.where(accent, 1000.0, 800.0)
+    amplitude = np.where(accent, 0.8, 0.6)
+
+    # 40 ms click with a fast exponential decay
+    click = amplitude * np.sin(2 * np.pi * frequency * phase) * np.exp(-phase / 0.01)
+    click[phase > 0.04] = 0.0
+
+    noise = np.random.default_rng(seed).normal(0, 0.001, len(t))
+    return click + noise
+
+
+def vibrato_tone(t, duration, seed):
+    """Sine at VIBRATO_FREQUENCY with sinusoidal frequency modulation"""
+    # Closed-form phase of f(t) = f0 * (1 + depth * sin(2 pi rate t)),
+    # so blocks join without discontinuities
+    phase = 2 * np.pi * VIBRATO_FREQUENCY * (
+        t - VIBRATO_DEPTH / (2 * np.pi * VIBRATO_RATE_HZ) * np.cos(2 * np.pi * VIBRATO_RATE_HZ * t)
+    )
+    return 0.5 * np.sin(phase)
+
+
+def crescendo(t, duration, seed):
+    """Sine whose level rises linearly in dB by CRESCENDO_RANGE_DB"""
+    gain_db = CRESCENDO_RANGE_DB * (t / duration - 1)
+    return 0.8 * 10 ** (gain_db / 20) * np.sin(2 * np.pi * CRESCENDO_FREQUENCY * t)
+
+
+SIGNALS = {
+    "click": click_track,
+    "vibrato": vibrato_tone,
+    "crescendo": crescendo
+}
+
+
+def write_signal(path, signal, minutes, block_seconds=30):
+    """
+    Write a synthetic recording block by block, so even an hour of audio
+    never has to be held in memory
+
+    Args:
+        path: Output WAV path
+        signal: Key of SIGNALS
+        minutes: Recording length
+        block_seconds: Samples generated per write
+    """
+    generate = SIGNALS[signal]
+    duration = minutes * 60.0
+    n_samples = int(duration * SAMPLE_RATE)
+    block = int(block_seconds * SAMPLE_RATE)
+
+    with sf.SoundFile(path, "w", SAMPLE_RATE, 1, "PCM_16") as f:
+        for start in range(0, n_samples, block):
+            t = np.arange(start, min(start + block, n_samples)) / SAMPLE_RATE
+            f.write(np.clip(generate(t, duration, seed=start), -1, 1).astype(np.float32))
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def timed(func, *args):
+    """Run func and return its result with CPU and wall time"""
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    result = func(*args)
+    return result, time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+
+def run_case(path, signal, minutes, workers):
+    """
+    Analyze one recording and time every stage. Runs in its own process so
+    peak RSS belongs to this case alone.
+    """
+    service = AudioAnalysisService(max_workers=workers)
+    # Measure the analysis itself, never a cached result
+    service.cache = None
+    sr = service.sr
+    audio_seconds = minutes * 60.0
+
+    stages = {}
+    features, cpu, wall = timed(service._extract_file_features, path)
+    stages["features"] = {"cpu_seconds": cpu, "wall_seconds": wall}
+
+    results = {}
+    for name in ANALYZERS:
+        analyzer = getattr(service, f"_analyze_{name}")
+        results[name], cpu, wall = timed(analyzer, features, sr)
+        stages[name] = {"cpu_seconds": cpu, "wall_seconds": wall}
+
+    stages["total"] = {
+        "cpu_seconds": sum(stage["cpu_seconds"] for stage in stages.values()),
+        "wall_seconds": sum(stage["wall_seconds"] for stage in stages.values())
+    }
+    for stage in stages.values():
+        stage["audio_seconds_per_cpu_second"] = audio_seconds / max(stage["cpu_seconds"], 1e-9)
+
+    return {
+        "signal": signal,
+        "minutes": minutes,
+        "stages": stages,
+        "peak_rss_mb": peak_rss_mb(),
+        "accuracy": check_accuracy(signal, results)
+    }
+
+
+def check_accuracy(signal, results):
+    """Compare the analyzer output for a signal with its known property"""
+    if signal == "click":
+        metric, expected, measured = "bpm", CLICK_BPM, results["tempo"]["bpm"]
+    elif signal == "vibrato":
+        metric, expected, measured = "vibrato_rate_hz", VIBRATO_RATE_HZ, results["vibrato"]["average_rate_hz"]
+    else:
+        metric, expected, measured = "dynamic_range_db", CRESCENDO_RANGE_DB, results["dynamics"]["dynamic_range_db"]
+
+    error = abs(measured - expected)
+    return {
+        "metric": metric,
+        "expected": expected,
+        "measured": measured,
+        "error": error,
+        "passed": bool(error <= TOLERANCES[signal])
+    }
+
+
+def print_report(cases: List[Dict[str, Any]]):
+    """Print throughput, memory and accuracy tables"""
+    print(f"\n{'signal':<10} {'min':>4} " + " ".join(f"{stage:>11}" for stage in ["features"] + ANALYZERS + ["total"]))
+    print("audio-seconds per CPU-second")
+    for case in cases:
+        row = " ".join(
+            f"{case['stages'][stage]['audio_seconds_per_cpu_second']:>11.1f}"
+            for stage in ["features"] + ANALYZERS + ["total"]
+        )
+        print(f"{case['signal']:<10} {case['minutes']:>4g} {row}")
+
+    print(f"\n{'signal':<10} {'min':>4} {'peak RSS MB':>12} {'metric':>17} {'expected':>9} {'measured':>9} {'result':>7}")
+    for case in cases:
+        accuracy = case["accuracy"]
+        print(
+            f"{case['signal']:<10} {case['minutes']:>4g} {case['peak_rss_mb']:>12.0f} "
+            f"{accuracy['metric']:>17} {accuracy['expected']:>9.2f} {accuracy['measured']:>9.2f} "
+            f"{'ok' if accuracy['passed'] else 'FAIL':>7}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1, 5, 15, 30, 60],
+                        help="Recording lengths to benchmark")
+    parser.add_argument("--signals", nargs="+", choices=list(SIGNALS), default=list(SIGNALS),
+                        help="Synthetic signals to benchmark")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Threads for AudioAnalysisService (max_workers)")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit non-zero if an accuracy check fails")
+    args = parser.parse_args()
+
+    cases = []
+    # A fresh process per case keeps peak RSS figures independent
+    context = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory(prefix="audio_benchmark_") as temp_dir:
+        for minutes in args.minutes:
+            for signal in args.signals:
+                path = str(Path(temp_dir) / f"{signal}_{minutes:g}min.wav")
+                print(f"- {signal}, {minutes:g} min...", flush=True)
+                write_signal(path, signal, minutes)
+
+                with context.Pool(1) as pool:
+                    cases.append(pool.apply(run_case, (path, signal, minutes, args.workers)))
+
+                os.remove(path)
+
+    print_report(cases)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(cases, f, indent=2)
+        print(f"\nResults written to: {args.json_path}")
+
+    if args.check and not all(case["accuracy"]["passed"] for case in cases):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
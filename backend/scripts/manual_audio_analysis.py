@@ -34,6 +34,7 @@ from app.models.practice import PracticeSession, ProcessingStatus
 from app.models.analytics import PracticeMetrics, AnalysisResult, MetricType
 from app.services.storage import StorageService
 from app.services.analytics.audio_analysis import AudioAnalysisService
+from app.services.analytics.time_series import decode_series
 
 # Configure logging
 logging.basicConfig(
@@ -74,8 +75,11 @@ class ManualAudioAnalyzer:
         self.temp_dir = Path(tempfile.gettempdir()) / "manual_audio_analysis"
         self.temp_dir.mkdir(exist_ok=True)
     
-    async def analyze_session(self, session_id: str):
-        """Analyze audio for a specific session."""
+    async def analyze_session(self, session_id: str, force: bool = False):
+        """Analyze audio for a specific session.
+        
+        Pass force=True to bypass the analysis cache and recompute features.
+        """
         try:
             logger.info(f"Starting audio analysis for session: {session_id}")
             
@@ -122,7 +126,8 @@ class ManualAudioAnalyzer:
             start_time = datetime.utcnow()
             
             analysis_results = await self.audio_analysis_service.analyze_audio_file(
-                audio_path=str(local_audio_path)
+                audio_path=str(local_audio_path),
+                force=force
             )
             
             processing_time = (datetime.utcnow() - start_time).total_seconds()
@@ -171,7 +176,7 @@ class ManualAudioAnalyzer:
                 analysis_result = AnalysisResult(
                     session_id=session_uuid,
                     analyzed_at=datetime.utcnow(),
-                    analysis_version="1.0.0",
+                    analysis_version=AudioAnalysisService.ANALYSIS_VERSION,
                     overall_consistency_score=overall_metrics.get("overall_consistency", 0.0),
                     tempo_score=overall_metrics.get("tempo_score", 0.0),
                     pitch_score=overall_metrics.get("pitch_score", 0.0),
@@ -202,49 +207,25 @@ class ManualAudioAnalyzer:
                 # Create base timestamp for metrics
                 base_time = datetime.utcnow()
                 
-                # Store tempo variations over time
-                tempo_variations = tempo_data.get("tempo_variations", [])
-                if tempo_variations:
-                    time_step = duration / len(tempo_variations) if len(tempo_variations) > 1 else duration
-                    for i, tempo in enumerate(tempo_variations[:100]):  # Limit to 100 points
-                        metric = PracticeMetrics(
-                            time=base_time,
-                            session_id=session_uuid,
-                            metric_type=MetricType.TEMPO_BPM,
-                            value=float(tempo),
-                            confidence=1.0,
-                            extra_data={"time_offset": i * time_step}
-                        )
-                        db.add(metric)
-                
-                # Store pitch values over time
-                pitch_values = pitch_data.get("pitch_values", [])
-                pitch_confidences = pitch_data.get("pitch_confidences", [])
-                if pitch_values:
-                    # Sample pitch values (take every nth value to limit data)
-                    sample_rate = max(1, len(pitch_values) // 100)
-                    for i in range(0, len(pitch_values), sample_rate):
-                        metric = PracticeMetrics(
-                            time=base_time,
-                            session_id=session_uuid,
-                            metric_type=MetricType.PITCH_HZ,
-                            value=pitch_values[i],
-                            confidence=pitch_confidences[i] if i < len(pitch_confidences) else None,
-                            extra_data={"time_offset": (i / len(pitch_values)) * duration}
-                        )
-                        db.add(metric)
-                
-                # Store dynamics values over time
-                db_values = dynamics_data.get("db_values", [])
-                if db_values:
-                    sample_rate = max(1, len(db_values) // 100)
-                    for i in range(0, len(db_values), sample_rate):
+                # Store downsampled series over time; each covers the whole recording
+                for series, metric_type in [
+                    (tempo_data.get("tempo_series"), MetricType.TEMPO_BPM),
+                    (pitch_data.get("pitch_series"), MetricType.PITCH_HZ),
+                    (dynamics_data.get("db_series"), MetricType.DYNAMICS_DB)
+                ]:
+                    if not series:
+                        continue
+                    
+                    points = decode_series(series)
+                    confidences = points.get("confidence")
+                    for i, (time_offset, value) in enumerate(zip(points["time"], points["mean"])):
                         metric = PracticeMetrics(
                             time=base_time,
                             session_id=session_uuid,
-                            metric_type=MetricType.DYNAMICS_DB,
-                            value=db_values[i],
-                            extra_data={"time_offset": (i / len(db_values)) * duration}
+                            metric_type=metric_type,
+                            value=float(value),
+                            confidence=float(confidences[i]) if confidences is not None else None,
+                            extra_data={"time_offset": float(time_offset)}
                         )
                         db.add(metric)
                 
@@ -0,0 +1,293 @@
+"""Test audio analysis functionality"""
+import numpy as np
+import pytest
+import librosa
+import soundfile as sf
+
+from unittest.mock import patch
+
+from app.services.analytics.audio_analysis import AudioAnalysisService
+from app.services.analytics.analysis_cache import AnalysisCache
+from app.services.analytics.time_series import downsample, encode_series, decode_series
+
+
+SR = 22050
+
+
+@pytest.fixture
+def audio_service():
+    """Audio analysis service with default parameters"""
+    return AudioAnalysisService()
+
+
+@pytest.fixture
+def vibrato_tone():
+    """Five seconds of a 440 Hz tone with 6 Hz vibrato"""
+    t = np.arange(SR * 5) / SR
+    freq = 440 * (1 + 0.01 * np.sin(2 * np.pi * 6 * t))
+    return (0.5 * np.sin(2 * np.pi * np.cumsum(freq) / SR)).astype(np.float32)
+
+
+class TestFeatureExtraction:
+    """Test the shared spectral front end"""
+
+    def test_pitch_track_matches_direct_piptrack(self, audio_service, vibrato_tone):
+        """Test shared pitch track equals a standalone piptrack call"""
+        features = audio_service._extract_features(vibrato_tone, SR)
+
+        pitches, magnitudes = librosa.piptrack(
+            y=vibrato_tone, sr=SR, fmin=50, fmax=2000, threshold=0.1
+        )
+        expected, _ = audio_service._best_pitch_per_frame(pitches, magnitudes)
+
+        assert np.allclose(features["pitch"], expected)
+
+    def test_vibrato_track_matches_direct_piptrack(self, audio_service, vibrato_tone):
+        """Test narrowed vibrato track equals piptrack with vibrato parameters"""
+        features = audio_service._extract_features(vibrato_tone, SR)
+
+        pitches, magnitudes = librosa.piptrack(
+            y=vibrato_tone, sr=SR, fmin=100, fmax=1000, threshold=0.2
+        )
+        expected, _ = audio_service._best_pitch_per_frame(pitches, magnitudes)
+
+        assert np.allclose(features["vibrato_pitch"], expected)
+
+    def test_onset_envelope_matches_onset_strength(self, audio_service, vibrato_tone):
+        """Test shared onset envelope equals onset_strength on the waveform"""
+        features = audio_service._extract_features(vibrato_tone, SR)
+
+        expected = librosa.onset.onset_strength(y=vibrato_tone, sr=SR, hop_length=512)
+
+        assert np.allclose(features["onset_envelope"], expected, atol=1e-4)
+
+
+class TestStreamingAnalysis:
+    """Test block-wise analysis of long recordings"""
+
+    def test_streaming_features_match_whole_file(self, audio_service, vibrato_tone, tmp_path):
+        """Test block-wise extraction lines up with whole-file extraction"""
+        audio_path = tmp_path / "tone.wav"
+        sf.write(audio_path, vibrato_tone, SR)
+        audio_service.stream_block_frames = 50
+
+        whole = audio_service._extract_features(vibrato_tone, SR)
+        streamed = audio_service._extract_features_from_chunks(
+            audio_service._read_resampled_blocks(str(audio_path))
+        )
+
+        assert streamed["n_samples"] == whole["n_samples"]
+        for key in ("rms", "pitch", "vibrato_pitch"):
+            assert np.allclose(streamed[key], whole[key], atol=1e-5)
+
+    def test_chunked_tempo_matches_librosa(self, audio_service, vibrato_tone):
+        """Test block-wise tempogram gives librosa's per-frame tempo"""
+        features = audio_service._extract_features(vibrato_tone, SR)
+        audio_service.stream_block_frames = 50
+
+        _, dtempo = audio_service._tempo_track(features["onset_envelope"], SR)
+        expected = librosa.feature.tempo(
+            onset_envelope=features["onset_envelope"], sr=SR, aggregate=None
+        )
+
+        assert np.allclose(dtempo, expected)
+
+    @pytest.mark.asyncio
+    async def test_empty_stream_gives_empty_analysis(self, audio_service):
+        """Test a recording without samples is analyzed to the default results"""
+        features = audio_service._extract_features_from_chunks(iter([np.zeros(0, dtype=np.float32)]))
+
+        assert features["n_samples"] == 0
+        assert all(len(features[key]) == 0 for key in ("rms", "pitch", "onset_envelope"))
+
+        result = await audio_service.analyze_features(features)
+        assert result["duration"] == 0.0
+        assert result["tempo"]["beat_count"] == 0
+
+
+class TestAnalyzers:
+    """Test the per-metric analyzers on synthetic signals"""
+
+    def test_pitch_reduction_finds_tone(self, audio_service, vibrato_tone):
+        """Test per-frame pitch reduction tracks the tone"""
+        features = audio_service._extract_features(vibrato_tone, SR)
+
+        pitch_data = audio_service._analyze_pitch(features, SR)
+
+        assert pitch_data["pitch_detected_ratio"] > 0.9
+        assert abs(pitch_data["average_pitch_hz"] - 440) < 10
+
+    def test_vibrato_rate_detected(self, audio_service, vibrato_tone):
+        """Test windowed vibrato statistics recover the modulation rate"""
+        features = audio_service._extract_features(vibrato_tone, SR)
+
+        vibrato_data = audio_service._analyze_vibrato(features, SR)
+
+        assert vibrato_data["vibrato_segments"]
+        assert 4 <= vibrato_data["average_rate_hz"] <= 8
+
+    @pytest.mark.asyncio
+    async def test_parallel_analyzers_match_sequential(self, vibrato_tone):
+        """Test running analyzers in a thread pool gives the same results"""
+        sequential = AudioAnalysisService(max_workers=1)
+        parallel = AudioAnalysisService(max_workers=4)
+        features = sequential._extract_features(vibrato_tone, SR)
+
+        expected = await sequential.analyze_features(features)
+        result = await parallel.analyze_features(features)
+
+        assert result == expected
+
+
+class TestTimeSeries:
+    """Test downsampling and encoding of result time series"""
+
+    def test_downsample_covers_whole_recording(self):
+        """Test buckets span the recording and keep its extremes"""
+        times = np.arange(100000) * 0.01
+        values = np.sin(times)
+
+        series = downsample(times, values, 200, duration=1000.0)
+
+        assert len(series["time"]) == 200
+        assert series["time"][0] < 5 and series["time"][-1] > 995
+        assert series["min"].min() == values.min()
+        assert series["max"].max() == values.max()
+        assert np.all(series["min"] <= series["mean"]) and np.all(series["mean"] <= series["max"])
+
+    def test_encoded_series_round_trip(self, audio_service, vibrato_tone):
+        """Test pitch series decodes to float32 arrays of bounded length"""
+        audio_service.series_points = 50
+        features = audio_service._extract_features(vibrato_tone, SR)
+
+        encoded = audio_service._analyze_pitch(features, SR)["pitch_series"]
+        series = decode_series(encoded)
+
+        assert encoded["length"] == len(series["mean"]) <= 50
+        assert set(series) == {"time", "min", "max", "mean", "confidence"}
+        assert np.allclose(series["mean"], 440, rtol=0.02)
+        assert decode_series(encode_series(series))["mean"].tolist() == series["mean"].tolist()
+
+    def test_beats_reported_as_bounded_series(self, audio_service):
+        """Test beats of a long recording come back downsampled, not one per beat"""
+        audio_service.series_points = 20
+        clicks = librosa.clicks(times=np.arange(0, 120, 0.5), sr=SR, length=SR * 120)
+        features = audio_service._extract_features(clicks.astype(np.float32), SR)
+
+        tempo = audio_service._analyze_tempo(features, SR)
+        series = decode_series(tempo["beat_interval_series"])
+
+        assert "beat_times" not in tempo and tempo["beat_count"] > 200
+        assert len(series["mean"]) <= 20
+        assert np.allclose(series["mean"], 0.5, atol=0.05)
+
+
+class TestAnalysisCache:
+    """Test content-addressed caching of analysis results"""
+
+    @pytest.fixture
+    def tone_file(self, vibrato_tone, tmp_path):
+        """Vibrato tone written to a WAV file"""
+        audio_path = tmp_path / "tone.wav"
+        sf.write(audio_path, vibrato_tone, SR)
+        return str(audio_path)
+
+    @pytest.fixture
+    def cached_service(self, tmp_path):
+        """Audio analysis service with a local cache in a temp directory"""
+        return AudioAnalysisService(cache=AnalysisCache(cache_dir=str(tmp_path / "cache")))
+
+    @pytest.mark.asyncio
+    async def test_unchanged_audio_returns_cached_result(self, cached_service, tone_file):
+        """Test second analysis of the same audio skips extraction"""
+        first = await cached_service.analyze_audio_file(tone_file)
+
+        with patch.object(cached_service, "_extract_file_features") as extract:
+            second = await cached_service.analyze_audio_file(tone_file)
+
+        extract.assert_not_called()
+        assert second["overall_metrics"] == first["overall_metrics"]
+
+    @pytest.mark.asyncio
+    async def test_new_analysis_version_reuses_features(self, cached_service, tone_file):
+        """Test re-scoring after a version bump reuses cached features"""
+        first = await cached_service.analyze_audio_file(tone_file)
+        cached_service.ANALYSIS_VERSION = "test-rescore"
+
+        with patch.object(cached_service, "_extract_file_features") as extract:
+            rescored = await cached_service.analyze_audio_file(tone_file)
+
+        extract.assert_not_called()
+        assert rescored["overall_metrics"] == first["overall_metrics"]
+
+    @pytest.mark.asyncio
+    async def test_force_recomputes(self, cached_service, tone_file):
+        """Test force bypasses cached features and results"""
+        await cached_service.analyze_audio_file(tone_file)
+
+        with patch.object(
+            cached_service,
+            "_extract_file_features",
+            wraps=cached_service._extract_file_features
+        ) as extract:
+            await cached_service.analyze_audio_file(tone_file, force=True)
+
+        extract.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_pcm_stream_cache_hit_skips_decoding(self, cached_service, vibrato_tone):
+        """Test a cached digest returns the result without consuming the PCM stream"""
+        first = await cached_service.analyze_pcm_stream(
+            iter(np.array_split(vibrato_tone, 4)), content_digest="video-digest"
+        )
+
+        def decode():
+            raise AssertionError("PCM stream should not be consumed")
+            yield
+
+        second = await cached_service.analyze_pcm_stream(decode(), content_digest="video-digest")
+
+        assert second["overall_metrics"] == first["overall_metrics"]
+
+
+class InMemoryStorage:
+    """Stand-in for StorageService's byte API"""
+
+    def __init__(self):
+        self.objects = {}
+
+    async def put_bytes(self, object_key, data, content_type=None):
+        self.objects[object_key] = data
+
+    async def get_bytes(self, object_key):
+        return self.objects.get(object_key)
+
+
+class TestSessionFeatures:
+    """Test re-scoring sessions from stored features"""
+
+    @pytest.mark.asyncio
+    async def test_rescore_from_stored_features(self, audio_service, vibrato_tone):
+        """Test stored session features reproduce the original analysis"""
+        storage = InMemoryStorage()
+        features = audio_service._extract_features(vibrato_tone, SR)
+        expected = await audio_service.analyze_features(features)
+
+        key = await audio_service.save_session_features(storage, "session-1", features)
+        loaded = await audio_service.load_session_features(storage, "session-1")
+        result = await audio_service.analyze_features(loaded)
+
+        assert key == "videos/sessions/session-1/analysis/features.npz"
+        assert result == expected
+
+    @pytest.mark.asyncio
+    async def test_stale_features_are_rejected(self, audio_service, vibrato_tone):
+        """Test features from another feature version are not re-scored"""
+        storage = InMemoryStorage()
+        features = audio_service._extract_features(vibrato_tone, SR)
+        await audio_service.save_session_features(storage, "session-1", features)
+
+        audio_service.FEATURE_VERSION = "test-stale"
+
+        assert await audio_service.load_session_features(storage, "session-1") is None
+        assert await audio_service.load_session_features(storage, "missing") is None
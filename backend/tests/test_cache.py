@@ -0,0 +1,219 @@
+"""Test the typed two-tier cache"""
+import asyncio
+import uuid
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from pydantic import BaseModel, ValidationError
+
+from app.core.cache import LocalCache, TypedCache
+from app.schemas.user import AuthenticatedUser
+from app.services.auth.user_service import UserService, user_cache
+
+
+class Profile(BaseModel):
+    id: int
+    name: str
+
+
+class FakePubSub:
+    """Subscription delivering FakeRedis publishes"""
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.messages = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.redis_client.subscribers.setdefault(channel, []).append(self.messages)
+
+    async def listen(self):
+        while True:
+            yield await self.messages.get()
+
+    async def aclose(self):
+        for queues in self.redis_client.subscribers.values():
+            if self.messages in queues:
+                queues.remove(self.messages)
+
+
+class FakeRedis:
+    """String get/set/delete and pub/sub in memory"""
+
+    def __init__(self):
+        self.data = {}
+        self.subscribers = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value.encode() if isinstance(value, str) else value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def publish(self, channel, message):
+        for queue in self.subscribers.get(channel, []):
+            queue.put_nowait({"type": "message", "data": message.encode()})
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLocalCache:
+    """Test the in-process LRU tier"""
+
+    def test_least_recently_used_entry_evicted(self):
+        """Test reads refresh recency and the oldest entry goes first"""
+        cache = LocalCache(max_entries=2, ttl=10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+    def test_entries_expire(self):
+        """Test entries are dropped once their lifetime is up"""
+        clock = Clock()
+        cache = LocalCache(max_entries=2, ttl=5, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 4.9
+        assert cache.get("a") == 1
+        clock.now = 5.0
+        assert cache.get("a") is None
+
+
+class TestTypedCache:
+    """Test Redis-backed typed caching and load coalescing"""
+
+    @pytest.mark.asyncio
+    async def test_values_come_back_as_model(self):
+        """Test Redis holds JSON and reads validate it into the model"""
+        redis_client = FakeRedis()
+        cache = TypedCache("test:profile:roundtrip", Profile, local_ttl=0, client=redis_client)
+
+        await cache.set("1", Profile(id=1, name="Ana"))
+        assert redis_client.data["test:profile:roundtrip:1"] == b'{"id":1,"name":"Ana"}'
+
+        value = await cache.get("1")
+        assert isinstance(value, Profile) and value.name == "Ana"
+
+        await cache.delete("1")
+        assert await cache.get("1") is None
+        assert cache.stats.snapshot()["redis_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_local_tier_serves_repeat_reads(self):
+        """Test a second read is answered in-process"""
+        redis_client = FakeRedis()
+        cache = TypedCache("test:profile:local", Profile, client=redis_client)
+        await cache.set("1", Profile(id=1, name="Ana"))
+        redis_client.data.clear()
+
+        assert (await cache.get("1")).id == 1
+        assert cache.stats.local_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self):
+        """Test callers missing together wait on a single loader call"""
+        cache = TypedCache("test:profile:coalesce", Profile, client=FakeRedis())
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return Profile(id=7, name="Bo")
+
+        results = await asyncio.gather(*(cache.get_or_load("7", load) for _ in range(5)))
+
+        assert len(calls) == 1
+        assert all(result.id == 7 for result in results)
+        assert cache.stats.coalesced == 4
+        assert await cache.get_or_load("7", load) == results[0] and len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_broadcast_delete_drops_other_processes_local_copy(self):
+        """Test a delete in one process stops another serving its in-process copy"""
+        redis_client = FakeRedis()
+        here = TypedCache("test:profile:broadcast", Profile, client=redis_client, broadcast_deletes=True)
+        there = TypedCache("test:profile:broadcast", Profile, client=redis_client, broadcast_deletes=True)
+        await there.get("1")
+        await asyncio.sleep(0)
+
+        await here.set("1", Profile(id=1, name="Ana"))
+        assert (await there.get("1")).name == "Ana"
+        await here.delete("1")
+        await asyncio.sleep(0)
+
+        try:
+            assert await there.get("1") is None
+        finally:
+            for cache in (here, there):
+                cache._listener.cancel()
+            await asyncio.gather(here._listener, there._listener, return_exceptions=True)
+
+
+class TestCachedUser:
+    """Test users served to authentication from the user cache"""
+
+    @pytest.fixture
+    def redis_client(self):
+        """user_cache backed by an in-memory Redis with an empty local tier"""
+        redis_client = FakeRedis()
+        with patch.object(user_cache, "client", redis_client), patch.object(user_cache, "local", None):
+            yield redis_client
+
+    @pytest.mark.asyncio
+    async def test_cached_user_is_read_only_view(self, redis_client):
+        """Test a cached user is served without the database and exposes no relationships"""
+        now = datetime.utcnow()
+        user = AuthenticatedUser(
+            id=uuid.uuid4(), email="ana@example.com", full_name="Ana", role="student",
+            is_active=True, is_verified=True, created_at=now, updated_at=now
+        )
+        await user_cache.set(str(user.id), user)
+        db = AsyncMock()
+
+        cached = await UserService(db).get_cached(user.id)
+
+        db.execute.assert_not_awaited()
+        db.merge.assert_not_called()
+        assert isinstance(cached, AuthenticatedUser) and cached.email == "ana@example.com"
+        with pytest.raises(AttributeError):
+            cached.student_profile
+        with pytest.raises(ValidationError):
+            cached.push_token = "token"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_load_on_own_session(self, redis_client):
+        """Test requests sharing a load don't depend on any one request's session"""
+        now = datetime.utcnow()
+        row = SimpleNamespace(
+            id=uuid.uuid4(), email="ana@example.com", full_name="Ana", role="student", timezone="UTC",
+            is_active=True, is_verified=True, created_at=now, updated_at=now,
+            reputation_points=0, reputation_level="newcomer"
+        )
+        load_session = AsyncMock()
+        load_session.execute.return_value = Mock(scalar_one_or_none=Mock(return_value=row))
+        session_factory = MagicMock()
+        session_factory.return_value.__aenter__.return_value = load_session
+        request_dbs = [AsyncMock(), AsyncMock()]
+
+        with patch("app.services.auth.user_service.AsyncSessionLocal", session_factory):
+            users = await asyncio.gather(*(UserService(db).get_cached(row.id) for db in request_dbs))
+
+        session_factory.assert_called_once()
+        assert all(db.execute.await_count == 0 for db in request_dbs)
+        assert users[0] == users[1] and users[0].email == "ana@example.com"
@@ -0,0 +1,65 @@
+"""Test bulk ingestion of practice metrics"""
+import csv
+import pytest
+from uuid import uuid4
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from app.models.analytics import MetricType
+from app.services.analytics.metrics_writer import write_practice_metrics
+
+
+def metric_rows(count, session_id):
+    """Practice metric rows with and without optional columns"""
+    return [
+        {
+            "time": datetime(2024, 1, 1, 12, 0, i % 60),
+            "session_id": session_id,
+            "metric_type": MetricType.PITCH_HZ,
+            "value": 440.0 + i,
+            "confidence": 0.5 if i % 2 else None,
+            "extra_data": {"time_offset": i} if i % 3 == 0 else None
+        }
+        for i in range(count)
+    ]
+
+
+class TestWritePracticeMetrics:
+    """Test COPY-based practice metrics ingestion"""
+
+    def test_copy_in_committed_batches(self):
+        """Test rows are copied and committed batch by batch"""
+        engine = MagicMock()
+        engine.dialect.name = "postgresql"
+        connection = engine.raw_connection.return_value
+        cursor = connection.cursor.return_value.__enter__.return_value
+        copied = []
+        cursor.copy_expert.side_effect = lambda sql, buffer: copied.append(list(csv.reader(buffer)))
+        session_id = uuid4()
+
+        written = write_practice_metrics(
+            iter(metric_rows(5, session_id)), batch_size=2, engine=engine
+        )
+
+        assert written == 5
+        assert [len(batch) for batch in copied] == [2, 2, 1]
+        assert connection.commit.call_count == 3
+        assert copied[0][0] == [
+            "2024-01-01T12:00:00", str(session_id), "PITCH_HZ", "440.0", "", '{"time_offset": 0}'
+        ]
+        assert copied[0][1][4] == "0.5" and copied[0][1][5] == ""
+        connection.close.assert_called_once()
+
+    def test_failed_copy_rolls_back(self):
+        """Test a failing batch is rolled back and the error propagates"""
+        engine = MagicMock()
+        engine.dialect.name = "postgresql"
+        connection = engine.raw_connection.return_value
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.copy_expert.side_effect = RuntimeError("copy failed")
+
+        with pytest.raises(RuntimeError, match="copy failed"):
+            write_practice_metrics(metric_rows(3, uuid4()), engine=engine)
+
+        connection.rollback.assert_called_once()
+        connection.close.assert_called_once()
@@ -0,0 +1,49 @@
+"""Test throttled processing progress"""
+import pytest
+from unittest.mock import MagicMock
+
+from app.models.practice import ProcessingStatus
+from app.services.media.progress import ProgressReporter, publish_progress
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestProgressReporter:
+    """Test progress throttling and milestone persistence"""
+
+    @pytest.mark.asyncio
+    async def test_updates_throttled_and_milestones_persisted(self):
+        """Test Redis sees bounded updates and the DB only milestones"""
+        client = MagicMock()
+        persisted = []
+        clock = FakeClock()
+
+        async def persist(session_id, status, progress):
+            persisted.append(progress)
+
+        reporter = ProgressReporter(
+            "session", "user", persist, interval=1.0, milestone=0.25, client=client, clock=clock
+        )
+        # 100 ffmpeg progress lines over 5 seconds
+        for i in range(1, 101):
+            clock.now = i * 0.05
+            await reporter.update(i / 100)
+
+        publishes = client.pipeline.return_value.execute.call_count
+        assert persisted == [0.25, 0.5, 0.75, 1.0]
+        assert 5 <= publishes <= 10
+
+    def test_publish_failure_is_swallowed(self):
+        """Test an unreachable Redis doesn't fail the job"""
+        client = MagicMock()
+        client.pipeline.return_value.execute.side_effect = ConnectionError("redis down")
+
+        assert publish_progress("session", ProcessingStatus.PROCESSING, 0.5, client=client) is False
@@ -0,0 +1,164 @@
+"""Test queueing of video processing on upload completion"""
+import threading
+import uuid
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.media import processing_queue
+from app.services.media.processing_queue import enqueue_processing, processing_job_id
+
+
+def redis_with_depth(depth, claimed=True):
+    """Redis mock whose video_processing lists hold depth messages in total"""
+    client = MagicMock()
+    client.set = AsyncMock(return_value=claimed)
+    client.delete = AsyncMock()
+    client.pipeline.return_value.execute = AsyncMock(return_value=[depth, 0, 0, 0])
+    return client
+
+
+class TestEnqueueProcessing:
+    """Test once-per-upload processing jobs"""
+
+    @pytest.mark.asyncio
+    async def test_duplicate_completion_queues_once(self):
+        """Test a second completion for the same upload returns the first job"""
+        on_claim = AsyncMock()
+
+        with patch.object(processing_queue.process_video, "apply_async") as apply_async:
+            first = await enqueue_processing(
+                "upload-1", "session-1", "videos/a.mp4", "user-1",
+                on_claim=on_claim, redis_client=redis_with_depth(0)
+            )
+            second = await enqueue_processing(
+                "upload-1", "session-1", "videos/a.mp4", "user-1",
+                on_claim=on_claim, redis_client=redis_with_depth(0, claimed=False)
+            )
+
+        assert first == (processing_job_id("upload-1"), True)
+        assert second == (processing_job_id("upload-1"), False)
+        apply_async.assert_called_once_with(
+            ("session-1", "videos/a.mp4", "user-1", None), task_id=processing_job_id("upload-1")
+        )
+        on_claim.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_busy_queue_lowers_priority_then_defers(self):
+        """Test jobs past the soft depth go last and past the defer depth wait"""
+        with patch.object(processing_queue.process_video, "apply_async") as apply_async, \
+                patch.multiple(processing_queue.settings, VIDEO_QUEUE_SOFT_DEPTH=5,
+                               VIDEO_QUEUE_DEFER_DEPTH=10, VIDEO_QUEUE_DEFER_SECONDS=60):
+            await enqueue_processing("a", "s", "k", "u", redis_client=redis_with_depth(6))
+            await enqueue_processing("b", "s", "k", "u", redis_client=redis_with_depth(12))
+
+        assert apply_async.call_args_list[0].kwargs["priority"] == 9
+        assert "countdown" not in apply_async.call_args_list[0].kwargs
+        assert apply_async.call_args_list[1].kwargs["countdown"] == 60
+
+    @pytest.mark.asyncio
+    async def test_failed_dispatch_releases_claim(self):
+        """Test a job that couldn't be queued can be queued by a retry"""
+        client = redis_with_depth(0)
+
+        with patch.object(processing_queue.process_video, "apply_async", side_effect=ConnectionError):
+            with pytest.raises(ConnectionError):
+                await enqueue_processing("upload-1", "s", "k", "u", redis_client=client)
+
+        client.delete.assert_awaited_once_with("processing:job:upload-1")
+
+
+class TestSegmentJoin:
+    """Test the chord callback that joins segmented transcodes"""
+
+    def test_redelivered_callback_joins_once(self):
+        """Test a chord callback delivered twice queues a single join"""
+        from app.tasks import runtime
+        from app.tasks.video_tasks import assemble_segmented_video
+
+        results = [{"low": "seg0_low.mp4"}, {"low": "seg1_low.mp4"}]
+
+        with patch.object(runtime, "StorageService"), patch.object(runtime, "_local", threading.local()), \
+                patch.object(processing_queue, "get_redis_client", AsyncMock(return_value=ClaimRedis())), \
+                patch.object(processing_queue.process_video, "apply_async") as apply_async:
+            task_ids = [
+                assemble_segmented_video(results, "session-1", "videos/a.mp4", "user-1", ["low"], "job-1")
+                for _ in range(2)
+            ]
+            runtime.get_runtime().loop.close()
+
+        assert task_ids == [processing_job_id("job-1:segments")] * 2
+        apply_async.assert_called_once_with(
+            ("session-1", "videos/a.mp4", "user-1", ["low"]),
+            task_id=processing_job_id("job-1:segments"),
+            kwargs={"segment_renditions": {"low": ["seg0_low.mp4", "seg1_low.mp4"]}}
+        )
+
+
+class ClaimRedis:
+    """SET NX claims in memory"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return False
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+class RecordingStorage:
+    """Streams uploads into a dict"""
+
+    def __init__(self):
+        self.objects = {}
+
+    async def upload_stream(self, chunks, object_key, content_type=None):
+        self.objects[object_key] = b"".join([chunk async for chunk in chunks])
+        return {"key": object_key, "size": len(self.objects[object_key])}
+
+
+class TestMultipartUpload:
+    """Test processing of videos uploaded in one multipart request"""
+
+    def test_reupload_with_same_name_is_processed(self):
+        """Test a corrected file under the same name keeps the first and gets its own job"""
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from app.api.deps import get_current_user
+        from app.api.v1.endpoints import video_processing
+        from app.models import practice
+        from app.db.session import get_db
+
+        user = MagicMock(id=uuid.uuid4())
+        session = MagicMock(student_id=user.id)
+        db = MagicMock()
+        db.get = AsyncMock(return_value=session)
+        db.commit = AsyncMock()
+
+        app = FastAPI()
+        app.include_router(video_processing.router)
+        app.dependency_overrides[get_current_user] = lambda: user
+        app.dependency_overrides[get_db] = lambda: db
+        client = TestClient(app)
+        storage = RecordingStorage()
+        session_id = uuid.uuid4()
+
+        with patch.object(video_processing, "get_storage_service", return_value=storage), \
+                patch.object(practice, "Video"), \
+                patch.object(processing_queue, "get_redis_client", AsyncMock(return_value=ClaimRedis())), \
+                patch.object(processing_queue.process_video, "apply_async") as apply_async:
+            responses = [
+                client.post(f"/upload-multipart/{session_id}", files={"video": ("take.mp4", data, "video/mp4")})
+                for data in (b"first take", b"second take")
+            ]
+
+        assert [response.status_code for response in responses] == [200, 200]
+        keys = [response.json()["video_url"] for response in responses]
+        assert keys[0] != keys[1]
+        assert [storage.objects[key] for key in keys] == [b"first take", b"second take"]
+        assert [call.args[0][1] for call in apply_async.call_args_list] == keys
+        assert len({response.json()["task_id"] for response in responses}) == 2
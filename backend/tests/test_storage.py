@@ -0,0 +1,140 @@
+"""Test storage service operations against a stubbed S3 client"""
+import time
+import asyncio
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.services.storage import StorageService
+
+
+def isolated_clients():
+    """Keep cached clients from leaking between tests"""
+    return patch.multiple(StorageService, _clients={}, _ready_buckets=set())
+
+
+@pytest.fixture
+def storage():
+    """Storage service with a mock S3 client"""
+    with patch("app.services.storage.boto3"), isolated_clients():
+        service = StorageService(bucket_name="test-bucket")
+    service.s3_client = MagicMock()
+    return service
+
+
+class TestStorageClients:
+    """Test client sharing and off-loop execution"""
+
+    def test_client_and_bucket_check_shared_between_instances(self):
+        """Test instances reuse one pooled client and check the bucket once"""
+        with patch("app.services.storage.boto3") as boto3, isolated_clients():
+            first = StorageService(bucket_name="test-bucket")
+            second = StorageService(bucket_name="test-bucket")
+
+        assert first.s3_client is second.s3_client
+        boto3.client.assert_called_once()
+        first.s3_client.head_bucket.assert_called_once()
+
+    def test_settings_fall_back_to_aws_credentials(self):
+        """Test deployments configured only with AWS_* keys get those credentials"""
+        with patch("app.services.storage.boto3") as boto3, isolated_clients(), \
+                patch.multiple(
+                    "app.services.storage.settings",
+                    S3_ACCESS_KEY=None, S3_SECRET_KEY=None,
+                    AWS_ACCESS_KEY_ID="aws-key", AWS_SECRET_ACCESS_KEY="aws-secret"
+                ):
+            StorageService.from_settings()
+
+        kwargs = boto3.client.call_args.kwargs
+        assert (kwargs["aws_access_key_id"], kwargs["aws_secret_access_key"]) == ("aws-key", "aws-secret")
+
+    @pytest.mark.asyncio
+    async def test_slow_transfer_does_not_block_loop(self, storage):
+        """Test other coroutines run while a blocking S3 call is in flight"""
+        storage.s3_client.delete_object.side_effect = lambda **kwargs: time.sleep(0.2)
+        finished = []
+
+        async def quick_request():
+            await asyncio.sleep(0.01)
+            finished.append("quick")
+
+        async def slow_delete():
+            await storage.delete_file("slow.mp4")
+            finished.append("slow")
+
+        await asyncio.gather(slow_delete(), quick_request())
+
+        assert finished == ["quick", "slow"]
+
+
+class TestDeleteFiles:
+    """Test bulk deletion with DeleteObjects"""
+
+    @pytest.mark.asyncio
+    async def test_keys_sent_in_batches_of_1000(self, storage):
+        """Test one request per 1000 keys and failed keys reported"""
+        storage.s3_client.delete_objects.side_effect = [
+            {},
+            {"Errors": [{"Key": "key_1500", "Code": "AccessDenied", "Message": "denied"}]},
+        ]
+        keys = [f"key_{i}" for i in range(1800)]
+
+        failed = await storage.delete_files(keys)
+
+        batches = [call.kwargs["Delete"]["Objects"] for call in storage.s3_client.delete_objects.call_args_list]
+        assert [len(batch) for batch in batches] == [1000, 800]
+        assert batches[1][0] == {"Key": "key_1000"}
+        assert failed == ["key_1500"]
+
+    @pytest.mark.asyncio
+    async def test_nothing_to_delete_makes_no_request(self, storage):
+        """Test an empty key list is a no-op"""
+        assert await storage.delete_files([]) == []
+        storage.s3_client.delete_objects.assert_not_called()
+
+
+async def byte_chunks(sizes, fail_after=None):
+    """Async stream of zero-filled chunks"""
+    for i, size in enumerate(sizes):
+        if i == fail_after:
+            raise ConnectionError("client went away")
+        yield b"\0" * size
+
+
+class TestUploadStream:
+    """Test streaming uploads into S3 multipart parts"""
+
+    @pytest.mark.asyncio
+    async def test_chunks_regrouped_into_fixed_parts(self, storage):
+        """Test parts are part_size except the last"""
+        storage.s3_client.create_multipart_upload.return_value = {"UploadId": "upload"}
+        storage.s3_client.upload_part.side_effect = lambda **kwargs: {"ETag": f"etag{kwargs['PartNumber']}"}
+
+        result = await storage.upload_stream(byte_chunks([3, 4, 3, 1]), "video.mp4", part_size=4)
+
+        part_sizes = [len(call.kwargs["Body"]) for call in storage.s3_client.upload_part.call_args_list]
+        assert part_sizes == [4, 4, 3]
+        assert result == {"key": "video.mp4", "size": 11}
+        parts = storage.s3_client.complete_multipart_upload.call_args.kwargs["MultipartUpload"]["Parts"]
+        assert [part["PartNumber"] for part in parts] == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_small_stream_uses_single_put(self, storage):
+        """Test a stream under one part skips multipart"""
+        await storage.upload_stream(byte_chunks([2, 1]), "image.png", content_type="image/png", part_size=4)
+
+        storage.s3_client.create_multipart_upload.assert_not_called()
+        assert storage.s3_client.put_object.call_args.kwargs["Body"] == b"\0" * 3
+
+    @pytest.mark.asyncio
+    async def test_failed_stream_aborts_upload(self, storage):
+        """Test a broken stream doesn't leave a dangling multipart upload"""
+        storage.s3_client.create_multipart_upload.return_value = {"UploadId": "upload"}
+        storage.s3_client.upload_part.return_value = {"ETag": "etag"}
+
+        with pytest.raises(ConnectionError):
+            await storage.upload_stream(byte_chunks([4, 4, 4], fail_after=2), "video.mp4", part_size=4)
+
+        storage.s3_client.abort_multipart_upload.assert_called_once_with(
+            Bucket="test-bucket", Key="video.mp4", UploadId="upload"
+        )
+        storage.s3_client.complete_multipart_upload.assert_not_called()
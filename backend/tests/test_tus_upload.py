@@ -0,0 +1,361 @@
+"""Test the TUS upload endpoints and the S3-backed upload store"""
+import base64
+import hashlib
+import uuid
+import pytest
+from types import SimpleNamespace
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_user
+from app.db.session import get_db
+from app.api.v1.endpoints import tus_upload
+from app.services.media import resumable_upload
+from app.services.media.resumable_upload import ResumableUploadStore, UploadChecksumMismatch
+
+
+USER = SimpleNamespace(id=uuid.uuid4())
+TUS_HEADERS = {"Tus-Resumable": "1.0.0", "Content-Type": "application/offset+octet-stream"}
+
+
+class FakeRedis:
+    """The few async Redis commands the upload store uses, in memory"""
+
+    def __init__(self):
+        self.data = {}
+        self.locked = set()
+        self.expiring = set()
+        self.reacquired = 0
+
+    async def hset(self, key, field=None, value=None, mapping=None):
+        fields = dict(mapping or {})
+        if field is not None:
+            fields[field] = value
+        self.data.setdefault(key, {}).update(
+            {str(k).encode(): str(v).encode() for k, v in fields.items()}
+        )
+
+    async def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def expire(self, key, seconds):
+        self.expiring.add(key)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def lock(self, name, timeout=None):
+        return FakeLock(self, name)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    async def execute(self):
+        for name, args, kwargs in self.calls:
+            await getattr(self.redis, name)(*args, **kwargs)
+
+
+class FakeLock:
+    def __init__(self, redis, name):
+        self.redis = redis
+        self.name = name
+
+    async def acquire(self, blocking=True):
+        if self.name in self.redis.locked:
+            return False
+        self.redis.locked.add(self.name)
+        return True
+
+    async def reacquire(self):
+        self.redis.reacquired += 1
+        return True
+
+    async def release(self):
+        self.redis.locked.discard(self.name)
+
+
+class FakeStorage:
+    """Multipart uploads held in memory"""
+
+    def __init__(self):
+        self.parts = {}
+        self.objects = {}
+        self.copied = []
+        self.reads = []
+
+    async def create_multipart_upload(self, object_key, metadata=None, content_type=None):
+        return f"s3-{object_key}"
+
+    async def upload_part(self, object_key, upload_id, part_number, data):
+        self.parts[(upload_id, part_number)] = data
+        return {"ETag": hashlib.md5(data).hexdigest(), "PartNumber": part_number}
+
+    async def upload_part_copy(self, object_key, upload_id, part_number, source_key, source_range=None):
+        self.copied.append((source_key, source_range))
+        start, end = source_range or (0, len(self.objects[source_key]))
+        return await self.upload_part(object_key, upload_id, part_number, self.objects[source_key][start:end])
+
+    async def complete_multipart_upload(self, object_key, upload_id, parts):
+        self.objects[object_key] = b"".join(self.parts[(upload_id, p["PartNumber"])] for p in parts)
+        return object_key
+
+    async def abort_multipart_upload(self, object_key, upload_id):
+        return True
+
+    async def put_bytes(self, object_key, data, content_type=None):
+        self.objects[object_key] = data
+        return object_key
+
+    async def get_bytes(self, object_key, byte_range=None):
+        self.reads.append((object_key, byte_range))
+        data = self.objects.get(object_key)
+        return data[slice(*byte_range)] if data is not None and byte_range else data
+
+    async def delete_files(self, object_keys):
+        for key in object_keys:
+            self.objects.pop(key, None)
+        return []
+
+
+@pytest.fixture
+def redis_client():
+    return FakeRedis()
+
+
+@pytest.fixture
+def storage():
+    return FakeStorage()
+
+
+@pytest.fixture
+def client(redis_client, storage):
+    """Client for the TUS router; each request gets a fresh store, as on separate pods"""
+    app = FastAPI()
+    app.include_router(tus_upload.router, prefix="/videos")
+    app.dependency_overrides[get_current_user] = lambda: USER
+    app.dependency_overrides[get_db] = lambda: None
+    app.dependency_overrides[tus_upload.get_upload_store] = lambda: ResumableUploadStore(
+        storage_service=storage, redis_client=redis_client, part_size=4
+    )
+    return TestClient(app)
+
+
+def create_upload(client, size, **headers):
+    """Create an upload and return its path"""
+    response = client.post("/videos/upload", headers={"Upload-Length": str(size), "Tus-Resumable": "1.0.0", **headers})
+    assert response.status_code == 201
+    return "/videos/upload/" + response.headers["Location"].rsplit("/", 1)[1]
+
+
+def patch_chunk(client, path, offset, data, **headers):
+    """Send one PATCH request"""
+    return client.patch(path, content=data, headers={**TUS_HEADERS, "Upload-Offset": str(offset), **headers})
+
+
+async def interrupted(data):
+    """Request body that is cut off after data"""
+    yield data
+    raise ConnectionError("client went away")
+
+
+class TestTusPatch:
+    """Test PATCH bytes landing in S3 parts with state in Redis"""
+
+    def test_chunks_cut_into_parts_and_assembled(self, client, storage):
+        """Test short tails carry over between PATCHes and the last byte completes"""
+        path = create_upload(client, 10)
+
+        assert patch_chunk(client, path, 0, b"01234").headers["Upload-Offset"] == "5"
+        assert client.head(path).headers["Upload-Offset"] == "5"
+        assert patch_chunk(client, path, 5, b"56789").headers["Upload-Offset"] == "10"
+
+        upload_id = path.rsplit("/", 1)[1]
+        assert storage.objects[f"uploads/{USER.id}/{upload_id}"] == b"0123456789"
+        assert [len(data) for data in storage.parts.values()] == [4, 4, 2]
+        assert client.get(path).json()["is_complete"] is True
+
+    def test_checksum_mismatch_discards_chunk(self, client, storage):
+        """Test a bad checksum leaves the offset where it was"""
+        path = create_upload(client, 10)
+        patch_chunk(client, path, 0, b"0123")
+
+        response = patch_chunk(client, path, 4, b"4567", **{"Upload-Checksum": "sha1 " + "0" * 40})
+        assert response.status_code == 460
+        assert client.head(path).headers["Upload-Offset"] == "4"
+
+        digest = base64.b64encode(hashlib.sha1(b"4567").digest()).decode()
+        response = patch_chunk(client, path, 4, b"4567", **{"Upload-Checksum": f"sha1 {digest}"})
+        assert response.headers["Upload-Offset"] == "8"
+
+    def test_offset_mismatch_and_oversize_rejected(self, client):
+        """Test PATCHes at the wrong offset or past the length change nothing"""
+        path = create_upload(client, 4)
+
+        assert patch_chunk(client, path, 2, b"01").status_code == 409
+        assert patch_chunk(client, path, 0, b"012345").status_code == 413
+        assert client.head(path).headers["Upload-Offset"] == "0"
+
+    def test_concurrent_patch_refused(self, client, redis_client):
+        """Test a second writer is turned away while the upload is locked"""
+        path = create_upload(client, 4)
+        upload_id = path.rsplit("/", 1)[1]
+        redis_client.locked.add(f"tus:upload:{upload_id}:lock")
+
+        assert patch_chunk(client, path, 0, b"01").status_code == 423
+
+
+class TestTusConcatenation:
+    """Test final uploads assembled from parallel partial uploads"""
+
+    def upload_partials(self, client, *chunks):
+        paths = []
+        for chunk in chunks:
+            path = create_upload(client, len(chunk), **{"Upload-Concat": "partial"})
+            patch_chunk(client, path, 0, chunk)
+            paths.append(path)
+        return paths
+
+    def test_final_upload_joins_partials_in_s3(self, client, storage):
+        """Test partials of a full part are copied server-side and then deleted"""
+        paths = self.upload_partials(client, b"abcde", b"fgh")
+
+        response = client.post("/videos/upload", headers={
+            "Tus-Resumable": "1.0.0",
+            "Upload-Concat": "final;" + " ".join(f"http://testserver{path}" for path in paths)
+        })
+        assert response.status_code == 201
+        final_path = "/videos/upload/" + response.headers["Location"].rsplit("/", 1)[1]
+
+        head = client.head(final_path)
+        assert (head.headers["Upload-Offset"], head.headers["Upload-Length"]) == ("8", "8")
+        assert head.headers["Upload-Concat"] == "final;" + " ".join(f"http://testserver{path}" for path in paths)
+        assert storage.objects == {f"uploads/{USER.id}/{final_path.rsplit('/', 1)[1]}": b"abcdefgh"}
+        assert len(storage.copied) == 2
+        assert patch_chunk(client, final_path, 8, b"x").status_code == 403
+
+    def test_small_partials_merged_into_one_part(self, client, storage):
+        """Test a partial below the S3 part minimum is merged with the start of the next"""
+        paths = self.upload_partials(client, b"ab", b"cdefg")
+
+        response = client.post("/videos/upload", headers={
+            "Tus-Resumable": "1.0.0", "Upload-Concat": "final;" + " ".join(paths)
+        })
+        final_id = response.headers["Location"].rsplit("/", 1)[1]
+
+        assert storage.objects[f"uploads/{USER.id}/{final_id}"] == b"abcdefg"
+        assert [source_range for _, source_range in storage.copied] == [(2, 5)]
+
+    @pytest.mark.asyncio
+    async def test_large_partial_after_small_one_read_only_to_fill_part(self, redis_client, storage, monkeypatch):
+        """Test a small partial is topped up with a ranged read and the rest copied in S3"""
+        monkeypatch.setattr(resumable_upload, "MAX_COPY_PART_SIZE", 7)
+        store = ResumableUploadStore(storage_service=storage, redis_client=redis_client, part_size=4)
+        for upload_id, data in (("p1", b"a"), ("p2", b"bcdefghijkl"), ("p3", b"m")):
+            await store.create(upload_id, f"partials/{upload_id}", size=len(data), partial=True)
+
+            async def body(data=data):
+                yield data
+
+            await store.write(upload_id, 0, body())
+
+        upload = await store.concatenate("final", "videos/final.mp4", ["p1", "p2", "p3"])
+
+        assert upload.completed and storage.objects["videos/final.mp4"] == b"abcdefghijklm"
+        assert storage.reads == [("partials/p1", (0, 1)), ("partials/p2", (0, 3))]
+        # Eight bytes past the top-up exceed the copy limit, so two equal pieces
+        assert storage.copied == [
+            ("partials/p2", (3, 7)), ("partials/p2", (7, 11)), ("partials/p3", (0, 1))
+        ]
+
+    def test_partials_in_use_not_concatenated_twice(self, client, redis_client, storage):
+        """Test a final upload over locked or already consumed partials is refused"""
+        paths = self.upload_partials(client, b"abcde", b"fgh")
+        headers = {"Tus-Resumable": "1.0.0", "Upload-Concat": "final;" + " ".join(paths)}
+        partial_lock = f"tus:upload:{paths[1].rsplit('/', 1)[1]}:lock"
+
+        redis_client.locked.add(partial_lock)
+        assert client.post("/videos/upload", headers=headers).status_code == 423
+        assert storage.copied == [] and not redis_client.locked - {partial_lock}
+
+        redis_client.locked.clear()
+        assert client.post("/videos/upload", headers=headers).status_code == 201
+        assert client.post("/videos/upload", headers=headers).status_code == 404
+        assert len(storage.copied) == 2
+
+    def test_unfinished_partial_rejected(self, client):
+        """Test a final upload needs every partial finished"""
+        path = create_upload(client, 4, **{"Upload-Concat": "partial"})
+
+        response = client.post("/videos/upload", headers={"Tus-Resumable": "1.0.0", "Upload-Concat": f"final;{path}"})
+        assert response.status_code == 400
+
+
+class TestResumableUploadStore:
+    """Test the upload store directly"""
+
+    @pytest.mark.asyncio
+    async def test_interrupted_body_keeps_received_bytes(self, redis_client, storage):
+        """Test bytes before a disconnect are kept as parts plus a tail"""
+        store = ResumableUploadStore(storage_service=storage, redis_client=redis_client, part_size=4)
+        await store.create("u1", "videos/u1.mp4", size=8)
+
+        with pytest.raises(ConnectionError):
+            await store.write("u1", 0, interrupted(b"abcdef"))
+
+        upload = await store.get("u1")
+        assert (upload.offset, list(upload.parts), upload.tail_size) == (6, [1], 2)
+
+        async def rest():
+            yield b"gh"
+
+        upload = await store.write("u1", 6, rest())
+        assert upload.completed
+        assert storage.objects["videos/u1.mp4"] == b"abcdefgh"
+
+    @pytest.mark.asyncio
+    async def test_checksummed_write_renews_lock_and_defers_parts(self, redis_client, storage):
+        """Test a long checksummed body keeps the lock and records no part before verifying"""
+        store = ResumableUploadStore(storage_service=storage, redis_client=redis_client, part_size=4)
+        await store.create("u1", "videos/u1.mp4", size=16)
+
+        async def body():
+            yield b"abcdefghijkl"
+
+        with pytest.raises(UploadChecksumMismatch):
+            await store.write("u1", 0, body(), checksum=("sha1", base64.b64encode(b"0" * 20).decode()))
+
+        upload = await store.get("u1")
+        assert redis_client.reacquired == 3
+        assert (upload.offset, upload.parts) == (0, {})
+
+    @pytest.mark.asyncio
+    async def test_progress_and_completion_refresh_state_ttl(self, redis_client, storage):
+        """Test the state hash's TTL restarts with progress and completion is kept"""
+        store = ResumableUploadStore(storage_service=storage, redis_client=redis_client, part_size=4)
+        await store.create("u1", "videos/u1.mp4", size=4)
+        redis_client.expiring.clear()
+
+        async def body():
+            yield b"abcd"
+
+        await store.write("u1", 0, body())
+        assert "tus:upload:u1" in redis_client.expiring
+
+        retried = await store.write("u1", 0, body())
+        assert retried.completed and retried.offset == 4
@@ -0,0 +1,311 @@
+"""Test video processing command construction and output uploads"""
+import time
+import threading
+import uuid
+import ffmpeg
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.models.practice import VideoQuality
+from app.services.media.hls import build_master_playlist, hls_codecs, rewrite_playlist_uris, segment_peak_bitrate
+from app.services.media.upload_queue import UploadQueue
+from app.services.media.video_processor import VideoProcessor
+
+
+VIDEO_INFO = {
+    "duration": 60.0,
+    "width": 1920,
+    "height": 1080,
+    "audio_codec": "aac"
+}
+
+
+@pytest.fixture
+def video_processor():
+    """Video processor without storage"""
+    return VideoProcessor(storage_service=None)
+
+
+async def compile_renditions(video_processor, outputs, **kwargs):
+    """Build the single-run ffmpeg command without executing it"""
+    with patch.object(ffmpeg.nodes.OutputStream, "run", autospec=True) as run:
+        await video_processor.transcode_renditions("in.mp4", outputs, video_info=VIDEO_INFO, **kwargs)
+    return run.call_args[0][0].compile()
+
+
+class TestTranscodeRenditions:
+    """Test multi-output transcoding from a single decode"""
+
+    @pytest.mark.asyncio
+    async def test_single_input_split_per_output(self, video_processor, tmp_path):
+        """Test renditions and thumbnails share one decoded input"""
+        args = await compile_renditions(
+            video_processor,
+            {VideoQuality.LOW: "low.mp4", VideoQuality.MEDIUM: "medium.mp4"},
+            thumbnail_dir=str(tmp_path),
+            audio_output="audio.mp3"
+        )
+        filter_graph = args[args.index("-filter_complex") + 1]
+
+        assert args.count("-i") == 1
+        assert "split=3" in filter_graph
+        assert "scale=640:360" in filter_graph and "scale=1280:720" in filter_graph
+        assert args[args.index("-profile:v") + 1] == "high"
+        assert {"low.mp4", "medium.mp4", "audio.mp3", str(tmp_path / "thumb_%d.jpg")} <= set(args)
+
+    @pytest.mark.asyncio
+    async def test_original_is_stream_copied(self, video_processor):
+        """Test the original quality is copied without a decode branch"""
+        args = await compile_renditions(
+            video_processor,
+            {VideoQuality.LOW: "low.mp4", VideoQuality.ORIGINAL: "original.mp4"}
+        )
+
+        assert "split" not in " ".join(args)
+        original_args = args[args.index("low.mp4") + 1:args.index("original.mp4")]
+        assert original_args[original_args.index("-codec") + 1] == "copy"
+
+
+class TestPlanRenditions:
+    """Test the probe-driven rendition ladder"""
+
+    def test_full_ladder_for_1080p_source(self, video_processor):
+        """Test every tier is encoded when none would upscale"""
+        info = {**VIDEO_INFO, "video_codec": "hevc", "bitrate": 8000000}
+        plan = video_processor.plan_renditions(info, [VideoQuality.LOW, VideoQuality.MEDIUM, VideoQuality.HIGH])
+
+        assert [step["action"] for step in plan.values()] == ["encode", "encode", "encode"]
+        assert (plan[VideoQuality.HIGH]["width"], plan[VideoQuality.HIGH]["height"]) == (1920, 1080)
+
+    def test_small_source_drops_upscales(self, video_processor):
+        """Test a 480p source gets one native tier and no larger ones"""
+        info = {**VIDEO_INFO, "width": 854, "height": 480, "video_codec": "hevc", "bitrate": 1200000}
+        plan = video_processor.plan_renditions(info, [VideoQuality.HIGH, VideoQuality.MEDIUM, VideoQuality.LOW])
+
+        assert list(plan) == [VideoQuality.LOW, VideoQuality.MEDIUM]
+        assert plan[VideoQuality.MEDIUM] == {"action": "encode", "width": 854, "height": 480}
+
+    def test_compatible_source_is_stream_copied(self, video_processor):
+        """Test an H.264/AAC source within budget is copied, not re-encoded"""
+        info = {
+            **VIDEO_INFO, "width": 1280, "height": 720, "video_codec": "h264",
+            "pix_fmt": "yuv420p", "video_bitrate": 1800000, "bitrate": 1900000
+        }
+        plan = video_processor.plan_renditions(info, [VideoQuality.LOW, VideoQuality.MEDIUM, VideoQuality.HIGH])
+
+        assert plan[VideoQuality.MEDIUM] == {"action": "copy"}
+        assert VideoQuality.HIGH not in plan
+
+        too_dense = {**info, "video_bitrate": 6000000}
+        assert video_processor.plan_renditions(too_dense, [VideoQuality.MEDIUM])[VideoQuality.MEDIUM]["action"] == "encode"
+
+
+class TestSegmentedTranscode:
+    """Test splitting and rejoining segments for parallel encodes"""
+
+    @pytest.mark.asyncio
+    async def test_split_copies_video_at_segment_boundaries(self, video_processor, tmp_path):
+        """Test segments are cut by the segment muxer without re-encoding"""
+        with patch.object(ffmpeg.nodes.OutputStream, "run", autospec=True) as run:
+            await video_processor.split_segments("in.mp4", str(tmp_path), 60)
+        args = run.call_args[0][0].compile()
+
+        assert args[args.index("-f") + 1] == "segment"
+        assert args[args.index("-segment_time") + 1] == "60"
+        assert args[args.index("-vcodec") + 1] == "copy"
+        assert args[-1] == str(tmp_path / "segment_%05d.mp4")
+
+    @pytest.mark.asyncio
+    async def test_join_stream_copies_and_encodes_audio_once(self, video_processor, tmp_path):
+        """Test segments are concat-demuxed and the source audio muxed in"""
+        listed = []
+
+        def run(stream, **kwargs):
+            args = stream.compile()
+            listed.append((args, open(args[args.index("-i") + 1]).read()))
+
+        with patch.object(ffmpeg.nodes.OutputStream, "run", autospec=True, side_effect=run):
+            await video_processor.concatenate_videos(
+                [str(tmp_path / "a.mp4"), str(tmp_path / "b.mp4")],
+                str(tmp_path / "joined.mp4"),
+                stream_copy=True,
+                audio_source="original.mp4",
+                audio_bitrate="96k"
+            )
+        args, concat_list = listed[0]
+
+        assert args[args.index("-f") + 1] == "concat"
+        assert concat_list == f"file '{tmp_path / 'a.mp4'}'\nfile '{tmp_path / 'b.mp4'}'\n"
+        assert ["-map", "1:a"] == args[args.index("1:a") - 1:args.index("1:a") + 1]
+        assert args[args.index("-vcodec") + 1] == "copy" and args[args.index("-b:a") + 1] == "96k"
+        assert not (tmp_path / "joined.txt").exists()
+
+
+MEDIA_PLAYLIST = """#EXTM3U
+#EXT-X-VERSION:7
+#EXT-X-TARGETDURATION:6
+#EXT-X-PLAYLIST-TYPE:VOD
+#EXT-X-MAP:URI="init.mp4"
+#EXTINF:6.000000,
+seg_00000.m4s
+#EXTINF:2.000000,
+seg_00001.m4s
+#EXT-X-ENDLIST
+"""
+
+
+class TestHlsPlaylists:
+    """Test HLS master and media playlist handling"""
+
+    def test_master_playlist_orders_variants(self):
+        """Test variants are listed from lowest to highest bandwidth"""
+        master = build_master_playlist([
+            {"uri": "high/index.m3u8", "bandwidth": 3000000, "average_bandwidth": 2500000, "width": 1920, "height": 1080},
+            {"uri": "low/index.m3u8", "bandwidth": 600000, "average_bandwidth": 500000, "width": 640, "height": 360},
+        ])
+        lines = master.splitlines()
+
+        assert lines[0] == "#EXTM3U"
+        assert lines[4] == "low/index.m3u8" and lines[6] == "high/index.m3u8"
+        assert "BANDWIDTH=600000,AVERAGE-BANDWIDTH=500000,RESOLUTION=640x360" in lines[3]
+
+    def test_master_playlist_declares_codecs(self):
+        """Test CODECS is built from each rendition's probed profile and level"""
+        info = {"video_codec": "h264", "video_profile": "High", "video_level": 31, "audio_codec": "aac", "audio_profile": "LC"}
+        master = build_master_playlist([
+            {"uri": "medium/index.m3u8", "bandwidth": 1800000, "average_bandwidth": 1500000,
+             "width": 1280, "height": 720, "codecs": hls_codecs(info)}
+        ])
+
+        assert master.splitlines()[3].endswith(',CODECS="avc1.64001f,mp4a.40.2"')
+        assert hls_codecs({**info, "video_profile": "Main", "video_level": 40, "audio_codec": None}) == "avc1.4d4028"
+        assert hls_codecs({**info, "video_codec": "hevc"}) is None
+
+    def test_rewrite_signs_segments_and_init(self):
+        """Test segment and init URIs are replaced, tags kept"""
+        rewritten = rewrite_playlist_uris(MEDIA_PLAYLIST, lambda uri: f"https://s3/{uri}?sig")
+
+        assert '#EXT-X-MAP:URI="https://s3/init.mp4?sig"' in rewritten
+        assert "https://s3/seg_00001.m4s?sig" in rewritten.splitlines()
+        assert "#EXTINF:2.000000," in rewritten
+
+    def test_peak_bitrate_from_segments(self, tmp_path):
+        """Test BANDWIDTH comes from the densest segment"""
+        (tmp_path / "index.m3u8").write_text(MEDIA_PLAYLIST)
+        (tmp_path / "seg_00000.m4s").write_bytes(b"x" * 6000)
+        (tmp_path / "seg_00001.m4s").write_bytes(b"x" * 3000)
+
+        assert segment_peak_bitrate(str(tmp_path / "index.m3u8")) == 12000
+
+
+class SigningStorage:
+    """Storage stand-in holding one media playlist and counting presigned URLs"""
+
+    def __init__(self):
+        self.signed = 0
+
+    async def get_bytes(self, object_key):
+        return MEDIA_PLAYLIST.encode()
+
+    async def generate_presigned_url(self, object_key, expiration=3600):
+        self.signed += 1
+        return f"https://s3.example.com/{object_key}?sig={self.signed}"
+
+
+class TestHlsPlaylistEndpoint:
+    """Test serving signed media playlists"""
+
+    def test_signed_playlist_reused_between_polls(self):
+        """Test repeated playlist requests sign each segment once"""
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from app.api.deps import get_current_user
+        from app.api.v1.endpoints import video_processing
+        from app.db.session import get_db
+
+        app = FastAPI()
+        app.include_router(video_processing.router)
+        app.dependency_overrides[get_current_user] = lambda: None
+        app.dependency_overrides[get_db] = lambda: None
+        client = TestClient(app)
+        storage = SigningStorage()
+        cache = {}
+        hls = {"variants": {"low": {"path": "videos/sessions/1/hls/low/index.m3u8"}}}
+
+        async def cache_get(key, deserialize=True):
+            return cache.get(key)
+
+        async def cache_set(key, value, expire=None, serialize=True):
+            cache[key] = value
+
+        with patch.object(video_processing, "_get_hls_package", AsyncMock(return_value=hls)), \
+                patch.object(video_processing, "get_storage_service", return_value=storage), \
+                patch.object(video_processing, "cache_get", cache_get), \
+                patch.object(video_processing, "cache_set", cache_set):
+            responses = [client.get(f"/{uuid.uuid4()}/hls/low/index.m3u8") for _ in range(3)]
+
+        assert [response.status_code for response in responses] == [200] * 3
+        assert len({response.text for response in responses}) == 1
+        assert storage.signed == 3
+        assert "https://s3.example.com/videos/sessions/1/hls/low/seg_00001.m4s" in responses[0].text
+
+
+class RecordingStorage:
+    """Storage stand-in that records uploads and peak concurrency"""
+
+    def __init__(self, fail_key=None):
+        self.fail_key = fail_key
+        self.uploaded = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def upload_file_sync(self, file_path, object_key, content_type=None):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+            self.uploaded.append(object_key)
+        if object_key == self.fail_key:
+            raise RuntimeError("upload failed")
+        return object_key
+
+
+class TestUploadQueue:
+    """Test background uploads of processed outputs"""
+
+    def test_uploads_run_concurrently_up_to_worker_limit(self):
+        """Test every file is uploaded with bounded concurrency"""
+        storage = RecordingStorage()
+
+        with UploadQueue(storage, max_workers=2, max_pending=3) as uploads:
+            for i in range(6):
+                uploads.submit(f"/tmp/{i}.mp4", f"key_{i}")
+            keys = uploads.wait()
+
+        assert keys == [f"key_{i}" for i in range(6)]
+        assert storage.peak == 2
+
+    def test_wait_raises_upload_error(self):
+        """Test a failed upload surfaces after the others finish"""
+        storage = RecordingStorage(fail_key="key_1")
+
+        with UploadQueue(storage, max_workers=2) as uploads:
+            for i in range(3):
+                uploads.submit(f"/tmp/{i}.mp4", f"key_{i}")
+            with pytest.raises(RuntimeError, match="upload failed"):
+                uploads.wait()
+
+        assert sorted(storage.uploaded) == ["key_0", "key_1", "key_2"]
+
+    def test_uploads_start_no_event_loop(self):
+        """Test upload threads call storage directly rather than a loop per upload"""
+        storage = RecordingStorage()
+
+        with patch("asyncio.new_event_loop", side_effect=AssertionError("event loop per upload")):
+            with UploadQueue(storage, max_workers=2) as uploads:
+                for i in range(3):
+                    uploads.submit(f"/tmp/{i}.mp4", f"key_{i}")
+                assert uploads.wait() == ["key_0", "key_1", "key_2"]
@@ -3,8 +3,9 @@ import pytest
 from uuid import uuid4
 from datetime import datetime
 import json
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import ClientDisconnect
 
 from app.services.media.video_service import VideoService
 from app.schemas.video import VideoUploadInit
@@ -107,37 +108,29 @@ class TestVideoService:
     
     @pytest.mark.asyncio
     async def test_update_upload_progress(self, video_service, mock_db):
-        """Test updating upload progress"""
+        """Test chunks go to the upload store without touching the video row"""
         # Setup
         upload_id = "test-upload-id"
         
-        mock_video = Mock(spec=Video)
-        mock_video.upload_id = upload_id
-        mock_video.upload_offset = 0
-        mock_video.file_size_bytes = 10485760
-        mock_video.upload_completed = False
-        mock_video.upload_expires_at = datetime.utcnow().replace(year=2025)
-        mock_video.upload_metadata = json.dumps({
-            "s3_upload_id": "s3-upload-id",
-            "parts": []
-        })
+        upload = Mock(offset=1024, completed=False)
+        video_service._uploads = Mock()
+        video_service._uploads.write = AsyncMock(return_value=upload)
         
-        mock_result = Mock()
-        mock_result.scalar_one_or_none.return_value = mock_video
-        mock_db.execute.return_value = mock_result
+        async def chunks():
+            yield b"x" * 1024  # 1KB chunk
         
         # Execute
-        chunk_data = b"x" * 1024  # 1KB chunk
-        updated_video = await video_service.update_upload_progress(
+        body = chunks()
+        result = await video_service.update_upload_progress(
             upload_id=upload_id,
-            offset=1024,
-            chunk_data=chunk_data,
-            part_number=1
+            offset=0,
+            chunks=body
         )
         
         # Assert
-        assert mock_video.upload_offset == 1024
-        mock_db.commit.assert_called_once()
+        assert result.offset == 1024
+        video_service._uploads.write.assert_awaited_once_with(upload_id, 0, body, None)
+        mock_db.commit.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_complete_upload(self, video_service, mock_db, mock_s3_client):
@@ -163,11 +156,14 @@ class TestVideoService:
         mock_result.scalar_one_or_none.return_value = mock_video
         mock_db.execute.return_value = mock_result
         
+        video_service._uploads = Mock()
+        video_service._uploads.abort = AsyncMock(return_value=True)
+        
         # Execute
         completed_video = await video_service.complete_upload(upload_id, student_id)
         
-        # Assert
-        mock_s3_client.complete_multipart_upload.assert_called_once()
+        # Assert; the store keeps the completed state for retried PATCHes
+        video_service._uploads.abort.assert_not_awaited()
         assert mock_video.upload_metadata is None
         assert mock_video.upload_expires_at is None
         mock_db.commit.assert_called()
@@ -215,6 +211,88 @@ class TestTusProtocol:
         assert upload_id.isalnum()
 
 
+
+class TestTusEndpoints:
+    """Test uploads through /videos/tus are finalized however they complete"""
+    
+    @pytest.fixture
+    def db(self):
+        db = Mock()
+        db.get = AsyncMock(return_value=Mock(spec=PracticeSession))
+        return db
+    
+    @pytest.fixture
+    def client(self, db):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from app.api.deps import get_current_student
+        from app.api.v1 import videos
+        from app.db.session import get_db
+        
+        app = FastAPI()
+        app.include_router(videos.router, prefix="/videos")
+        app.dependency_overrides[get_current_student] = lambda: Mock(id=uuid4())
+        app.dependency_overrides[get_db] = lambda: db
+        return TestClient(app)
+    
+    @pytest.fixture
+    def completion(self):
+        """Stub the completion path and record what gets queued"""
+        video = Mock(spec=Video, session_id=uuid4(), s3_key="videos/test.mp4")
+        with patch.object(VideoService, "complete_upload", AsyncMock(return_value=video)) as complete, \
+                patch("app.api.v1.videos.queue_session_processing", AsyncMock()) as queue:
+            yield complete, queue
+    
+    def test_creation_with_whole_body_queues_processing(self, client, db, completion):
+        """Test a creation request carrying the whole file is finalized like a last PATCH"""
+        complete, queue = completion
+        metadata = TusMetadata(filename="test.mp4", session_id=str(uuid4()), size=4).to_header()
+        
+        with patch.object(VideoService, "init_upload", AsyncMock(return_value=(Mock(upload_id="u1"), "s3"))), \
+                patch.object(VideoService, "update_upload_progress", AsyncMock(return_value=Mock(completed=True, offset=4))):
+            response = client.post("/videos/tus", content=b"abcd", headers={
+                "Tus-Resumable": "1.0.0",
+                "Upload-Length": "4",
+                "Upload-Metadata": metadata,
+                "Content-Type": "application/offset+octet-stream"
+            })
+        
+        assert response.status_code == 201
+        complete.assert_awaited_once()
+        queue.assert_awaited_once_with(db, db.get.return_value, "u1", "videos/test.mp4")
+    
+    def test_retried_final_patch_is_finalized(self, client, completion):
+        """Test a PATCH for an already completed upload still makes sure processing is queued"""
+        complete, queue = completion
+        
+        with patch.object(VideoService, "get_upload_status", AsyncMock(return_value=Mock(completed=True, size=4))):
+            response = client.patch("/videos/tus/u1", content=b"abcd", headers={
+                "Tus-Resumable": "1.0.0",
+                "Upload-Offset": "0",
+                "Content-Type": "application/offset+octet-stream"
+            })
+        
+        assert response.status_code == 204
+        assert response.headers["Upload-Offset"] == "4"
+        queue.assert_awaited_once()
+    
+    def test_client_disconnect_reports_offset(self, client, completion):
+        """Test a body cut short answers 400 with the offset to resume from"""
+        complete, queue = completion
+        
+        with patch.object(VideoService, "get_upload_status", AsyncMock(return_value=Mock(completed=False, offset=2, size=4))), \
+                patch.object(VideoService, "update_upload_progress", AsyncMock(side_effect=ClientDisconnect())):
+            response = client.patch("/videos/tus/u1", content=b"cd", headers={
+                "Tus-Resumable": "1.0.0",
+                "Upload-Offset": "2",
+                "Content-Type": "application/offset+octet-stream"
+            })
+        
+        assert response.status_code == 400
+        assert response.headers["Upload-Offset"] == "2"
+        complete.assert_not_awaited()
+
+
 @pytest.mark.asyncio
 async def test_video_api_integration():
     """Integration test for video API endpoints"""
@@ -0,0 +1,43 @@
+"""Test the per-process runtime used by Celery tasks"""
+import asyncio
+import threading
+from unittest.mock import patch
+
+from app.tasks import runtime
+
+
+async def running_loop():
+    """The loop the coroutine runs on"""
+    return asyncio.get_running_loop()
+
+
+class TestWorkerRuntime:
+    """Test loop and client reuse across tasks"""
+
+    def test_loop_and_storage_reused_between_calls(self):
+        """Test consecutive tasks share one loop and one storage client"""
+        with patch.object(runtime, "StorageService") as storage_class, patch.object(runtime, "_local", threading.local()):
+            first_loop = runtime.run_async(running_loop())
+            second_loop = runtime.run_async(running_loop())
+
+            assert first_loop is second_loop is runtime.get_runtime().loop
+            assert storage_class.from_settings.call_count == 1
+            runtime.get_runtime().loop.close()
+
+    def test_threads_get_their_own_loop(self):
+        """Test a loop is never shared across threads"""
+        loops = []
+
+        def task():
+            loops.append(runtime.get_runtime().loop)
+            runtime.get_runtime().loop.close()
+
+        with patch.object(runtime, "StorageService"), patch.object(runtime, "_local", threading.local()):
+            threads = [threading.Thread(target=task) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert loops[0] is not loops[1]
+